@@ -0,0 +1,176 @@
+"""
+*************************************************************************************************
+***********************************// BENCHMARK SUITE //*****************************************
+*************************************************************************************************
+Benchmark of the simulation pipeline (see simamics.dynamic.simulate). The four scenarios of the demo
+notebook (high/low activity and high/low test) are run for several population sizes and both
+population engines. For each run the time spent in each step of the simulation (Report.count,
+diagnosis, interactions, deaths and progression) and the peak memory are recorded.
+
+The results are saved as JSON and can be compared with the results of a previous version:
+
+    python benchmarks/benchmark.py --output results/new.json --compare results/old.json
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simamics.dynamic import Interaction, Profiler, simulate
+from simamics.population import Population, ArrayPopulation
+from simamics.pathogen import Virus
+
+# Scenarios of the demo notebook: population activity, percentage of test and virus life time
+SCENARIOS = {
+    'high-activity-low-test': (0.8, 0.2, 12),
+    'high-activity-high-test': (0.8, 0.8, 10),
+    'low-activity-high-test': (0.6, 0.8, 10),
+    'low-activity-low-test': (0.6, 0.2, 10),
+}
+
+# Population class of each engine
+ENGINES = {
+    'object': Population,
+    'array': ArrayPopulation,
+}
+
+PHASES = Profiler.PHASES
+
+
+def run(engine: str, scenario: str, size: int, days: int, seed: int):
+    """
+    Function that runs a scenario timing each step of the simulation (see simamics.dynamic.Profiler).
+
+    Return
+    ---------
+    :return: dict
+        Total and per step time (in seconds), counters of the interaction step and final number of
+        deaths and recovered individuals.
+    """
+    populationActivity, diagnosisPercentage, lifeTime = SCENARIOS[scenario]
+    rng = np.random.default_rng(seed)
+    interaction = Interaction(lambda size, mov, space: int((size*(pow((2*mov), 2)))/space))
+    virus = Virus(lifeTime=lifeTime, deathRate=0.01, lightPercentage=0.35, mildPercentage=0.35,
+                  severePercentage=0.2, asymptomaticPercentage=0.1, transmissionPercentage=0.5)
+    # The notebook uses a population of 4000 individuals living in a space of 2000
+    population = ENGINES[engine](initialCases=10, populationSize=size, space=size // 2, rng=rng)
+    profiler = Profiler()
+    start = time.perf_counter()
+    report = simulate(population, virus, days, populationActivity, diagnosisPercentage, interaction,
+                      verbose=False, rng=rng, observer=profiler)
+    total = time.perf_counter() - start
+    totals = profiler.totals()
+    return dict(total=total, phases={phase: totals[phase]['duration'] for phase in PHASES},
+                contacts=totals['interactions']['contacts'], infections=totals['interactions']['infections'],
+                deaths=report.totalDeaths, recovered=int(report.recovered[-1]))
+
+
+def peakMemory(engine: str, scenario: str, size: int, days: int, seed: int):
+    """
+    Function that runs a scenario tracing the memory allocations (NumPy arrays included).
+
+    Return
+    ---------
+    :return: int
+        Peak memory in bytes.
+    """
+    tracemalloc.start()
+    run(engine, scenario, size, days, seed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark(sizes: list, engines: list, scenarios: list, days: int, repeat: int, maxObjectSize: int, seed: int):
+    """
+    Function that runs all the benchmarks. Each configuration is run several times and the fastest
+    run is kept, the peak memory is measured in an additional run.
+
+    Return
+    ---------
+    :return: list
+        Result of each configuration.
+    """
+    results = []
+    for engine in engines:
+        for size in sizes:
+            if engine == 'object' and size > maxObjectSize:
+                continue
+            for scenario in scenarios:
+                runs = [run(engine, scenario, size, days, seed + n) for n in range(repeat)]
+                best = min(runs, key=lambda result: result['total'])
+                best.update(engine=engine, size=size, scenario=scenario, days=days,
+                            peakMemory=peakMemory(engine, scenario, size, days, seed))
+                results.append(best)
+                print('%-6s %-24s %8d  %8.3fs  %8.1f MB  %s' % (
+                    engine, scenario, size, best['total'], best['peakMemory'] / 2 ** 20,
+                    '  '.join('%s %.3fs' % (phase, best['phases'][phase]) for phase in PHASES)))
+    return results
+
+
+def compare(results: list, previous: list, threshold: float):
+    """
+    Function that compares the results with those of a previous version and reports the configurations
+    whose time or peak memory has increased more than the threshold.
+
+    Return
+    ---------
+    :return: bool
+        True if there are regressions.
+    """
+    previousResults = {(result['engine'], result['scenario'], result['size'], result['days']): result
+                       for result in previous}
+    regressions = False
+    for result in results:
+        key = (result['engine'], result['scenario'], result['size'], result['days'])
+        if key not in previousResults:
+            continue
+        for metric in ('total', 'peakMemory'):
+            ratio = result[metric] / max(previousResults[key][metric], 1e-9)
+            if ratio > 1 + threshold:
+                regressions = True
+                print('REGRESSION %-6s %-24s %8d %s: %.2fx' % (key[0], key[1], key[2], metric, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the simamics simulation pipeline.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--days', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per configuration (the fastest is kept).')
+    parser.add_argument('--max-object-size', type=int, default=10000,
+                        help='Largest population simulated with the object engine.')
+    parser.add_argument('--seed', type=int, default=7777)
+    parser.add_argument('--output', help='JSON file where the results are saved.')
+    parser.add_argument('--compare', help='JSON file with the results of a previous version.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative increase considered a regression. Default 0.1.')
+    args = parser.parse_args()
+
+    results = benchmark(args.sizes, args.engines, args.scenarios, args.days, args.repeat,
+                        args.max_object_size, args.seed)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(dict(python=platform.python_version(), numpy=np.__version__, machine=platform.machine(),
+                           results=results), file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)['results']
+        if compare(results, previous, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+*************************************************************************************************
+**********************************// CALIBRATION SCRIPT //***************************************
+*************************************************************************************************
+Calibration of the tau-leaping engine (see simamics.dynamic.tauLeaping) against the individual
+simulation. Several replicates of the four scenarios of the demo notebook are run with both engines
+and the mean of the main statistics (epidemic peak, day of the peak, recovered, deaths and maximum
+number of diagnosed individuals) are compared. Statistics whose relative difference is larger than
+the tolerance and than three standard errors (near the epidemic threshold the outbreaks are very
+variable) are reported:
+
+    python benchmarks/calibration.py --size 4000 --replicates 32 --tolerance 0.15
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simamics.dynamic import Interaction, simulateEnsemble
+from simamics.population import ArrayPopulation, CompartmentalPopulation
+from simamics.pathogen import Virus
+from benchmark import SCENARIOS
+
+# Statistics compared between engines
+STATISTICS = {
+    'peak': lambda ensemble: ensemble.series['totalCases'].max(axis=1),
+    'peakDay': lambda ensemble: ensemble.series['totalCases'].argmax(axis=1),
+    'recovered': lambda ensemble: ensemble.series['recovered'][:, -1],
+    'deaths': lambda ensemble: ensemble.series['deaths'].sum(axis=1),
+    'diagnosed': lambda ensemble: ensemble.series['diagnosed'].max(axis=1),
+}
+
+
+def calibrate(size: int, days: int, replicates: int, tolerance: float, workers: int, seed: int):
+    """
+    Function that compares both engines in every scenario.
+
+    Return
+    ---------
+    :return: bool
+        True if any statistic differs more than the tolerance.
+    """
+    interaction = Interaction(lambda size, mov, space: int((size*(pow((2*mov), 2)))/space))
+    factories = {
+        'agent': lambda: ArrayPopulation(initialCases=10, populationSize=size, space=size // 2),
+        'tauLeaping': lambda: CompartmentalPopulation(initialCases=10, populationSize=size, space=size // 2),
+    }
+    failed = False
+    for scenario, (populationActivity, diagnosisPercentage, lifeTime) in SCENARIOS.items():
+        virus = Virus(lifeTime=lifeTime, deathRate=0.01, lightPercentage=0.35, mildPercentage=0.35,
+                      severePercentage=0.2, asymptomaticPercentage=0.1, transmissionPercentage=0.5)
+        values = {}
+        for engine, populationFactory in factories.items():
+            ensemble = simulateEnsemble(populationFactory, virus, days, populationActivity, diagnosisPercentage,
+                                        interaction, replicates, workers=workers, seed=seed)
+            values[engine] = {name: statistic(ensemble) for name, statistic in STATISTICS.items()}
+        for name in STATISTICS:
+            agent, tauLeaping = values['agent'][name], values['tauLeaping'][name]
+            difference = abs(tauLeaping.mean() - agent.mean())
+            standardError = np.sqrt((agent.var(ddof=1) + tauLeaping.var(ddof=1)) / replicates)
+            relativeDifference = difference / max(abs(agent.mean()), 1)
+            outOfTolerance = relativeDifference > tolerance and difference > 3 * standardError
+            failed |= outOfTolerance
+            print('%-24s %-10s agent %10.1f  tauLeaping %10.1f  difference %5.1f%% (%4.1f SE) %s' % (
+                scenario, name, agent.mean(), tauLeaping.mean(), 100 * relativeDifference,
+                difference / max(standardError, 1e-9), '*' if outOfTolerance else ''))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibration of the tau-leaping engine.')
+    parser.add_argument('--size', type=int, default=4000)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--replicates', type=int, default=32)
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=7777)
+    args = parser.parse_args()
+    if calibrate(args.size, args.days, args.replicates, args.tolerance, args.workers, args.seed):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1 @@
-__all__ = ['states', 'pathogen', 'population', 'visualization', 'dynamic']
-
+__all__ = ['states', 'pathogen', 'population', 'visualization', 'dynamic', 'rng']
@@ -0,0 +1,100 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module defines a criterion to stop a simulation before the number of days requested, e.g.
+when the peak of the epidemic has passed and the number of cases is low enough. A criterion is any
+function that receives the report of the simulation and returns True to stop it (see
+simamics.dynamic.simulate).
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+from ..visualization import Report
+
+
+class EarlyStop:
+    """
+    Stopping criterion based on a statistic of the report (see Report.COLUMNS). The simulation is
+    stopped when the statistic has been below a threshold (and/or above another one) for a number
+    of consecutive days and, optionally, after its peak.
+
+    Attributes
+    ------------
+    statistic : str
+        Statistic of the report.
+
+    below : float
+        The statistic must be lower than this value (None if there is no upper limit).
+
+    above : float
+        The statistic must be greater than this value (None if there is no lower limit).
+
+    afterPeak : bool
+        The statistic must have passed its maximum.
+
+    days : int
+        Number of consecutive days the conditions must hold.
+
+    Examples
+    ---------
+    EarlyStop('totalCases', below=10, afterPeak=True)
+        Stop when the epidemic has passed its peak and there are less than 10 cases.
+    """
+    def __init__(self, statistic: str = 'totalCases', below: float = None, above: float = None,
+                 afterPeak: bool = False, days: int = 1):
+        """
+        Parameters
+        ------------
+        :param statistic: <optional> str
+            Statistic of the report (see simamics.visualization.Report.COLUMNS). Default 'totalCases'.
+        :param below: <optional> float
+            Upper threshold of the statistic.
+        :param above: <optional> float
+            Lower threshold of the statistic.
+        :param afterPeak: <optional> bool
+            Only stop once the statistic has passed its maximum. Default False.
+        :param days: <optional> int
+            Number of consecutive days the conditions must hold. Default 1.
+        """
+        if statistic not in Report.COLUMNS:
+            raise TypeError("Unknown statistic %s, available statistics: %s" % (statistic, ', '.join(Report.COLUMNS)))
+        if below is None and above is None and not afterPeak:
+            raise TypeError("At least one condition (below, above or afterPeak) must be given")
+        if days < 1:
+            raise TypeError("The number of days must be at least 1")
+        self.statistic = statistic
+        self.below = below
+        self.above = above
+        self.afterPeak = afterPeak
+        self.days = days
+
+    def __repr__(self):
+        conditions = ["%s < %s" % (self.statistic, self.below)] if self.below is not None else []
+        conditions += ["%s > %s" % (self.statistic, self.above)] if self.above is not None else []
+        conditions += ["after peak"] if self.afterPeak else []
+        return "< EarlyStop: %s; %d days >" % (', '.join(conditions), self.days)
+
+    def __call__(self, report):
+        """
+        Return True if the simulation must be stopped.
+
+        Parameters
+        ------------
+        :param report: simamics.visualization.Report
+            Report of the simulation.
+
+        Return
+        ---------
+        :return: bool
+        """
+        values = report.columns[self.statistic]
+        if len(values) < self.days:
+            return False
+        last = values[-self.days:]
+        if self.below is not None and not (last < self.below).all():
+            return False
+        if self.above is not None and not (last > self.above).all():
+            return False
+        # The maximum is reached before the last days and they are lower
+        return not self.afterPeak or values.max() > last.max()
@@ -9,17 +9,124 @@ on the variables following variables: population size, population activity and s
 Author: Fernando García Gutiérrez
 Email: fernando.garciagu@upm.es
 """
-
+import ast
+import functools
+import math
+import numpy as np
 from .InteractionBase import InteractionBase
 from math import *
 
+# Variables of an interaction expression
+VARIABLES = ('size', 'mov', 'space')
+
+
+def _truncate(values):
+    """
+    Vectorized version of int(): truncates towards zero.
+    """
+    return np.trunc(values).astype(np.int64)
+
+
+def _minimum(*values):
+    """
+    Vectorized version of min() with any number of arguments (np.minimum takes the third as output).
+    """
+    return functools.reduce(np.minimum, values)
+
+
+def _maximum(*values):
+    """
+    Vectorized version of max() with any number of arguments.
+    """
+    return functools.reduce(np.maximum, values)
+
+
+# Names available in the vectorized version of an expression: the functions of the math module with a
+# NumPy equivalent and the builtins used in pre-built-functions.info
+NUMPY_NAMESPACE = {name: getattr(np, name) for name in dir(math) if not name.startswith('_') and hasattr(np, name)}
+NUMPY_NAMESPACE.update(pow=np.power, abs=np.abs, min=_minimum, max=_maximum, round=np.round,
+                       int=_truncate, float=np.float64)
+
+# Names available in the scalar version of an expression
+MATH_NAMESPACE = {name: getattr(math, name) for name in dir(math) if not name.startswith('_')}
+
+# Functions supported by numexpr
+NUMEXPR_FUNCTIONS = ('exp', 'expm1', 'log', 'log10', 'log1p', 'sqrt', 'sin', 'cos', 'tan', 'sinh', 'cosh',
+                     'tanh', 'arcsin', 'arccos', 'arctan', 'arctan2', 'abs')
+
+
+def _parse(expression: str):
+    """
+    Function that parses an expression given as "lambda size, mov, space: <body>" or as the body of
+    the lambda and checks that it only uses the variables and the functions of the math module.
+
+    Return
+    ---------
+    :return: ast.expr
+        Body of the expression.
+    """
+    try:
+        body = ast.parse(expression.strip(), mode='eval').body
+    except SyntaxError as error:
+        raise TypeError("Invalid interaction expression %r: %s" % (expression, error.msg))
+    if isinstance(body, ast.Lambda):
+        if tuple(argument.arg for argument in body.args.args) != VARIABLES:
+            raise TypeError("The interaction expression must receive the parameters %s" % ', '.join(VARIABLES))
+        body = body.body
+    for node in ast.walk(body):
+        if isinstance(node, ast.Name) and node.id not in VARIABLES and node.id not in NUMPY_NAMESPACE:
+            raise TypeError("Unknown name %s in interaction expression %r" % (node.id, expression))
+        if isinstance(node, (ast.Attribute, ast.Lambda, ast.Subscript, ast.comprehension)):
+            raise TypeError("Interaction expressions can only contain arithmetic operations and functions of "
+                            "the math module")
+    return body
+
+
+class _NumexprTranslator(ast.NodeTransformer):
+    """
+    Translate the body of an expression to the syntax of numexpr: pow(a, b) is written as a ** b and
+    the remaining functions must be supported by numexpr.
+    """
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        name = node.func.id
+        if name == 'pow' and len(node.args) == 2:
+            return ast.BinOp(left=node.args[0], op=ast.Pow(), right=node.args[1])
+        if name not in NUMEXPR_FUNCTIONS:
+            raise TypeError("Function %s is not supported by numexpr" % name)
+        return node
+
+
+def _compileNumexpr(body: ast.expr):
+    """
+    Function that compiles the body of an expression with numexpr (requires numexpr). Only an int()
+    wrapping the whole expression is supported, it is applied after the evaluation.
+
+    Return
+    ---------
+    :return: function
+        Function that receives the variables as arrays.
+    """
+    import numexpr
+    truncate = isinstance(body, ast.Call) and body.func.id == 'int' and len(body.args) == 1
+    if truncate:
+        body = body.args[0]
+    source = ast.unparse(_NumexprTranslator().visit(body))
+    constants = dict(e=math.e, pi=math.pi)
+
+    def evaluate(size, mov, space):
+        result = numexpr.evaluate(source, local_dict=dict(size=size, mov=mov, space=space, **constants))
+        return _truncate(result) if truncate else result
+
+    return evaluate
+
 
 class Interaction(InteractionBase):
     """
     This class define a function that model the number of interactions that occur
     in the population based on population size, population activity and space.
     """
-    def __init__(self, expression):
+    def __init__(self, expression, numexpr: bool = False):
         """
         The defined function must receive three parameters. The first parameter corresponds to
         the population size (of the integer type), the second to the percentage of activity
@@ -27,10 +134,57 @@ class Interaction(InteractionBase):
         lives (of the integer type). All three must be denoted by size, mov and space
         respectively. See pre-built-functions.info for examples.
 
-        :param expression: lambda
+        The function can also be given as a string, e.g. "int((size*(pow((2*mov), 2)))/space)" or
+        "lambda size, mov, space: int((size*(pow((2*mov), 2)))/space)", using the functions of the
+        math module. String expressions are compiled once into a scalar function and a NumPy
+        vectorized function (see Interaction.interactionsMany), and the interaction can be pickled
+        even if it is not defined at module level.
+
+        :param expression: lambda or str
             Function that define the number of interactions that the population can have.
+        :param numexpr: <optional> bool
+            Evaluate the vectorized string expressions with numexpr (requires numexpr). Default False.
+        """
+        self.expression = expression if isinstance(expression, str) else None
+        self.numexpr = numexpr
+        if self.expression is None:
+            if not callable(expression):
+                raise TypeError("The interaction must be a function or a string expression")
+            self.definition = expression
+            self._vectorized = None
+        else:
+            self._compile()
+
+    def _compile(self):
+        """
+        Compile the string expression into a scalar and a vectorized function.
         """
-        self.definition = expression
+        body = _parse(self.expression)
+        function = ast.Expression(ast.Lambda(
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name in VARIABLES], kwonlyargs=[],
+                               kw_defaults=[], defaults=[]),
+            body=body))
+        code = compile(ast.fix_missing_locations(function), '<interaction>', 'eval')
+        self.definition = eval(code, dict(MATH_NAMESPACE))
+        self._vectorized = _compileNumexpr(body) if self.numexpr else eval(code, dict(NUMPY_NAMESPACE))
+
+    def __getstate__(self):
+        # String expressions are compiled again when unpickled, functions are pickled by reference
+        if self.expression is None:
+            return dict(expression=None, numexpr=self.numexpr, definition=self.definition)
+        return dict(expression=self.expression, numexpr=self.numexpr)
+
+    def __setstate__(self, state):
+        self.expression = state['expression']
+        self.numexpr = state['numexpr']
+        if self.expression is None:
+            self.definition = state['definition']
+            self._vectorized = None
+        else:
+            self._compile()
+
+    def __repr__(self):
+        return "< Interaction: %s >" % (self.expression if self.expression is not None else self.definition)
 
     def interactions(self, size: int, mov: float, space: int):
         """
@@ -53,6 +207,32 @@ class Interaction(InteractionBase):
         """
         return self.definition(size, mov, space)
 
+    def interactionsMany(self, sizes, movs, spaces):
+        """
+        Vectorized version of Interaction.interactions. String expressions are evaluated with NumPy
+        (or numexpr) on the whole arrays; functions are called for each element (see
+        InteractionBase.interactionsMany).
+
+        Parameters
+        -------------
+        :param sizes: int or array-like
+            Population sizes.
+        :param movs: float or array-like
+            Population activities.
+        :param spaces: int or array-like
+            Population spaces.
+
+        Return
+        --------
+        :return: np.ndarray
+            Number of interactions for each combination of the broadcast arrays.
+        """
+        if self._vectorized is None:
+            return super().interactionsMany(sizes, movs, spaces)
+        sizes, movs, spaces = np.broadcast_arrays(*(np.asarray(values, dtype=np.float64)
+                                                    for values in (sizes, movs, spaces)))
+        return np.broadcast_to(self._vectorized(sizes, movs, spaces), sizes.shape)
+
     def plotFunction(self, **kwargs):
         """
         Function that plot the function in 3D.
@@ -60,4 +240,4 @@ class Interaction(InteractionBase):
         :param kwargs:
             See InteractionBase
         """
-        super().plotFunction(self.definition,  **kwargs)
\ No newline at end of file
+        super().plotFunction(**kwargs)
@@ -41,7 +41,29 @@ class InteractionBase:
         """
         pass
 
-    def plotFunction(self, function, **kwargs):
+    def interactionsMany(self, sizes, movs, spaces):
+        """
+        Vectorized version of InteractionBase.interactions. By default InteractionBase.interactions
+        is called for each element.
+
+        Parameters
+        -------------
+        :param sizes: int or array-like
+            Population sizes.
+        :param movs: float or array-like
+            Population activities.
+        :param spaces: int or array-like
+            Population spaces.
+
+        Return
+        --------
+        :return: np.ndarray
+            Number of interactions for each combination of the broadcast arrays.
+        """
+        import numpy as np
+        return np.vectorize(self.interactions, otypes=[np.int64])(sizes, movs, spaces)
+
+    def plotFunction(self, function=None, **kwargs):
         """
         This method allows to represent the expression in a three-dimensional graph.
         The space parameter must be a fixed number, the population size and movement rate can
@@ -50,8 +72,8 @@ class InteractionBase:
 
         Parameters
         ------------
-        :param function: function
-            Function to generate the number of interactions.
+        :param function: <optional> function
+            Function to generate the number of interactions. By default InteractionBase.interactionsMany.
         :param populationSize: <optional> np.ndarray
             Population sizes. Default np.array([x for x in range(1, 1000)])
         :param populationMovement: <optional> np.ndarray
@@ -60,12 +82,13 @@ class InteractionBase:
             Population space. Default 400.
         """
         import numpy as np
-        populationSize = kwargs.get('populationSize', np.array([x for x in range(1, 1000)]))
+        populationSize = kwargs.get('populationSize', np.arange(1, 1000))
         populationMovement = kwargs.get('populationMovement', np.linspace(0.01, 0.99, 999))
         populationSpace = kwargs.get('populationSpace', 400)
-        numOfInteractions = np.array([
-            function(size, mov, populationSpace) for size, mov in zip(populationSize, populationMovement)
-        ])
+        if function is None:
+            numOfInteractions = self.interactionsMany(populationSize, populationMovement, populationSpace)
+        else:
+            numOfInteractions = np.vectorize(function)(populationSize, populationMovement, populationSpace)
         self._plot(xAxis=populationSize, yAxis=numOfInteractions, zAxis=populationMovement)
 
     def _plot(self, xAxis: list, zAxis: list, yAxis: list):
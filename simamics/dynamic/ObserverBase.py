@@ -0,0 +1,79 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module defines the interface of the objects that observe a simulation (see
+simamics.dynamic.simulate). An observer is notified before and after each step of every simulated day
+together with the counters returned by the step.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+
+
+class ObserverBase:
+    """
+    Base class of the simulation observers. All the methods do nothing, subclasses override the
+    notifications they need. See Profiler for a detailed example.
+
+    The steps of a day are notified in this order: 'count', 'diagnosis', 'interactions', 'deaths'
+    and 'progression'. The counters received at the end of each step are:
+
+        count: {}
+        diagnosis: {'diagnosed'}
+        interactions: {'contacts', 'attempts', 'infections'}
+        deaths: {'deaths'}
+        progression: {'recovered'}
+
+    Where contacts is the number of interactions that took place, attempts the number of contacts
+    between an infected and a healthy individual and infections the number of attempts that
+    transmitted the virus.
+    """
+    PHASES = ('count', 'diagnosis', 'interactions', 'deaths', 'progression')
+
+    def start(self):
+        """
+        Called before the first day of the simulation.
+        """
+        pass
+
+    def startDay(self, day: int):
+        """
+        Called at the beginning of each day.
+
+        Parameters
+        ------------
+        :param day: int
+            Day of the simulation.
+        """
+        pass
+
+    def startPhase(self, phase: str):
+        """
+        Called before a step of the simulation.
+
+        Parameters
+        ------------
+        :param phase: str
+            Step name (see ObserverBase.PHASES).
+        """
+        pass
+
+    def endPhase(self, phase: str, counters: dict):
+        """
+        Called after a step of the simulation.
+
+        Parameters
+        ------------
+        :param phase: str
+            Step name (see ObserverBase.PHASES).
+        :param counters: dict
+            Counters of the step.
+        """
+        pass
+
+    def finish(self):
+        """
+        Called after the last day of the simulation.
+        """
+        pass
@@ -0,0 +1,136 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module provides an observer (see simamics.dynamic.ObserverBase) that measures the time spent in
+each step of the simulation, the counters of each step and, optionally, the memory allocated. The
+measurements can be exported as a trace file for Chrome/Perfetto trace viewers.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import json
+import time
+import tracemalloc
+from .ObserverBase import ObserverBase
+
+
+class Profiler(ObserverBase):
+    """
+    Observer that records each step of every simulated day. After the simulation the profiler is
+    available as Report.profile.
+
+    Attributes
+    ------------
+    records : list
+        One dictionary per step and day with the keys 'day', 'phase', 'start' (seconds since the
+        start of the simulation), 'duration' (seconds), the counters of the step and 'allocated'
+        (peak bytes allocated during the step, only if memory is True).
+
+    Methods
+    --------
+    totals(): Total time and counters per step.
+
+    toChromeTrace(path): Save the records in the Trace Event format.
+    """
+    def __init__(self, memory: bool = False):
+        """
+        Parameters
+        ------------
+        :param memory: <optional> bool
+            Measure the memory allocated in each step using tracemalloc. It slows down the
+            simulation. Tracing is active during Simulation.run (or the iteration of
+            Simulation.iterate) or, when the days are simulated with Simulation.step, only during
+            each step. Default False.
+        """
+        self.memory = memory
+        self.records = []
+        self._origin = None
+        self._day = None
+        self._phaseStart = None
+        self._memoryStart = None
+        self._tracing = False
+        self._phaseTracing = False
+
+    def start(self):
+        # The records of consecutive runs of the same simulation share the origin
+        if self._origin is None:
+            self._origin = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def startDay(self, day: int):
+        self._day = day
+
+    def startPhase(self, phase: str):
+        if self._origin is None:
+            # Simulation.step() used without Simulation.run()
+            self._origin = time.perf_counter()
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                # Nothing would call finish(), so the tracing is stopped at the end of the step
+                tracemalloc.start()
+                self._phaseTracing = True
+            tracemalloc.reset_peak()
+            self._memoryStart = tracemalloc.get_traced_memory()[0]
+        self._phaseStart = time.perf_counter()
+
+    def endPhase(self, phase: str, counters: dict):
+        end = time.perf_counter()
+        record = dict(day=self._day, phase=phase, start=self._phaseStart - self._origin,
+                      duration=end - self._phaseStart, **counters)
+        if self.memory:
+            record['allocated'] = tracemalloc.get_traced_memory()[1] - self._memoryStart
+            if self._phaseTracing:
+                tracemalloc.stop()
+                self._phaseTracing = False
+        self.records.append(record)
+
+    def finish(self):
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def totals(self):
+        """
+        Return the total time and the sum of the counters of each step.
+
+        Return
+        ---------
+        :return: dict
+            Dictionary with an entry per step (see ObserverBase.PHASES) with the key 'duration' and
+            the counters of the step ('allocated' is the maximum instead of the sum).
+        """
+        totals = {phase: {'duration': 0.0} for phase in self.PHASES}
+        for record in self.records:
+            phaseTotals = totals.setdefault(record['phase'], {'duration': 0.0})
+            for key, value in record.items():
+                if key in ('day', 'phase', 'start'):
+                    continue
+                if key == 'allocated':
+                    phaseTotals[key] = max(phaseTotals.get(key, 0), value)
+                else:
+                    phaseTotals[key] = phaseTotals.get(key, 0) + value
+        return totals
+
+    def toChromeTrace(self, path: str):
+        """
+        Save the records in the Trace Event format (JSON), which can be opened with chrome://tracing
+        or https://ui.perfetto.dev.
+
+        Parameters
+        ------------
+        :param path: str
+            File path.
+        """
+        pid = os.getpid()
+        events = [
+            dict(name=record['phase'], cat='simulate', ph='X', pid=pid, tid=0,
+                 ts=record['start'] * 1e6, dur=record['duration'] * 1e6,
+                 args={key: value for key, value in record.items() if key not in ('phase', 'start', 'duration')})
+            for record in self.records
+        ]
+        with open(path, 'w') as file:
+            json.dump(dict(traceEvents=events, displayTimeUnit='ms'), file)
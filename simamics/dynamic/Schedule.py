@@ -0,0 +1,86 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module defines schedules fixed before the simulation starts: the value of the parameter in
+each day is given as an array, as a piecewise constant function or as a function of the day. The
+values are computed in advance for all the simulated days, so evaluating the schedule in a day only
+reads an array.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from .ScheduleBase import ScheduleBase
+
+
+class Schedule(ScheduleBase):
+    """
+    Schedule that only depends on the day.
+
+    Attributes
+    ------------
+    values : np.ndarray
+        Value of the parameter in each day computed so far.
+
+    Examples
+    ---------
+    Schedule([0.5, 0.5, 0.4, 0.3])          Value of each day, the last value is kept afterwards.
+    Schedule({0: 0.5, 30: 0.1, 60: 0.3})    Lockdown from day 30 to day 59.
+    Schedule(lambda day: 0.5 * 0.99 ** day) Function of the day (or of an array of days).
+    """
+    def __init__(self, values):
+        """
+        Parameters
+        ------------
+        :param values: array-like, dict or function
+            Value of each day (the last one is kept after the end of the array), dictionary with the
+            first day of each value or function that receives the day and returns the value. If the
+            function supports arrays of days it is evaluated once for all the days.
+        """
+        self.function = None
+        if callable(values):
+            self.function = values
+            self.values = np.zeros(0, dtype=np.float64)
+        elif isinstance(values, dict):
+            if len(values) == 0 or min(values) != 0:
+                raise TypeError("A piecewise schedule must define the value of the day 0")
+            days = sorted(values)
+            self.values = np.repeat(np.array([values[day] for day in days], dtype=np.float64),
+                                    np.diff(days + [days[-1] + 1]))
+        else:
+            self.values = np.asarray(values, dtype=np.float64).ravel()
+            if len(self.values) == 0:
+                raise TypeError("A schedule must have at least one value")
+
+    def __repr__(self):
+        return "< Schedule: %s >" % (self.function if self.function is not None else self.values)
+
+    def prepare(self, days: int):
+        """
+        Compute the values of the days that have not been computed yet.
+
+        Parameters
+        ------------
+        :param days: int
+            Number of days.
+        """
+        if self.function is None or days <= len(self.values):
+            return
+        newDays = np.arange(len(self.values), days)
+        try:
+            newValues = np.broadcast_to(np.asarray(self.function(newDays), dtype=np.float64), newDays.shape)
+        except (TypeError, ValueError):
+            # The function does not support arrays
+            newValues = np.array([self.function(int(day)) for day in newDays], dtype=np.float64)
+        self.values = np.concatenate([self.values, newValues])
+
+    def value(self, day: int, report=None):
+        """
+        Return the value of the parameter in a day (see ScheduleBase.value).
+        """
+        if day >= len(self.values):
+            if self.function is None:
+                return self.values[-1]
+            self.prepare(day + 1)
+        return self.values[day]
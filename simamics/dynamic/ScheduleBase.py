@@ -0,0 +1,54 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module defines the interface of the schedules: parameters of a simulation (e.g. the population
+activity) whose value changes from one day to another, for instance to model a lockdown.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+from abc import ABCMeta, abstractmethod
+
+
+class ScheduleBase:
+    """
+    Abstract class that defines the interface of a schedule. See Schedule and Trigger for detailed
+    descriptions.
+
+    A simulation copies its schedules, so a schedule that keeps a state (e.g. Trigger) can be given
+    to several simulations.
+    """
+    __metaclass__ = ABCMeta
+
+    def prepare(self, days: int):
+        """
+        Called before simulating up to a given day so that the schedule can compute its values in
+        advance. By default it does nothing.
+
+        Parameters
+        ------------
+        :param days: int
+            Number of days (the days 0, ..., days - 1 will be simulated).
+        """
+        pass
+
+    @abstractmethod
+    def value(self, day: int, report):
+        """
+        Return the value of the parameter in a day. It is called once per day, after the
+        population of the day has been counted.
+
+        Parameters
+        ------------
+        :param day: int
+            Day of the simulation.
+        :param report: simamics.visualization.Report
+            Report of the simulation, including the counts of the day.
+
+        Return
+        ---------
+        :return: float
+            Value of the parameter.
+        """
+        pass
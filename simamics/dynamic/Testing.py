@@ -0,0 +1,131 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module defines the testing policy of a simulation: the maximum number of tests that can be
+performed each day, the order in which the symptomatic individuals waiting for a test are tested and
+the random testing of the population, which allows to diagnose asymptomatic individuals.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+
+
+class Testing:
+    """
+    Testing policy used in the diagnosis step of a simulation (see simamics.dynamic.simulate).
+
+    Each day the number of tests requested by the symptomatic individuals is the percentage of test
+    of the simulation times the number of undiagnosed infected individuals, as without a testing
+    policy, but it is limited by the capacity. The undiagnosed symptomatic individuals wait in a
+    queue and are tested in one of the following orders:
+
+        'index': order of the population, as without a testing policy.
+        'fifo': the individuals infected first are tested first.
+        'priority': severe, mild and light cases, each of them in 'fifo' order.
+
+    In addition, a fraction of the population is tested at random every day among the undiagnosed
+    individuals without symptoms (healthy, asymptomatic and immunized); the asymptomatic individuals
+    tested are diagnosed.
+
+    Attributes
+    ------------
+    capacity : int
+        Maximum number of tests per day of the queue (None for no limit).
+
+    order : str
+        Order of the queue.
+
+    randomTesting : float
+        Fraction of the population tested at random each day.
+    """
+    ORDERS = ('index', 'fifo', 'priority')
+
+    def __init__(self, capacity: int = None, order: str = 'fifo', randomTesting: float = 0.0):
+        """
+        Parameters
+        ------------
+        :param capacity: <optional> int
+            Maximum number of tests per day given to the symptomatic individuals. By default there is
+            no limit.
+        :param order: <optional> str
+            Order in which the symptomatic individuals are tested (see Testing.ORDERS). Default 'fifo'.
+        :param randomTesting: <optional> float
+            Fraction of the population tested at random each day. Default 0.
+        """
+        if order not in self.ORDERS:
+            raise TypeError("Unknown order %s, available orders: %s" % (order, ', '.join(self.ORDERS)))
+        if capacity is not None and capacity < 0:
+            raise TypeError("The test capacity cannot be negative")
+        if not 0 <= randomTesting <= 1:
+            raise TypeError("The fraction of the population tested at random must be between 0 and 1")
+        self.capacity = capacity
+        self.order = order
+        self.randomTesting = randomTesting
+
+    def __repr__(self):
+        return "< Testing: capacity: %s; order: %s; random testing: %.4f >" % (self.capacity, self.order,
+                                                                               self.randomTesting)
+
+    def numberOfTests(self, population, diagnosisPercentage: float):
+        """
+        Return the number of tests given to the symptomatic individuals in a day.
+
+        Parameters
+        ------------
+        :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+            Population.
+        :param diagnosisPercentage: float
+            Percentage of test.
+
+        Return
+        ---------
+        :return: int
+            Number of tests.
+        """
+        numberOfTests = int(diagnosisPercentage * population.infectedWithoutDiagnosis)
+        return numberOfTests if self.capacity is None else min(numberOfTests, int(self.capacity))
+
+    def numberOfRandomTests(self, population):
+        """
+        Return the number of random tests performed in a day.
+
+        Parameters
+        ------------
+        :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+            Population.
+
+        Return
+        ---------
+        :return: int
+            Number of tests.
+        """
+        return int(self.randomTesting * sum(population.detailedCases.values()))
+
+    def randomlyDiagnosed(self, population, numAsymptomatic: int, rng):
+        """
+        Return how many undiagnosed asymptomatic individuals are detected by the random tests of a
+        day. The tests are performed without replacement among the undiagnosed individuals without
+        symptoms (hypergeometric distribution).
+
+        Parameters
+        ------------
+        :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+            Population.
+        :param numAsymptomatic: int
+            Number of undiagnosed asymptomatic individuals.
+        :param rng: numpy.random.Generator
+            Random number generator.
+
+        Return
+        ---------
+        :return: int
+            Number of asymptomatic individuals diagnosed.
+        """
+        numTests = self.numberOfRandomTests(population)
+        if numTests == 0 or numAsymptomatic == 0:
+            return 0
+        cases = population.detailedCases
+        withoutSymptoms = cases['healthy'] + cases['immunized']
+        return int(rng.hypergeometric(numAsymptomatic, withoutSymptoms,
+                                      min(numTests, numAsymptomatic + withoutSymptoms)))
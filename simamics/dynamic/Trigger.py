@@ -0,0 +1,106 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module defines schedules that react to the state of the simulation, e.g. reduce the population
+activity when the number of diagnosed cases exceeds a threshold and restore it when it falls below
+another one.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+from numbers import Number
+from ..visualization import Report
+from .ScheduleBase import ScheduleBase
+from .Schedule import Schedule
+
+
+class Trigger(ScheduleBase):
+    """
+    Schedule with two values, the one used while the trigger is inactive and the one used while it
+    is active. The trigger is activated the first day a statistic of the report (see Report.COLUMNS)
+    is above a threshold and deactivated the first day it is below another one. The simulation
+    works with a copy of the trigger, its state is available in the attribute of the simulation
+    (e.g. Simulation.populationActivity.switches).
+
+    Attributes
+    ------------
+    statistic : str
+        Statistic of the report.
+
+    above : float
+        The trigger is activated when the statistic is greater than this value.
+
+    below : float
+        The trigger is deactivated when the statistic is lower than this value (None if it is never
+        deactivated).
+
+    active : bool
+        Whether the trigger is active.
+
+    switches : list
+        Days in which the trigger has been activated or deactivated.
+
+    Examples
+    ---------
+    Trigger(0.5, 0.1, 'diagnosed', above=500, below=100)
+        Activity of 0.5 that is reduced to 0.1 while the number of diagnosed cases is high.
+    """
+    def __init__(self, inactiveValue, activeValue, statistic: str, above: float, below: float = None):
+        """
+        Parameters
+        ------------
+        :param inactiveValue: float or simamics.dynamic.ScheduleBase
+            Value while the trigger is inactive (a number or a schedule).
+        :param activeValue: float or simamics.dynamic.ScheduleBase
+            Value while the trigger is active (a number or a schedule).
+        :param statistic: str
+            Statistic of the report (see simamics.visualization.Report.COLUMNS). The value of the
+            current day is used, except for deaths which are only known for the previous days.
+        :param above: float
+            Threshold that activates the trigger.
+        :param below: <optional> float
+            Threshold that deactivates the trigger. By default the trigger remains active.
+        """
+        if statistic not in Report.COLUMNS:
+            raise TypeError("Unknown statistic %s, available statistics: %s" % (statistic, ', '.join(Report.COLUMNS)))
+        if below is not None and below > above:
+            raise TypeError("The deactivation threshold must not be greater than the activation threshold")
+        self.inactiveValue = inactiveValue if isinstance(inactiveValue, (Number, ScheduleBase)) \
+            else Schedule(inactiveValue)
+        self.activeValue = activeValue if isinstance(activeValue, (Number, ScheduleBase)) else Schedule(activeValue)
+        self.statistic = statistic
+        self.above = above
+        self.below = below
+        self.active = False
+        self.switches = []
+
+    def __repr__(self):
+        return "< Trigger: %s > %s%s >" % (self.statistic, self.above,
+                                          "" if self.below is None else "; %s < %s" % (self.statistic, self.below))
+
+    def prepare(self, days: int):
+        """
+        Prepare the schedules of both values (see ScheduleBase.prepare).
+        """
+        for value in (self.inactiveValue, self.activeValue):
+            if isinstance(value, ScheduleBase):
+                value.prepare(days)
+
+    def value(self, day: int, report):
+        """
+        Update the state of the trigger with the last value of the statistic and return the value of
+        the parameter in a day (see ScheduleBase.value).
+        """
+        # The deaths of the current day are recorded after the parameters are evaluated (see Report.recordDeaths)
+        values = report.deaths if self.statistic == 'deaths' else report.columns[self.statistic]
+        if len(values) > 0:
+            observed = values[-1]
+            if not self.active and observed > self.above:
+                self.active = True
+                self.switches.append(day)
+            elif self.active and self.below is not None and observed < self.below:
+                self.active = False
+                self.switches.append(day)
+        value = self.activeValue if self.active else self.inactiveValue
+        return value.value(day, report) if isinstance(value, ScheduleBase) else value
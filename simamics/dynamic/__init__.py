@@ -1,5 +1,19 @@
 from simamics.dynamic.InteractionBase import InteractionBase
 from simamics.dynamic.Interaction import Interaction
-from simamics.dynamic.dynamic import simulate
+from simamics.dynamic.ObserverBase import ObserverBase
+from simamics.dynamic.Profiler import Profiler
+from simamics.dynamic.ScheduleBase import ScheduleBase
+from simamics.dynamic.Schedule import Schedule
+from simamics.dynamic.Trigger import Trigger
+from simamics.dynamic.Testing import Testing
+from simamics.dynamic.EarlyStop import EarlyStop
+from simamics.dynamic.dynamic import Simulation, simulate, resume
+from simamics.dynamic.streaming import simulateIter, simulateAsync
+from simamics.dynamic.ensemble import simulateEnsemble
+from simamics.dynamic.sweep import sweep
+from simamics.dynamic.metapopulation import simulateMetapopulation
+from simamics.dynamic.branches import simulateBranches
 
-__all__ = ['Interaction', 'InteractionBase', 'simulate']
+__all__ = ['Interaction', 'InteractionBase', 'ObserverBase', 'Profiler', 'ScheduleBase', 'Schedule', 'Trigger',
+           'Testing', 'EarlyStop', 'Simulation', 'simulate', 'resume', 'simulateIter', 'simulateAsync',
+           'simulateEnsemble', 'sweep', 'simulateMetapopulation', 'simulateBranches']
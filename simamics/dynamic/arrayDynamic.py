@@ -0,0 +1,280 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module implements the simulation steps (see simamics.dynamic.dynamic) for populations stored
+as arrays (see simamics.population.ArrayPopulation). Individuals are referenced by their index in
+the population arrays and their states by the integer codes defined in ArrayPopulation.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from ..population.ArrayPopulation import *
+from ..pathogen import Virus
+
+# Number of batches in which each interaction round is resolved (see _generateInteractions)
+_BATCHES_PER_ROUND = 16
+
+
+def _infectMany(population: ArrayPopulation, indices: np.ndarray, virus: Virus, rng):
+    """
+    Function that tries to infect a group of individuals using a virus. The same individual can
+    appear several times (one per contact with an infected individual), in that case each contact
+    is an independent infection attempt.
+
+    Parameters
+    ------------
+    :param population: simamics.population.ArrayPopulation
+        Population.
+    :param indices: np.ndarray
+        Indices of the individuals exposed to the virus.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    -------
+    :return: tuple
+        Number of infection attempts (contacts with healthy individuals) and indices (sorted) of the
+        infected individuals.
+    """
+    # If the individual has passed the infection or is infected they cannot be infected again
+    indices = indices[population.states[indices] == HEALTHY]
+    codes = virus.infections(len(indices), rng)
+    transmitted = codes != HEALTHY
+    # The state of an individual infected several times is given by the first infection
+    indices, firstInfection = np.unique(indices[transmitted], return_index=True)
+    population.setState(indices, codes[transmitted][firstInfection])
+    return len(codes), indices
+
+
+def _kill(population: ArrayPopulation, virus: Virus, rng):
+    """
+    Function that kill severe individuals based on virus death rate.
+
+    Parameters
+    -------------
+    :param population: simamics.population.ArrayPopulation
+        Population.
+    :param virus:  simamics.pathogen.Virus
+        Virus
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: int
+        Number of death individuals.
+    """
+    infected = population.infectedIndices()
+    severe = np.sort(infected[population.states[infected] == SYMPTOMATIC_SEVERE])
+    deathIndividuals = severe[rng.random(len(severe)) <= virus.deathRate]
+    population.removeMany(deathIndividuals)
+    return len(deathIndividuals)
+
+
+def _generateInteractions(population: ArrayPopulation, virus: Virus, populationActivity: float, interaction, rng):
+    """
+    Function that simulates the interactions between individuals in the population. In each round
+    every individual contacts a random individual (selected by the contact structure of the
+    population, if any); all partners and acceptance probabilities of a
+    round are drawn at once and the infections are resolved with masked operations. As in the loop
+    over individuals of simamics.dynamic.dynamic, individuals infected early in a round can transmit
+    the virus later in the same round: the round is resolved in _BATCHES_PER_ROUND consecutive
+    batches and the states are updated after each batch.
+
+    Parameters
+    ------------
+    :param interaction: Interaction
+        Interaction.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param population: simamics.population.ArrayPopulation
+        Population.
+    :param populationActivity: float
+        Population activity.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: tuple
+        Number of contacts, number of contacts between an infected and a healthy individual and
+        number of infections.
+    """
+    size = len(population)
+    numOfInteractions = interaction.interactions(size, populationActivity, population.space)
+    bounds = np.linspace(0, size, min(size, _BATCHES_PER_ROUND) + 1).astype(int)
+    contacts, attempts, infections = 0, 0, 0
+    for n in range(numOfInteractions):
+        # Probability of two individuals interact
+        if population.contacts is None:
+            randomIndividuals = rng.integers(0, size, size)
+        else:
+            randomIndividuals = population.contacts.sample(np.arange(size), rng)
+        acceptance = rng.random(size)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            capacity = population.interactionCapacity
+            # Individuals without contacts (-1) do not interact
+            interacted = (capacity[start:end] * capacity[randomIndividuals[start:end]] > acceptance[start:end]) & \
+                         (randomIndividuals[start:end] >= 0)
+            # As in simamics.dynamic.dynamic the infection is transmitted from the individual to the
+            # random individual
+            contagious = interacted & isInfected(population.states[start:end])
+            batchAttempts, batchInfected = _infectMany(population, randomIndividuals[start:end][contagious],
+                                                       virus, rng)
+            contacts += int(np.count_nonzero(interacted))
+            attempts += batchAttempts
+            infections += len(batchInfected)
+
+    return contacts, attempts, infections
+
+
+def _generateInfectedInteractions(population: ArrayPopulation, virus: Virus, populationActivity: float,
+                                  interaction, rng):
+    """
+    Function that simulates the interactions between individuals in the population drawing only the
+    contacts of the infected individuals, which are the only ones that can transmit the virus (see
+    _generateInteractions). In each round every infected individual contacts a random individual
+    (selected by the contact structure of the population, if any) that accepts the contact with
+    probability given by the product of their interaction capacities, as in _generateInteractions,
+    so the cost of a day depends on the number of infected individuals instead of the population
+    size. The rounds are resolved in the same batches, so individuals infected early in a round can
+    also transmit the virus later in the same round.
+
+    The contacts between individuals that are not infected are not simulated: their number is drawn
+    from a Poisson distribution with the expected value of _generateInteractions.
+
+    Parameters
+    ------------
+    :param interaction: Interaction
+        Interaction.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param population: simamics.population.ArrayPopulation
+        Population.
+    :param populationActivity: float
+        Population activity.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: tuple
+        Number of contacts, number of contacts between an infected and a healthy individual and
+        number of infections.
+    """
+    size = len(population)
+    numOfInteractions = interaction.interactions(size, populationActivity, population.space)
+    bounds = np.linspace(0, size, min(size, _BATCHES_PER_ROUND) + 1).astype(int)
+    contacts, attempts, infections = 0, 0, 0
+    for n in range(numOfInteractions):
+        infected = np.sort(population.infectedIndices())
+        # Expected contacts of the individuals that are not infected
+        totalCapacity = population.totalCapacity
+        infectedCapacity = float(population.interactionCapacity[infected].sum(dtype=np.float64))
+        contacts += int(rng.poisson(max(totalCapacity - infectedCapacity, 0) * totalCapacity / size))
+        # Individuals infected in the round (they are sources in the following batches)
+        newInfected = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            first, last = np.searchsorted(infected, [start, end])
+            sources = infected[first:last]
+            if newInfected:
+                newSources = np.concatenate(newInfected)
+                sources = np.sort(np.concatenate([sources, newSources[(newSources >= start) & (newSources < end)]]))
+            if len(sources) == 0:
+                continue
+            if population.contacts is None:
+                randomIndividuals = rng.integers(0, size, len(sources))
+            else:
+                randomIndividuals = population.contacts.sample(sources, rng)
+            capacity = population.interactionCapacity
+            # Individuals without contacts (-1) do not interact
+            interacted = (capacity[sources] * capacity[randomIndividuals] > rng.random(len(sources))) & \
+                         (randomIndividuals >= 0)
+            batchAttempts, batchInfected = _infectMany(population, randomIndividuals[interacted], virus, rng)
+            newInfected.append(batchInfected[batchInfected >= end])
+            contacts += int(np.count_nonzero(interacted))
+            attempts += batchAttempts
+            infections += len(batchInfected)
+
+    return contacts, attempts, infections
+
+
+def _increment(population: ArrayPopulation, virus: Virus, rng):
+    """
+    Function that advances the number of days that patients have been infected. The life time of the
+    new infections is drawn from the virus (see Virus.lifeTimes) and their recovery is scheduled in
+    the calendar queue of the population, so only the individuals that recover are processed.
+
+    Parameters
+    -------------
+    :param population: simamics.population.ArrayPopulation
+        Population.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: int
+        Number of recovered individuals.
+    """
+    newInfected = population.unscheduledInfected()
+    population.scheduleRecovery(newInfected, virus.lifeTimes(len(newInfected), rng))
+    population.daysInfected[population.infectedIndices()] += 1
+    recovered = population.dueRecoveries()
+    population.setState(recovered, IMMUNIZED)
+    return len(recovered)
+
+
+def _diagnosingPopulation(population: ArrayPopulation, diagnosisPercentage: float, testing=None, rng=None):
+    """
+    Function that performs the diagnosis. If the individual is diagnosed their mobility is
+    drastically reduced to 0.01. The candidates are selected from the indices of the infected
+    individuals (see ArrayPopulation.infectedIndices), so the cost is proportional to the number of
+    infected individuals and not to the population size.
+
+    Parameters
+    ------------
+    :param population: simamics.population.ArrayPopulation
+        Population
+    :param diagnosisPercentage: float
+        Percentage of test.
+    :param testing: <optional> simamics.dynamic.Testing
+        Testing policy. By default the undiagnosed symptomatic individuals are tested in the order
+        of the population.
+    :param rng: <optional> numpy.random.Generator
+        Random number generator (only used by the random tests of the testing policy).
+
+    Return
+    ---------
+    :return: int
+        Number of diagnosed individuals.
+    """
+    # Undiagnosed infected individuals in order of infection
+    infected = population.infectedIndices()
+    infected = infected[~population.diagnosed[infected]]
+    states = population.states[infected]
+    symptomatic = infected[isSymptomatic(states)]
+    if testing is None or testing.order == 'index':
+        symptomatic = np.sort(symptomatic)
+    elif testing.order == 'priority':
+        symptomatic = symptomatic[np.argsort(-population.states[symptomatic], kind='stable')]
+
+    if testing is None:
+        candidates = symptomatic[:int(diagnosisPercentage * population.infectedWithoutDiagnosis)]
+    else:
+        candidates = symptomatic[:testing.numberOfTests(population, diagnosisPercentage)]
+        asymptomatic = infected[states == ASYMPTOMATIC]
+        numRandom = testing.randomlyDiagnosed(population, len(asymptomatic), rng)
+        if numRandom > 0:
+            candidates = np.concatenate([candidates, rng.choice(asymptomatic, numRandom, replace=False)])
+    # Diagnosed individual
+    population.setDiagnosed(candidates)
+    # Reduce the interaction capacity
+    population.interactionCapacity[candidates] = DIAGNOSED_CAPACITY
+    return len(candidates)
@@ -0,0 +1,94 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module continues a simulation (see simamics.dynamic.Simulation) with several sets of
+parameters, e.g. different interventions from the same day of the epidemic, without simulating the
+common days again. The branches are run in a pool of processes that inherit the state of the
+simulation (copy-on-write when the 'fork' start method is available).
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import numpy as np
+from .parallel import _getJob, _map
+
+# Parameters of a branch that are passed to Simulation.fork, the rest are Virus parameters
+SIMULATION_PARAMETERS = ('populationActivity', 'diagnosisPercentage', 'transmissionPercentage', 'interaction',
+                         'testing', 'sampling')
+
+
+def _runBranch(task: tuple):
+    """
+    Function that runs a branch of the simulation stored in the worker process.
+
+    Parameters
+    ------------
+    :param task: tuple
+        Branch index and random number generator of the branch (None to use the generator of the
+        simulation).
+
+    Return
+    ---------
+    :return: simamics.visualization.Report
+        Report of the branch.
+    """
+    branchIdx, rng = task
+    job = _getJob()
+    simulation = job['simulation']
+    parameters = job['branches'][branchIdx]
+    virusChanges = {name: value for name, value in parameters.items() if name not in SIMULATION_PARAMETERS}
+    branch = simulation.fork(virus=simulation.virus.copy(**virusChanges) if virusChanges else None, rng=rng,
+                             **{name: value for name, value in parameters.items() if name in SIMULATION_PARAMETERS})
+    return branch.run(job['iterations'], verbose=False)
+
+
+def simulateBranches(simulation, branches: list, iterations: int, workers: int = None, seed: int = None):
+    """
+    Function that continues a simulation with each set of parameters of a list and returns the
+    report of each branch (see Simulation.fork). The simulation is not modified.
+
+    The days already simulated are shared by all the branches: each worker process inherits the
+    state of the simulation and only copies the population when a branch starts. When the platform
+    does not support the 'fork' start method (e.g. Windows) the simulation is pickled instead.
+
+    By default all the branches use the same random numbers as the simulation (common random
+    numbers), so the differences between branches are only due to their parameters. If a seed is
+    given each branch uses an independent seed derived from it.
+
+    Parameters
+    ------------
+    :param simulation: simamics.dynamic.Simulation
+        Simulation advanced to the day where the branches start.
+    :param branches: list
+        Dictionary with the parameters of each branch: populationActivity, diagnosisPercentage,
+        transmissionPercentage (numbers or schedules, see simamics.dynamic.Schedule), interaction,
+        testing (see simamics.dynamic.Testing), sampling and any other parameter of the virus (see
+        simamics.pathogen.Virus). The parameters that are not given keep the value of the
+        simulation.
+    :param iterations: int
+        Number of days simulated by each branch after the fork.
+    :param workers: <optional> int
+        Number of processes. Default os.cpu_count().
+    :param seed: <optional> int
+        Seed of the branches. By default the generator of the simulation is copied.
+
+    Return
+    ---------
+    :return: list
+        Report of each branch, including the days simulated before the fork (see
+        simamics.visualization.Report).
+    """
+    if len(branches) == 0:
+        return []
+    for parameters in branches:
+        for parameter in parameters:
+            if parameter not in SIMULATION_PARAMETERS and parameter not in simulation.virus.parameters:
+                raise TypeError("%s is not a simulation or Virus parameter" % parameter)
+
+    rngs = [None] * len(branches) if seed is None else \
+        [np.random.default_rng(branchSeed) for branchSeed in np.random.SeedSequence(seed).spawn(len(branches))]
+    job = dict(simulation=simulation, branches=branches, iterations=iterations)
+    workers = max(1, min(workers or os.cpu_count(), len(branches)))
+    return _map(_runBranch, job, list(enumerate(rngs)), workers)
@@ -0,0 +1,213 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module saves the state of a simulation (see simamics.dynamic.Simulation) to disk so that it can
+be resumed later, e.g. after the process has been interrupted, or used as the starting point of
+several scenarios. A checkpoint is a directory with the following files:
+
+    meta.json       Day, simulation parameters, virus parameters, scalar attributes of the population
+                    and state of the random number generator.
+    schedules.pkl   Parameters given as schedules (if any), pickled with their state.
+    population/     An .npy file per array of the population.
+    contacts/       An .npy file per array of the contact structure (if any).
+    report.npz      Statistics of the simulated days.
+
+The .npy files can be memory-mapped when the checkpoint is loaded, so large populations are not read
+until they are used.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import json
+import shutil
+import pickle
+import numpy as np
+from ..population import Population, ArrayPopulation, CompartmentalPopulation, ContactGraph, SpatialGrid
+from ..population.ArrayPopulation import _saveArrays, _loadArrays
+from ..pathogen import Virus
+from ..visualization import Report
+from ..rng import getState, fromState
+from .Interaction import Interaction
+from .Testing import Testing
+
+# Population and contact structure types that can be saved
+POPULATION_TYPES = {cls.__name__: cls for cls in (Population, ArrayPopulation, CompartmentalPopulation)}
+CONTACT_TYPES = {cls.__name__: cls for cls in (ContactGraph, SpatialGrid)}
+
+# Parameters of the simulation that can be schedules (see simamics.dynamic.ScheduleBase)
+PARAMETERS = ('populationActivity', 'diagnosisPercentage', 'transmissionPercentage')
+
+# Version of the checkpoint format
+VERSION = 1
+
+
+def _toJson(value):
+    """
+    Convert NumPy scalars to Python numbers.
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _copy(population):
+    """
+    Function that copies a population (and its contact structure) through the same arrays that are
+    saved in a checkpoint, without copying every individual object.
+
+    Parameters
+    ------------
+    :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+        Population.
+
+    Return
+    ---------
+    :return: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+        Copy of the population.
+    """
+    attributes, arrays = population._toArrays()
+    arrays = {name: np.array(values) for name, values in arrays.items()}
+    if not isinstance(population, ArrayPopulation):
+        return type(population)._fromArrays(attributes, arrays)
+    contacts = population.contacts.copy() if population.contacts is not None else None
+    return ArrayPopulation._fromArrays(attributes, arrays, contacts=contacts)
+
+
+def _save(simulation, path: str):
+    """
+    Function that saves the state of a simulation in a checkpoint directory. The checkpoint is first
+    written to a temporary directory that replaces the previous checkpoint once it is complete, so
+    an interruption while saving does not corrupt it.
+
+    Parameters
+    ------------
+    :param simulation: simamics.dynamic.Simulation
+        Simulation.
+    :param path: str
+        Checkpoint directory.
+    """
+    population = simulation.population
+    if type(population).__name__ not in POPULATION_TYPES:
+        raise TypeError("Populations of type %s cannot be saved" % type(population).__name__)
+    contacts = getattr(population, 'contacts', None)
+    if contacts is not None and type(contacts).__name__ not in CONTACT_TYPES:
+        raise TypeError("Contact structures of type %s cannot be saved" % type(contacts).__name__)
+    interaction = simulation.interaction
+    attributes, arrays = population._toArrays()
+    parameters = {name: getattr(simulation, name) for name in PARAMETERS}
+    schedules = {name: value for name, value in parameters.items() if value is not None and not np.isscalar(value)}
+    try:
+        schedules = pickle.dumps(schedules) if schedules else None
+    except (pickle.PicklingError, AttributeError, TypeError):
+        raise TypeError("Schedules defined with a function that is not defined at module level cannot be saved")
+    meta = dict(version=VERSION, day=simulation.day,
+                **{name: None if value is None or not np.isscalar(value) else _toJson(value)
+                   for name, value in parameters.items()},
+                virus=simulation.virus.parameters,
+                interaction=interaction.expression if isinstance(interaction, Interaction) else None,
+                numexpr=interaction.numexpr if isinstance(interaction, Interaction) else False,
+                testing=None if simulation.testing is None else dict(
+                    capacity=_toJson(simulation.testing.capacity), order=simulation.testing.order,
+                    randomTesting=_toJson(simulation.testing.randomTesting)),
+                sampling=simulation.sampling,
+                jit=simulation.jit,
+                rng=getState(simulation.rng),
+                population=dict(type=type(population).__name__,
+                                attributes={name: _toJson(value) for name, value in attributes.items()}),
+                contacts=None)
+
+    path = os.path.normpath(path)
+    temporaryPath, previousPath = path + '.tmp', path + '.old'
+    for stalePath in (temporaryPath, previousPath):
+        if os.path.exists(stalePath):
+            shutil.rmtree(stalePath)
+    os.makedirs(temporaryPath)
+    _saveArrays(os.path.join(temporaryPath, 'population'), arrays)
+    if contacts is not None:
+        contactAttributes, contactArrays = contacts._toArrays()
+        meta['contacts'] = dict(type=type(contacts).__name__,
+                                attributes={name: _toJson(value) for name, value in contactAttributes.items()})
+        _saveArrays(os.path.join(temporaryPath, 'contacts'), contactArrays)
+    simulation.report.toNpz(os.path.join(temporaryPath, 'report.npz'))
+    if schedules is not None:
+        with open(os.path.join(temporaryPath, 'schedules.pkl'), 'wb') as file:
+            file.write(schedules)
+    with open(os.path.join(temporaryPath, 'meta.json'), 'w') as file:
+        json.dump(meta, file)
+
+    if os.path.exists(path):
+        os.rename(path, previousPath)
+    os.rename(temporaryPath, path)
+    if os.path.exists(previousPath):
+        shutil.rmtree(previousPath)
+
+
+def _load(cls, path: str, virus: Virus = None, interaction=None, writer=None, observer=None, mmap: bool = True):
+    """
+    Function that builds a simulation from a checkpoint directory (see _save).
+
+    Parameters
+    ------------
+    :param cls: type
+        Simulation class.
+    :param path: str
+        Checkpoint directory.
+    :param virus: <optional> simamics.pathogen.Virus
+        Virus. By default the virus is built with the saved parameters.
+    :param interaction: <optional> Interaction
+        Interaction function. Required if the simulation did not use an Interaction defined by a
+        string expression.
+    :param writer: <optional> simamics.visualization.ReportWriter
+        Writer where the following days are written.
+    :param observer: <optional> simamics.dynamic.ObserverBase
+        Observer of the following days.
+    :param mmap: <optional> bool
+        Memory-map the population arrays. Default True.
+
+    Return
+    ---------
+    :return: simamics.dynamic.Simulation
+    """
+    metaFile = os.path.join(path, 'meta.json')
+    if not os.path.exists(metaFile):
+        raise TypeError("%s is not a simulation checkpoint" % path)
+    with open(metaFile) as file:
+        meta = json.load(file)
+    if meta['version'] != VERSION:
+        raise TypeError("Unsupported checkpoint version %s" % meta['version'])
+    if interaction is None:
+        if meta['interaction'] is None:
+            raise TypeError("The simulation was saved with an interaction function, it must be provided to "
+                            "resume it")
+        interaction = Interaction(meta['interaction'], numexpr=meta['numexpr'])
+
+    contacts = None
+    if meta['contacts'] is not None:
+        contacts = CONTACT_TYPES[meta['contacts']['type']]._fromArrays(
+            meta['contacts']['attributes'], _loadArrays(os.path.join(path, 'contacts'), mmap))
+    populationType = POPULATION_TYPES[meta['population']['type']]
+    arrays = _loadArrays(os.path.join(path, 'population'), mmap and populationType is ArrayPopulation)
+    if populationType is ArrayPopulation:
+        population = populationType._fromArrays(meta['population']['attributes'], arrays, contacts=contacts)
+    else:
+        population = populationType._fromArrays(meta['population']['attributes'], arrays)
+
+    with np.load(os.path.join(path, 'report.npz')) as reportFile:
+        report = Report.fromColumns(dict(reportFile), writer=writer)
+
+    parameters = {name: meta.get(name) for name in PARAMETERS}
+    schedulesFile = os.path.join(path, 'schedules.pkl')
+    if os.path.exists(schedulesFile):
+        with open(schedulesFile, 'rb') as file:
+            parameters.update(pickle.load(file))
+
+    simulation = cls(population, virus if virus is not None else Virus(**meta['virus']),
+                     parameters['populationActivity'], parameters['diagnosisPercentage'], interaction,
+                     rng=fromState(meta['rng']), observer=observer,
+                     transmissionPercentage=parameters['transmissionPercentage'],
+                     testing=None if meta.get('testing') is None else Testing(**meta['testing']),
+                     sampling=meta.get('sampling', 'population'), jit=meta.get('jit'))
+    report.profile = simulation.report.profile
+    simulation.report = report
+    simulation.day = meta['day']
+    return simulation
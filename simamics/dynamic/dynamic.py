@@ -9,16 +9,39 @@ on the variables following variables: population size, population activity and s
 Author: Fernando García Gutiérrez
 Email: fernando.garciagu@upm.es
 """
-import random
+import copy
+from numbers import Number
 from tqdm import tqdm
 from ..visualization import Report
-from ..population import Population, Individual
+from ..population import Population, ArrayPopulation, CompartmentalPopulation, Individual
 from ..pathogen import Virus
 from ..states import *
+from ..rng import makeRng, getState, fromState
 from .InteractionBase import InteractionBase
+from .ObserverBase import ObserverBase
+from .ScheduleBase import ScheduleBase
+from .Schedule import Schedule
+from .Testing import Testing
+from . import arrayDynamic, jitDynamic, tauLeaping, checkpoint as _checkpoint
 
+# Simulation engines that can be selected in simulate()
+ENGINES = ('agent', 'tauLeaping')
 
-def _infect(individual: Individual, virus: Virus):
+# Individuals whose contacts are drawn in each interaction round (see simulate)
+SAMPLINGS = ('population', 'infected')
+
+# Counters notified to the observers at the end of each step (see ObserverBase) from the value
+# returned by the step
+_COUNTERS = {
+    'count': lambda result: {},
+    'diagnosis': lambda numDiagnosed: dict(diagnosed=numDiagnosed),
+    'interactions': lambda result: dict(zip(('contacts', 'attempts', 'infections'), result)),
+    'deaths': lambda numDeaths: dict(deaths=numDeaths),
+    'progression': lambda numRecovered: dict(recovered=numRecovered),
+}
+
+
+def _infect(individual: Individual, virus: Virus, rng):
     """
     Function that infect an individual using a virus.
 
@@ -28,6 +51,8 @@ def _infect(individual: Individual, virus: Virus):
         Individual
     :param virus: simamics.pathogen.Virus
         Virus.
+    :param rng: numpy.random.Generator
+        Random number generator.
 
     Return
     -------
@@ -35,13 +60,13 @@ def _infect(individual: Individual, virus: Virus):
         Individual
     """
     # If the individual has passed the infection or is infected they cannot be infected again
-    if not isinstance(individual.state, Immunized) and not individual.state == Infected():
-        individual.state = virus.infect
+    if individual.state.tag == HEALTHY:
+        individual.state = virus.infection(rng)
 
     return individual
 
 
-def _kill(population: Population, virus: Virus):
+def _kill(population: Population, virus: Virus, rng):
     """
     Function that kill severe individuals based on virus death rate.
 
@@ -51,25 +76,25 @@ def _kill(population: Population, virus: Virus):
         Population.
     :param virus:  simamics.pathogen.Virus
         Virus
+    :param rng: numpy.random.Generator
+        Random number generator.
 
     Return
     ---------
     :return: int
         Number of death individuals.
     """
-    deathIndividuals = 0
-    for n, individual in enumerate(population.population):
-        if individual.state == SymptomaticSevere():
-            if virus.deathRate >= random.uniform(0, 1):
-                # Remove individual from population
-                population.remove(n)
-                deathIndividuals += 1
-    return deathIndividuals
+    severe = [n for n, individual in enumerate(population.population) if individual.state.tag == SYMPTOMATIC_SEVERE]
+    deathIndividuals = [n for n, randomNum in zip(severe, rng.random(len(severe))) if virus.deathRate >= randomNum]
+    # Remove individuals from population once all the severe individuals have been evaluated
+    population.removeMany(deathIndividuals)
+    return len(deathIndividuals)
 
 
-def _generateInteractions(population: Population, virus: Virus, populationActivity: float, interaction):
+def _generateInteractions(population: Population, virus: Virus, populationActivity: float, interaction, rng):
     """
-    Function that simulates the interactions between individuals in the population.
+    Function that simulates the interactions between individuals in the population. The random
+    individuals and the interaction probabilities of each round are drawn at once.
 
     Parameters
     ------------
@@ -81,46 +106,85 @@ def _generateInteractions(population: Population, virus: Virus, populationActivi
         Population.
     :param populationActivity: float
         Population activity.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: tuple
+        Number of contacts, number of contacts between an infected and a healthy individual and
+        number of infections.
     """
-    numOfInteractions = interaction.interactions(len(population.population), populationActivity, population.space)
+    size = len(population.population)
+    numOfInteractions = interaction.interactions(size, populationActivity, population.space)
+    contacts, attempts, infections = 0, 0, 0
     for n in range(numOfInteractions):
-        for individual in population.population:
+        randomIndividuals = rng.integers(0, size, size).tolist()
+        randomNums = rng.random(size).tolist()
+        for individual, randomIndividual, randomNum in zip(population.population, randomIndividuals, randomNums):
             # Probability of two individuals interact
-            randomIndividual = random.randrange(0, len(population.population))
-            interactionProb = individual.state.interactionCapacity * \
-                              population.population[randomIndividual].state.interactionCapacity
-
-            if interactionProb > random.uniform(0, 1):
-                if population.population[randomIndividual].state == Infected() and individual == Healthy():
-                    # Individual if infected by random individual in population
-                    _infect(individual, virus)
-                elif individual.state == Infected() and population.population[randomIndividual].state == Healthy():
+            interactionProb = individual.interactionCapacity * \
+                              population.population[randomIndividual].interactionCapacity
+
+            if interactionProb > randomNum:
+                contacts += 1
+                # Only the individual that starts the contact transmits the virus: the original check of the
+                # reverse direction compared an individual with a state and never matched (same rule in all engines)
+                if individual.state.infected and population.population[randomIndividual].state.tag == HEALTHY:
                     # Random individual is infected by individual
-                    _infect(population.population[randomIndividual], virus)
+                    attempts += 1
+                    infections += _infect(population.population[randomIndividual], virus, rng).state.infected
+
+    return contacts, attempts, infections
 
 
-def _increment(population: Population, virusLifeTime: int):
+def _increment(population: Population, virus: Virus, rng):
     """
-    Function that advances the number of days that patients have been infected.
+    Function that advances the number of days that patients have been infected. The life time of the
+    new infections is drawn from the virus (see Virus.lifeTimes).
 
     Parameters
     -------------
-    :param virusLifeTime: int
-        Virus life time.
     :param population: simamics.population.Population
         Population.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: int
+        Number of recovered individuals.
     """
+    newInfected = [individual for individual in population.population
+                   if individual.state.infected and individual.lifeTime is None]
+    for individual, lifeTime in zip(newInfected, virus.lifeTimes(len(newInfected), rng).tolist()):
+        individual.lifeTime = lifeTime
+    recovered = 0
     for individual in population.population:
-        if individual.state == Infected():
-            individual.state.daysWithInfection += 1
-            if individual.state.daysWithInfection > virusLifeTime:
+        if individual.state.infected:
+            individual.daysWithInfection += 1
+            if individual.daysWithInfection > individual.lifeTime:
                 individual.state = Immunized()
+                recovered += 1
+
+    return recovered
+
+
+def _diagnose(individual: Individual):
+    """
+    Function that diagnoses an individual. Their mobility is drastically reduced to 0.01.
+    """
+    individual.diagnosed = True
+    # Reduce the interaction capacity
+    individual.interactionCapacity = 0.01
 
 
-def _diagnosingPopulation(population: Population, diagnosisPercentage: float):
+def _diagnosingPopulation(population: Population, diagnosisPercentage: float, testing=None, rng=None):
     """
     Function that performs the diagnosis. If the individual is diagnosed their mobility is
-    drastically reduced to 0.05.
+    drastically reduced to 0.01.
 
     Parameters
     ------------
@@ -128,26 +192,464 @@ def _diagnosingPopulation(population: Population, diagnosisPercentage: float):
         Population
     :param diagnosisPercentage: float
         Percentage of test.
+    :param testing: <optional> simamics.dynamic.Testing
+        Testing policy. By default the undiagnosed symptomatic individuals are tested in the order
+        of the population.
+    :param rng: <optional> numpy.random.Generator
+        Random number generator (only used by the random tests of the testing policy).
+
+    Return
+    ---------
+    :return: int
+        Number of diagnosed individuals.
     """
-    numberOfTest = int(diagnosisPercentage * population.infectedWithoutDiagnosis)
-    totalDiagnosed = 0
+    if testing is None:
+        numberOfTest = int(diagnosisPercentage * population.infectedWithoutDiagnosis)
+        totalDiagnosed = 0
+        for individual in population.population:
+            if numberOfTest <= 0:
+                break
+            if not individual.diagnosed and individual.state.symptomatic:
+                # Diagnosed individual
+                _diagnose(individual)
+                numberOfTest -= 1
+                totalDiagnosed += 1
+        return totalDiagnosed
+
+    symptomatic, asymptomatic = [], []
     for individual in population.population:
-        if individual.diagnosed:
-            continue
-        if isinstance(individual.state, SymptomaticLight) or isinstance(individual.state, SymptomaticMild) \
-                or isinstance(individual.state, SymptomaticSevere):
-            # Diagnosed individual
-            individual.diagnosed = True
-            # Reduce the interaction capacity
-            individual.state.interactionCapacity = 0.01
-            numberOfTest -= 1
-            totalDiagnosed += 1
-        if numberOfTest == 0:
-            break
+        if not individual.diagnosed and individual.state.tag is not None and \
+                SYMPTOMATIC_LIGHT <= individual.state.tag <= ASYMPTOMATIC:
+            (symptomatic if individual.state.symptomatic else asymptomatic).append(individual)
+    if testing.order == 'fifo':
+        symptomatic.sort(key=lambda individual: -individual.daysWithInfection)
+    elif testing.order == 'priority':
+        symptomatic.sort(key=lambda individual: (-individual.state.tag, -individual.daysWithInfection))
+    diagnosed = symptomatic[:testing.numberOfTests(population, diagnosisPercentage)]
+    numRandom = testing.randomlyDiagnosed(population, len(asymptomatic), rng)
+    if numRandom > 0:
+        diagnosed += [asymptomatic[n] for n in rng.choice(len(asymptomatic), numRandom, replace=False)]
+    for individual in diagnosed:
+        _diagnose(individual)
+    return len(diagnosed)
+
+
+def _observed(observer: ObserverBase, phase: str, step):
+    """
+    Function that wraps a simulation step so that the observer is notified before and after it.
+    """
+    counters = _COUNTERS[phase]
+
+    def observedStep(*args):
+        observer.startPhase(phase)
+        result = step(*args)
+        observer.endPhase(phase, counters(result))
+        return result
+
+    return observedStep
+
+
+def _schedule(parameter):
+    """
+    Function that prepares a parameter of a simulation: numbers (and None) are not modified, schedules
+    are copied (they can keep a state, see Trigger) and arrays, dictionaries and functions are
+    converted to a Schedule.
+    """
+    if parameter is None or isinstance(parameter, Number):
+        return parameter
+    if isinstance(parameter, ScheduleBase):
+        return copy.deepcopy(parameter)
+    return Schedule(parameter)
+
+
+class Simulation:
+    """
+    Class that holds the state of a simulation (see simulate) so that it can be advanced day by day.
+    The parameters (e.g. populationActivity or diagnosisPercentage) can be changed between days.
+    They can also be given as schedules (see simamics.dynamic.Schedule and Trigger) whose value is
+    computed every day.
+
+    Attributes
+    ------------
+    population : simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+        Population.
+
+    virus : simamics.pathogen.Virus
+        Virus.
+
+    populationActivity : float or simamics.dynamic.ScheduleBase
+        Population activity.
+
+    diagnosisPercentage : float or simamics.dynamic.ScheduleBase
+        Percentage of test.
+
+    transmissionPercentage : float or simamics.dynamic.ScheduleBase
+        Transmission percentage that replaces the one of the virus (None to use the one of the virus).
+
+    testing : simamics.dynamic.Testing
+        Testing policy (None to test the symptomatic individuals in the order of the population).
+
+    sampling : str
+        Individuals whose contacts are drawn in each interaction round (see SAMPLINGS).
+
+    jit : bool
+        Whether the interactions are resolved by the functions compiled by Numba (see
+        simamics.dynamic.jitDynamic).
+
+    interaction : Interaction
+        Interaction function.
+
+    rng : numpy.random.Generator
+        Random number generator.
+
+    report : simamics.visualization.Report
+        Report of the simulated days.
+
+    observer : simamics.dynamic.ObserverBase
+        Observer of the simulation (None if it is not observed).
+
+    day : int
+        Next day to simulate.
+
+    Methods
+    --------
+    step(): Simulate a day.
+
+    run(iterations): Simulate several days and return the report.
+
+    iterate(iterations): Simulate several days yielding the statistics of each day.
+
+    save(path): Save the state of the simulation in a checkpoint directory.
+
+    load(path): Build a simulation from a checkpoint directory.
+
+    fork(**changes): Copy the simulation to continue it with different parameters.
+    """
+    def __init__(self, population: Population, virus: Virus, populationActivity: float, diagnosisPercentage: float,
+                 interaction: InteractionBase, rng=None, writer=None, observer: ObserverBase = None,
+                 engine: str = None, transmissionPercentage: float = None, testing: Testing = None,
+                 sampling: str = 'population', jit: bool = False):
+        """
+        Parameters
+        ------------
+        See simulate.
+        """
+        if not isinstance(population, (Population, ArrayPopulation, CompartmentalPopulation)):
+            raise TypeError("You must define a population using Population package")
+        if engine is not None and engine not in ENGINES:
+            raise TypeError("Unknown engine %s, available engines: %s" % (engine, ', '.join(ENGINES)))
+        if engine == 'agent' and isinstance(population, CompartmentalPopulation):
+            raise TypeError("A CompartmentalPopulation can only be simulated with the tauLeaping engine")
+        if not isinstance(virus, Virus):
+            raise TypeError("You must define a virus using Virus package")
+        if not isinstance(interaction, InteractionBase):
+            raise TypeError("You must define an interaction using Interaction package "
+                            "or pre-built functions from PreBuiltFunctions package")
+        if testing is not None and not isinstance(testing, Testing):
+            raise TypeError("You must define the testing policy using simamics.dynamic.Testing")
+        if sampling not in SAMPLINGS:
+            raise TypeError("Unknown sampling %s, available samplings: %s" % (sampling, ', '.join(SAMPLINGS)))
+
+        if engine == 'tauLeaping' and not isinstance(population, CompartmentalPopulation):
+            population = CompartmentalPopulation.fromPopulation(population)
+        if sampling == 'infected' and not isinstance(population, ArrayPopulation):
+            raise TypeError("The contacts of the infected individuals can only be sampled in an ArrayPopulation")
+        if jit:
+            if not isinstance(population, ArrayPopulation) or sampling != 'population':
+                raise TypeError("The compiled steps can only be used with an ArrayPopulation and 'population' sampling")
+            if not jitDynamic.available():
+                raise TypeError("Numba is required to use the compiled simulation steps")
+
+        self.population = population
+        self.virus = virus
+        self.populationActivity = _schedule(populationActivity)
+        self.diagnosisPercentage = _schedule(diagnosisPercentage)
+        self.transmissionPercentage = _schedule(transmissionPercentage)
+        self.testing = testing
+        self.sampling = sampling
+        # Checkpoints of previous versions store None
+        self.jit = bool(jit)
+        # Virus and the copy of the virus with the last scheduled transmission percentage
+        self._scheduledVirus = None
+        self.interaction = interaction
+        self.rng = makeRng(rng)
+        self.report = Report(writer=writer)
+        self.observer = observer
+        self.day = 0
+        if observer is not None:
+            self.report.profile = observer
+        self._steps = self._buildSteps()
+
+    def _buildSteps(self):
+        """
+        Return the simulation steps of the population type, wrapped for the observer if any.
+        """
+        if isinstance(self.population, CompartmentalPopulation):
+            # Simulation steps that operate on the number of individuals in each compartment
+            steps = tauLeaping._diagnosingPopulation, tauLeaping._generateInteractions, tauLeaping._kill, \
+                tauLeaping._increment
+        elif isinstance(self.population, ArrayPopulation):
+            # Simulation steps that operate on the population arrays
+            if self.sampling == 'infected':
+                interact = arrayDynamic._generateInfectedInteractions
+            elif self.jit:
+                interact = jitDynamic._generateInteractions
+            else:
+                interact = arrayDynamic._generateInteractions
+            steps = arrayDynamic._diagnosingPopulation, interact, arrayDynamic._kill, arrayDynamic._increment
+        else:
+            steps = _diagnosingPopulation, _generateInteractions, _kill, _increment
+        steps = (Report.count, ) + steps
+        if self.observer is not None:
+            steps = tuple(_observed(self.observer, phase, step) for phase, step in zip(ObserverBase.PHASES, steps))
+        return steps
+
+    def step(self):
+        """
+        Simulate a day.
+        """
+        count, diagnose, interact, kill, increment = self._steps
+        if self.observer is not None:
+            self.observer.startDay(self.day)
+        count(self.report, self.day, self.population)
+        # The schedules are evaluated once the population of the day has been counted
+        virus = self._virus()
+        diagnose(self.population, self._value(self.diagnosisPercentage), self.testing, self.rng)
+        interact(self.population, virus, self._value(self.populationActivity), self.interaction, self.rng)
+        numDeaths = kill(self.population, virus, self.rng)
+        self.report.recordDeaths(numDeaths)
+        increment(self.population, virus, self.rng)
+        self.day += 1
+
+    def _value(self, parameter):
+        """
+        Return the value of a parameter in the current day.
+        """
+        return parameter.value(self.day, self.report) if isinstance(parameter, ScheduleBase) else parameter
+
+    def _virus(self):
+        """
+        Return the virus of the current day, with the transmission percentage of the day if it is
+        given (the virus is only built again when the transmission percentage changes).
+        """
+        if self.transmissionPercentage is None:
+            return self.virus
+        transmissionPercentage = float(self._value(self.transmissionPercentage))
+        scheduled = self._scheduledVirus
+        if scheduled is None or scheduled[0] is not self.virus or \
+                scheduled[1].transmissionPercentage != transmissionPercentage:
+            self._scheduledVirus = self.virus, self.virus.copy(transmissionPercentage=transmissionPercentage)
+        return self._scheduledVirus[1]
+
+    def save(self, path: str):
+        """
+        Save the state of the simulation (population, random number generator, parameters and
+        report) in a checkpoint directory (see simamics.dynamic.checkpoint). Simulation.load
+        continues the simulation exactly as if it had not been interrupted.
+
+        Parameters
+        ------------
+        :param path: str
+            Checkpoint directory. A previous checkpoint in the same directory is replaced.
+        """
+        _checkpoint._save(self, path)
+
+    @classmethod
+    def load(cls, path: str, virus: Virus = None, interaction: InteractionBase = None, writer=None,
+             observer: ObserverBase = None, mmap: bool = True):
+        """
+        Build a simulation from a checkpoint directory (see Simulation.save).
+
+        Parameters
+        ------------
+        :param path: str
+            Checkpoint directory.
+        :param virus: <optional> simamics.pathogen.Virus
+            Virus. By default the virus is built with the saved parameters.
+        :param interaction: <optional> Interaction
+            Interaction function. Interactions defined by a string expression are saved in the
+            checkpoint, any other interaction must be given again.
+        :param writer: <optional> simamics.visualization.ReportWriter
+            Writer where the following days of the report are written.
+        :param observer: <optional> simamics.dynamic.ObserverBase
+            Observer of the following days.
+        :param mmap: <optional> bool
+            Memory-map the arrays of an ArrayPopulation instead of reading them (they are copied when
+            modified). Default True.
+
+        Return
+        ---------
+        :return: simamics.dynamic.Simulation
+        """
+        return _checkpoint._load(cls, path, virus=virus, interaction=interaction, writer=writer, observer=observer,
+                                 mmap=mmap)
+
+    def fork(self, populationActivity: float = None, diagnosisPercentage: float = None, virus: Virus = None,
+             interaction: InteractionBase = None, rng=None, writer=None, observer: ObserverBase = None,
+             transmissionPercentage: float = None, testing: Testing = None, sampling: str = None,
+             jit: bool = None):
+        """
+        Return a copy of the simulation, in the same day, that can be continued with different
+        parameters without modifying this simulation (e.g. to compare interventions from the same
+        state of the epidemic). The population is copied through its arrays (see
+        simamics.dynamic.checkpoint) and the report with the days already simulated is also copied.
+
+        By default the copy uses a generator with the same state, so a branch with the same
+        parameters continues exactly as this simulation would (common random numbers).
+
+        Parameters
+        ------------
+        :param populationActivity: <optional> float or simamics.dynamic.ScheduleBase
+            Population activity of the branch. Default the one of this simulation.
+        :param diagnosisPercentage: <optional> float or simamics.dynamic.ScheduleBase
+            Percentage of test of the branch. Default the one of this simulation.
+        :param virus: <optional> simamics.pathogen.Virus
+            Virus of the branch. Default the one of this simulation.
+        :param interaction: <optional> Interaction
+            Interaction function of the branch. Default the one of this simulation.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator of the branch. Default a copy of the generator of this
+            simulation.
+        :param writer: <optional> simamics.visualization.ReportWriter
+            Writer where the following days of the branch are written.
+        :param observer: <optional> simamics.dynamic.ObserverBase
+            Observer of the branch.
+        :param transmissionPercentage: <optional> float or simamics.dynamic.ScheduleBase
+            Transmission percentage of the branch. Default the one of this simulation.
+        :param testing: <optional> simamics.dynamic.Testing
+            Testing policy of the branch. Default the one of this simulation.
+        :param sampling: <optional> str
+            Sampling of the contacts of the branch. Default the one of this simulation.
+        :param jit: <optional> bool
+            Use the compiled steps in the branch. Default the choice of this simulation.
+
+        Return
+        ---------
+        :return: simamics.dynamic.Simulation
+        """
+        if rng is None:
+            rng = fromState(getState(self.rng))
+        branch = Simulation(_checkpoint._copy(self.population), virus if virus is not None else self.virus,
+                            populationActivity if populationActivity is not None else self.populationActivity,
+                            diagnosisPercentage if diagnosisPercentage is not None else self.diagnosisPercentage,
+                            interaction if interaction is not None else self.interaction, rng=rng, writer=writer,
+                            observer=observer,
+                            transmissionPercentage=transmissionPercentage if transmissionPercentage is not None
+                            else self.transmissionPercentage,
+                            testing=testing if testing is not None else self.testing,
+                            sampling=sampling if sampling is not None else self.sampling,
+                            jit=jit if jit is not None else self.jit)
+        branch.report = Report.fromColumns(self.report.columns, writer=writer)
+        branch.report.profile = observer
+        branch.day = self.day
+        return branch
+
+    def run(self, iterations: int, verbose: bool = True, checkpoint: str = None, checkpointEvery: int = None,
+            stop=None):
+        """
+        Simulate several days. When no infected individual is left the population cannot change
+        any more, so the remaining days are added to the report without simulating them (the
+        observer and the schedules are not called in those days).
+
+        Parameters
+        ------------
+        :param iterations: int
+            Number of days to simulate.
+        :param verbose: <optional> bool
+            Show a progress bar. Default True.
+        :param checkpoint: <optional> str
+            Directory where the simulation is saved (see Simulation.save) every checkpointEvery days
+            and after the last day.
+        :param checkpointEvery: <optional> int
+            Number of days between checkpoints. By default the simulation is only saved after the
+            last day.
+        :param stop: <optional> function
+            Stopping criterion: function that receives the report after each day and returns True to
+            stop the simulation (see simamics.dynamic.EarlyStop).
+
+        Return
+        ---------
+        :return: simamics.visualization.Report
+            Report of all the simulated days.
+        """
+        self._prepare(iterations)
+        for i in tqdm(range(iterations), desc="Days %d" % iterations, disable=not verbose):
+            if self.population.numInfected == 0:
+                self._fastForward(iterations - i)
+                break
+            self.step()
+            if stop is not None and stop(self.report):
+                break
+            if checkpoint is not None and checkpointEvery and (i + 1) % checkpointEvery == 0 and i + 1 < iterations:
+                self.save(checkpoint)
+        if checkpoint is not None:
+            self.save(checkpoint)
+        if self.observer is not None:
+            self.observer.finish()
+
+        return self.report
+
+    def iterate(self, iterations: int, stop=None):
+        """
+        Generator that simulates several days and yields the statistics of each day as soon as it
+        is completed (see Report.row), e.g. to show the progress of the simulation. The iteration
+        can be stopped at any time: the days already simulated remain in the report and the
+        simulation can be continued later. As in Simulation.run, the days without infected
+        individuals are not simulated.
+
+        Parameters
+        ------------
+        :param iterations: int
+            Number of days to simulate.
+        :param stop: <optional> function
+            Stopping criterion (see Simulation.run).
+
+        Return
+        ---------
+        :return: generator
+            Dictionary with the value of each statistic (see simamics.visualization.Report.COLUMNS)
+            per day.
+        """
+        self._prepare(iterations)
+        try:
+            for i in range(iterations):
+                if self.population.numInfected == 0:
+                    self._fastForward(1)
+                else:
+                    self.step()
+                yield self.report.row()
+                if stop is not None and stop(self.report):
+                    break
+        finally:
+            if self.observer is not None:
+                self.observer.finish()
+
+    def _fastForward(self, days: int):
+        """
+        Add several days to the report without simulating them. It must only be called when there
+        are no infected individuals: nobody can be infected, diagnosed, die or recover.
+        """
+        self.report.count(self.day, self.population)
+        self.report.recordDeaths(0)
+        self.report.repeatLastDay(days - 1)
+        self.day += days
+
+    def _prepare(self, iterations: int):
+        """
+        Prepare the schedules and the observer before simulating several days.
+        """
+        for parameter in (self.populationActivity, self.diagnosisPercentage, self.transmissionPercentage):
+            if isinstance(parameter, ScheduleBase):
+                parameter.prepare(self.day + iterations)
+        if self.observer is not None:
+            self.observer.start()
 
 
 def simulate(population: Population, virus: Virus, iterations: int, populationActivity: float,
-             diagnosisPercentage: float, interaction: InteractionBase):
+             diagnosisPercentage: float, interaction: InteractionBase, verbose: bool = True, rng=None,
+             writer=None, observer: ObserverBase = None, engine: str = None, checkpoint: str = None,
+             checkpointEvery: int = None, transmissionPercentage: float = None, testing: Testing = None,
+             sampling: str = 'population', jit: bool = False, stop=None):
     """
     Function that simulate the virus dynamic for a given population and for a given number of interactions,
     taking into account the virus parameters (see simamics.pathogen.Virus), the percentage of diagnosed
@@ -155,39 +657,113 @@ def simulate(population: Population, virus: Virus, iterations: int, populationAc
 
     Parameters
     ------------
-    :param diagnosisPercentage: float
-        Percentage of test (see _diagnosingPopulation for a detailed implementation).
+    :param diagnosisPercentage: float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Percentage of test (see _diagnosingPopulation for a detailed implementation). It can change
+        every day: arrays, dictionaries and functions of the day are converted to a
+        simamics.dynamic.Schedule and simamics.dynamic.Trigger changes it depending on the report.
     :param interaction: Interaction
         Interaction function (see Interaction for a detailed implementation).
-    :param population: simamics.population.Population
+    :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
         Population.
     :param virus: simamics.pathogen.Virus
         Virus.
     :param iterations: int
         Number of simulation interactions.
-    :param populationActivity: float
-        Population activity.
+    :param populationActivity: float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Population activity. It can change every day (see diagnosisPercentage).
+    :param verbose: <optional> bool
+        Show a progress bar. Default True.
+    :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+        Seed or random number generator used by the simulation (see simamics.rng.makeRng).
+    :param writer: <optional> simamics.visualization.ReportWriter
+        Writer where each day of the report is written as soon as it is completed.
+    :param observer: <optional> simamics.dynamic.ObserverBase
+        Observer notified around each step of the simulation (e.g. simamics.dynamic.Profiler). It is
+        stored in Report.profile. Without an observer the steps are not instrumented.
+    :param engine: <optional> str
+        'agent' simulates every individual and 'tauLeaping' only the number of individuals in each
+        compartment (see simamics.dynamic.tauLeaping), whose cost does not depend on the population
+        size. With 'tauLeaping' the population is converted to a
+        simamics.population.CompartmentalPopulation and is not modified. By default the engine is
+        selected by the population type.
+    :param checkpoint: <optional> str
+        Directory where the state of the simulation is saved every checkpointEvery days and at the
+        end (see Simulation.save), so it can be continued with resume().
+    :param checkpointEvery: <optional> int
+        Number of days between checkpoints. By default only the final state is saved.
+    :param transmissionPercentage: <optional> float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Transmission percentage that replaces the one of the virus, e.g. to model the use of masks.
+        It can change every day (see diagnosisPercentage). Default the one of the virus.
+    :param testing: <optional> simamics.dynamic.Testing
+        Testing policy: daily test capacity, order of the queue of symptomatic individuals and random
+        testing of the population. By default the undiagnosed symptomatic individuals are tested in
+        the order of the population.
+    :param sampling: <optional> str
+        'population' draws a contact for every individual in each interaction round and 'infected'
+        only for the infected individuals, the only ones that can transmit the virus, so the cost of
+        the interactions depends on the number of infected individuals instead of the population
+        size (see simamics.dynamic.arrayDynamic._generateInfectedInteractions). Both have the same
+        distribution of infections but use different random numbers. 'infected' requires a
+        simamics.population.ArrayPopulation. Default 'population'.
+    :param jit: <optional> bool
+        Resolve the contacts of an ArrayPopulation with the 'population' sampling one individual at a
+        time in a function compiled by Numba (see simamics.dynamic.jitDynamic) instead of in NumPy
+        batches, so each infection takes effect immediately. The compiled function is cached on
+        disk. The results have the same distribution but use different random numbers, so it is
+        never chosen automatically and requires Numba. Default False.
+    :param stop: <optional> function
+        Stopping criterion: function that receives the report after each day and returns True to
+        stop the simulation before the number of iterations, e.g. simamics.dynamic.EarlyStop. The
+        report only contains the simulated days. Regardless of this criterion, once no infected
+        individual is left the remaining days are added to the report without simulating them.
 
     Return
     ---------
     :return: simamics.visualization.Report
         Report instance (see simamics.visualization.Report for a detailed description)
     """
-    if not isinstance(population, Population):
-        raise TypeError("You must define a population using Population package")
-    if not isinstance(virus, Virus):
-        raise TypeError("You must define a virus using Virus package")
-    if not isinstance(interaction, InteractionBase):
-        raise TypeError("You must define an interaction using Interaction package "
-                        "or pre-built functions from PreBuiltFunctions package")
-
-    report = Report()
-    for i in tqdm(range(iterations), desc="Days %d" % iterations):
-        report.count(i, population)
-        _diagnosingPopulation(population, diagnosisPercentage)
-        _generateInteractions(population, virus, populationActivity, interaction)
-        numDeaths = _kill(population, virus)
-        report.recordDeaths(numDeaths)
-        _increment(population, virus.lifeTime)
-
-    return report
+    simulation = Simulation(population, virus, populationActivity, diagnosisPercentage, interaction, rng=rng,
+                            writer=writer, observer=observer, engine=engine,
+                            transmissionPercentage=transmissionPercentage, testing=testing, sampling=sampling,
+                            jit=jit)
+    return simulation.run(iterations, verbose=verbose, checkpoint=checkpoint, checkpointEvery=checkpointEvery,
+                          stop=stop)
+
+
+def resume(path: str, iterations: int, verbose: bool = True, virus: Virus = None, interaction: InteractionBase = None,
+           writer=None, observer: ObserverBase = None, checkpointEvery: int = None, stop=None):
+    """
+    Function that continues a simulation saved in a checkpoint directory (see simulate) until it
+    reaches a total number of days. The result is identical to the one of a simulation that had not
+    been interrupted. The checkpoint is updated every checkpointEvery days and at the end.
+
+    Parameters
+    ------------
+    :param path: str
+        Checkpoint directory.
+    :param iterations: int
+        Total number of simulation interactions, including the days already simulated.
+    :param verbose: <optional> bool
+        Show a progress bar. Default True.
+    :param virus: <optional> simamics.pathogen.Virus
+        Virus. By default the virus is built with the saved parameters.
+    :param interaction: <optional> Interaction
+        Interaction function. Only required if the interaction is not an Interaction defined by a
+        string expression (see Simulation.load).
+    :param writer: <optional> simamics.visualization.ReportWriter
+        Writer where the remaining days are written.
+    :param observer: <optional> simamics.dynamic.ObserverBase
+        Observer of the remaining days.
+    :param checkpointEvery: <optional> int
+        Number of days between checkpoints. By default only the final state is saved.
+    :param stop: <optional> function
+        Stopping criterion (see simulate).
+
+    Return
+    ---------
+    :return: simamics.visualization.Report
+        Report of all the simulated days.
+    """
+    simulation = Simulation.load(path, virus=virus, interaction=interaction, writer=writer, observer=observer)
+    return simulation.run(max(0, iterations - simulation.day), verbose=verbose, checkpoint=path,
+                          checkpointEvery=checkpointEvery, stop=stop)
@@ -0,0 +1,120 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module runs several replicates of the same simulation (see simamics.dynamic.simulate) in a
+pool of processes. Each replicate builds its own population and uses an independent random seed
+derived from a single seed, so the whole ensemble is reproducible.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import random
+import contextlib
+import numpy as np
+from ..visualization import EnsembleReport
+from .dynamic import simulate
+from .parallel import _getJob, _map
+
+
+@contextlib.contextmanager
+def _seed(seedSequence: np.random.SeedSequence):
+    """
+    Context manager that seeds the random module, used when the population factory does not
+    receive a random number generator, and yields the random number generator of the simulation.
+    The previous state of the random module is restored at the end, so running the replicates in
+    the current process (workers=1) does not change the random numbers of the caller.
+
+    Parameters
+    ------------
+    :param seedSequence: np.random.SeedSequence
+        Seed of the replicate.
+
+    Return
+    ---------
+    :return: numpy.random.Generator
+        Random number generator of the simulation.
+    """
+    populationSeed, simulationSeed = seedSequence.spawn(2)
+    state = random.getstate()
+    random.seed(int.from_bytes(populationSeed.generate_state(4).tobytes(), 'little'))
+    try:
+        yield np.random.default_rng(simulationSeed)
+    finally:
+        random.setstate(state)
+
+
+def _runReplicate(seedSequence: np.random.SeedSequence):
+    """
+    Function that runs a replicate of the simulation stored in the worker process.
+
+    Parameters
+    ------------
+    :param seedSequence: np.random.SeedSequence
+        Seed of the replicate.
+
+    Return
+    ---------
+    :return: simamics.visualization.Report
+        Report of the replicate.
+    """
+    job = _getJob()
+    with _seed(seedSequence) as rng:
+        population = job.pop('populationFactory')()
+        return simulate(population=population, verbose=False, rng=rng, **job)
+
+
+def simulateEnsemble(populationFactory, virus, iterations: int, populationActivity: float,
+                     diagnosisPercentage: float, interaction, replicates: int, workers: int = None,
+                     seed: int = None):
+    """
+    Function that runs several replicates of a simulation (see simamics.dynamic.simulate) in a
+    pool of processes and aggregates their reports.
+
+    Each replicate calls populationFactory to build its own population, so the replicates do not
+    share any state. The seed of each replicate is spawned from the seed of the ensemble (see
+    np.random.SeedSequence), therefore the same seed gives the same ensemble regardless of the
+    number of workers.
+
+    When the platform does not support the 'fork' start method (e.g. Windows) the arguments must be
+    picklable: populationFactory must be a function defined at module level and the interaction
+    cannot be defined with a lambda.
+
+    Parameters
+    ------------
+    :param populationFactory: function
+        Function without arguments that returns a new population (simamics.population.Population or
+        simamics.population.ArrayPopulation).
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param iterations: int
+        Number of simulation interactions.
+    :param populationActivity: float
+        Population activity.
+    :param diagnosisPercentage: float
+        Percentage of test.
+    :param interaction: Interaction
+        Interaction function.
+    :param replicates: int
+        Number of replicates.
+    :param workers: <optional> int
+        Number of processes. Default os.cpu_count().
+    :param seed: <optional> int
+        Seed of the ensemble. By default a random seed is used.
+
+    Return
+    ---------
+    :return: simamics.visualization.EnsembleReport
+        Aggregated reports (see simamics.visualization.EnsembleReport).
+    """
+    if not callable(populationFactory):
+        raise TypeError("populationFactory must be a function that returns a new population")
+    if replicates < 1:
+        raise TypeError("The number of replicates must be at least 1")
+    workers = max(1, min(workers or os.cpu_count(), replicates))
+    job = dict(populationFactory=populationFactory, virus=virus, iterations=iterations,
+               populationActivity=populationActivity, diagnosisPercentage=diagnosisPercentage,
+               interaction=interaction)
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    return EnsembleReport(_map(_runReplicate, job, seeds, workers))
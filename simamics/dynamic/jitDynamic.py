@@ -0,0 +1,168 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module implements the interaction step (see simamics.dynamic.dynamic) for populations stored
+as arrays (see simamics.population.ArrayPopulation) with functions compiled by Numba. The contacts
+of each round are resolved one individual at a time, as in the simulation of individual objects,
+so an individual infected in a round transmits the virus to the contacts they initiate later in the
+same round. The remaining steps (diagnosis, deaths and progression) only process the infected
+individuals and are those of simamics.dynamic.arrayDynamic.
+
+Numba is optional and the compiled steps are only used when they are requested (simulate(...,
+jit=True)), since they draw different random numbers than the NumPy steps: seeded results do not
+depend on whether Numba is installed. The compiled functions are built the first time they are used
+and cached on disk, so the compilation is only paid once per machine.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from ..population.ArrayPopulation import *
+from ..pathogen import Virus
+
+# Compiled functions (None if Numba is not installed), built by _compiled()
+_KERNELS = {}
+
+
+def _resolveRound(states, capacity, partners, acceptance, thresholds, transmissionPercentage, capacities, rng,
+                  newIndividuals, newCodes):
+    """
+    Function compiled by Numba that resolves the contacts of a round in the order of the population.
+    Each individual contacts their partner if the product of their interaction capacities is
+    greater than the acceptance value, and an infected individual transmits the virus to a healthy
+    partner as in Virus.infection. The states and capacities of the infected individuals are
+    updated as soon as they are infected.
+
+    Parameters
+    ------------
+    :param states: np.ndarray (int8)
+        State code of each individual (modified).
+    :param capacity: np.ndarray (float32)
+        Interaction capacity of each individual (modified).
+    :param partners: np.ndarray (int64)
+        Partner of each individual (-1 if they have no contacts).
+    :param acceptance: np.ndarray (float64)
+        Acceptance value of each contact.
+    :param thresholds: np.ndarray (float64)
+        Cumulative probabilities of the light, mild and severe states (see Virus).
+    :param transmissionPercentage: float
+        Transmission percentage of the virus.
+    :param capacities: np.ndarray (float32)
+        Interaction capacity of each state code.
+    :param rng: numpy.random.Generator
+        Random number generator.
+    :param newIndividuals: np.ndarray (int64)
+        Output array with the indices of the infected individuals.
+    :param newCodes: np.ndarray (int8)
+        Output array with the state codes of the infected individuals.
+
+    Return
+    ---------
+    :return: tuple
+        Number of contacts, number of contacts between an infected and a healthy individual and
+        number of infected individuals.
+    """
+    contacts, attempts, infections = 0, 0, 0
+    for individual in range(len(states)):
+        partner = partners[individual]
+        if partner < 0 or capacity[individual] * capacity[partner] <= acceptance[individual]:
+            continue
+        contacts += 1
+        state = states[individual]
+        if state < SYMPTOMATIC_LIGHT or state > ASYMPTOMATIC or states[partner] != HEALTHY:
+            continue
+        attempts += 1
+        if rng.random() > transmissionPercentage:
+            # The virus does not infect the individual
+            continue
+        randomNum = rng.random()
+        code = SYMPTOMATIC_LIGHT
+        while code < ASYMPTOMATIC and randomNum > thresholds[code - SYMPTOMATIC_LIGHT]:
+            code += 1
+        states[partner] = code
+        capacity[partner] = capacities[code]
+        newIndividuals[infections] = partner
+        newCodes[infections] = code
+        infections += 1
+
+    return contacts, attempts, infections
+
+
+def _compiled():
+    """
+    Return the compiled version of _resolveRound, or None if Numba is not installed.
+    """
+    if 'resolveRound' not in _KERNELS:
+        try:
+            import numba
+        except ImportError:
+            _KERNELS['resolveRound'] = None
+        else:
+            _KERNELS['resolveRound'] = numba.njit(cache=True, nogil=True)(_resolveRound)
+    return _KERNELS['resolveRound']
+
+
+def available():
+    """
+    Return True if Numba is installed and the compiled steps can be used.
+    """
+    return _compiled() is not None
+
+
+def _generateInteractions(population: ArrayPopulation, virus: Virus, populationActivity: float, interaction, rng,
+                          resolveRound=None):
+    """
+    Function that simulates the interactions between individuals in the population. In each round
+    every individual contacts a random individual (selected by the contact structure of the
+    population, if any). The partners and acceptance values of a round are drawn at once and the
+    contacts are resolved by the compiled function _resolveRound.
+
+    Parameters
+    ------------
+    :param interaction: Interaction
+        Interaction.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param population: simamics.population.ArrayPopulation
+        Population.
+    :param populationActivity: float
+        Population activity.
+    :param rng: numpy.random.Generator
+        Random number generator.
+    :param resolveRound: <optional> function
+        Function that resolves the contacts of a round. Default the compiled _resolveRound.
+
+    Return
+    ---------
+    :return: tuple
+        Number of contacts, number of contacts between an infected and a healthy individual and
+        number of infections.
+    """
+    resolveRound = _compiled() if resolveRound is None else resolveRound
+    if resolveRound is None:
+        raise TypeError("Numba is required to use the compiled simulation steps")
+    size = len(population)
+    numOfInteractions = interaction.interactions(size, populationActivity, population.space)
+    thresholds = np.array([virus.lightPercentage, virus.mildPercentage, virus.severePercentage], dtype=np.float64)
+    newIndividuals = np.empty(size, dtype=np.int64)
+    newCodes = np.empty(size, dtype=np.int8)
+    contacts, attempts, infections = 0, 0, 0
+    for n in range(numOfInteractions):
+        if population.contacts is None:
+            partners = rng.integers(0, size, size)
+        else:
+            partners = population.contacts.sample(np.arange(size), rng)
+        # Memory-mapped arrays (see simamics.dynamic.checkpoint) are passed as views
+        roundContacts, roundAttempts, roundInfections = resolveRound(
+            np.asarray(population.states), np.asarray(population.interactionCapacity), partners, rng.random(size),
+            thresholds, float(virus.transmissionPercentage), CAPACITIES, rng, newIndividuals, newCodes)
+        # The states are changed again through the population to update its counts and indices
+        infected = newIndividuals[:roundInfections].copy()
+        population.states[infected] = HEALTHY
+        population.setState(infected, newCodes[:roundInfections].copy())
+        contacts += roundContacts
+        attempts += roundAttempts
+        infections += roundInfections
+
+    return contacts, attempts, infections
@@ -0,0 +1,236 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module simulates several regions (e.g. municipalities) connected by the daily travel of their
+inhabitants. Each region has its own population and simulation parameters. The regions are
+distributed in shards, each one simulated by a persistent process; every day all the shards simulate
+their regions, send their travellers to the main process and wait for the travellers that arrive to
+their regions (a synchronization barrier per day).
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import numpy as np
+from tqdm import tqdm
+from ..population import ArrayPopulation
+from .dynamic import Simulation
+from .parallel import _context
+
+
+class _Shard:
+    """
+    Group of regions simulated by the same process.
+    """
+    def __init__(self, job: dict, regions: list):
+        """
+        Parameters
+        ------------
+        :param job: dict
+            Parameters of the metapopulation (see simulateMetapopulation).
+        :param regions: list
+            Indices of the regions of the shard.
+        """
+        self.mobility = job['mobility']
+        self.simulations = {
+            region: Simulation(job['populations'][region], job['virus'], job['populationActivity'][region],
+                               job['diagnosisPercentage'][region], job['interaction'], rng=job['seeds'][region])
+            for region in regions
+        }
+
+    def day(self, arrivals: dict, travel: bool):
+        """
+        Function that adds the travellers that arrive to each region and simulates a day.
+
+        Parameters
+        ------------
+        :param arrivals: dict
+            Travellers that arrive to each region (see ArrayPopulation.extract).
+        :param travel: bool
+            Select the travellers that leave each region after the day.
+
+        Return
+        ---------
+        :return: list
+            Source region, destination region and travellers of each group of travellers.
+        """
+        departures = []
+        for region, simulation in self.simulations.items():
+            if region in arrivals:
+                simulation.population.append(arrivals[region])
+            simulation.step()
+            if travel:
+                departures.extend(self._travel(region, simulation))
+        return departures
+
+    def _travel(self, region: int, simulation: Simulation):
+        """
+        Function that selects the travellers that leave a region and takes them out of its
+        population. Diagnosed individuals do not travel.
+        """
+        population = simulation.population
+        candidates = np.flatnonzero(~population.diagnosed)
+        rates = self.mobility[region].copy()
+        rates[region] = 0
+        counts = simulation.rng.multinomial(len(candidates), np.append(rates, max(0.0, 1 - rates.sum())))[:-1]
+        travellers = population.extract(simulation.rng.choice(candidates, int(counts.sum()), replace=False))
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        return [(region, destination, {name: values[bounds[destination]:bounds[destination + 1]]
+                                       for name, values in travellers.items()})
+                for destination in np.flatnonzero(counts)]
+
+    def reports(self):
+        """
+        Return the report of each region.
+        """
+        return {region: simulation.report for region, simulation in self.simulations.items()}
+
+
+def _runShard(connection, job: dict, regions: list):
+    """
+    Function run by each shard process: it simulates a day for every message received until the
+    reports are requested.
+    """
+    shard = _Shard(job, regions)
+    while True:
+        message = connection.recv()
+        if message[0] == 'day':
+            connection.send(shard.day(*message[1:]))
+        else:
+            connection.send(shard.reports())
+            connection.close()
+            return
+
+
+class _LocalShard:
+    """
+    Shard simulated in the current process, with the same interface as _ProcessShard.
+    """
+    def __init__(self, job: dict, regions: list):
+        self.shard = _Shard(job, regions)
+        self.result = None
+
+    def send(self, message: tuple):
+        self.result = self.shard.day(*message[1:]) if message[0] == 'day' else self.shard.reports()
+
+    def recv(self):
+        return self.result
+
+
+class _ProcessShard:
+    """
+    Shard simulated in a persistent process.
+    """
+    def __init__(self, job: dict, regions: list):
+        self.connection, workerConnection = _context().Pipe()
+        self.process = _context().Process(target=_runShard, args=(workerConnection, job, regions), daemon=True)
+        self.process.start()
+        workerConnection.close()
+
+    def send(self, message: tuple):
+        self.connection.send(message)
+
+    def recv(self):
+        return self.connection.recv()
+
+    def close(self):
+        self.connection.close()
+        self.process.join()
+
+
+def _merge(groups: list):
+    """
+    Function that joins several groups of travellers.
+    """
+    return {name: np.concatenate([group[name] for group in groups]) for name in groups[0]}
+
+
+def simulateMetapopulation(populations: list, virus, iterations: int, populationActivity, diagnosisPercentage,
+                           interaction, mobility, workers: int = None, seed: int = None, verbose: bool = True):
+    """
+    Function that simulates several regions connected by the travel of their inhabitants. Each day
+    every region is simulated as in simamics.dynamic.simulate and, after it, a fraction of the
+    undiagnosed individuals of each region travels to the other regions (they move with their
+    state) following a mobility matrix.
+
+    The regions are distributed among several processes. Each region uses an independent random
+    seed derived from the seed of the metapopulation, so the result does not depend on the number
+    of workers. When the platform does not support the 'fork' start method (e.g. Windows) the
+    arguments must be picklable (see simulateEnsemble).
+
+    Parameters
+    ------------
+    :param populations: list
+        Population of each region (simamics.population.Population or ArrayPopulation without contact
+        structure). Population instances are converted to ArrayPopulation. When several workers are
+        used the given populations are not modified.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param iterations: int
+        Number of simulation interactions.
+    :param populationActivity: float or list
+        Population activity (the same for all the regions or one per region).
+    :param diagnosisPercentage: float or list
+        Percentage of test (the same for all the regions or one per region).
+    :param interaction: Interaction
+        Interaction function.
+    :param mobility: array-like
+        Matrix of shape (regions, regions) where mobility[i, j] is the fraction of the individuals
+        of the region i that travel to the region j every day. The diagonal is ignored.
+    :param workers: <optional> int
+        Number of processes. Default os.cpu_count().
+    :param seed: <optional> int
+        Seed of the metapopulation. By default a random seed is used.
+    :param verbose: <optional> bool
+        Show a progress bar. Default True.
+
+    Return
+    ---------
+    :return: list
+        Report of each region (see simamics.visualization.Report).
+    """
+    numRegions = len(populations)
+    populations = [ArrayPopulation.fromPopulation(population) if not isinstance(population, ArrayPopulation)
+                   else population for population in populations]
+    mobility = np.asarray(mobility, dtype=np.float64)
+    if mobility.shape != (numRegions, numRegions):
+        raise TypeError("The mobility matrix must be of shape (%d, %d)" % (numRegions, numRegions))
+    if (mobility < 0).any() or (mobility.sum(axis=1) - np.diag(mobility) > 1).any():
+        raise TypeError("The fraction of travellers of each region must be between 0 and 1")
+    job = dict(populations=populations, virus=virus, interaction=interaction, mobility=mobility,
+               populationActivity=np.broadcast_to(populationActivity, numRegions).tolist(),
+               diagnosisPercentage=np.broadcast_to(diagnosisPercentage, numRegions).tolist(),
+               seeds=np.random.SeedSequence(seed).spawn(numRegions))
+
+    workers = max(1, min(workers or os.cpu_count(), numRegions))
+    # Regions are assigned to the shards in turns
+    shardRegions = [list(range(numRegions))[n::workers] for n in range(workers)]
+    shardOf = {region: n for n, regions in enumerate(shardRegions) for region in regions}
+    shards = [_LocalShard(job, shardRegions[0])] if workers == 1 else \
+        [_ProcessShard(job, regions) for regions in shardRegions]
+
+    try:
+        arrivals = [{} for shard in shards]
+        for day in tqdm(range(iterations), desc="Days %d" % iterations, disable=not verbose):
+            for shard, shardArrivals in zip(shards, arrivals):
+                shard.send(('day', shardArrivals, day < iterations - 1))
+            # Barrier: wait until every shard has simulated the day
+            departures = [departure for shard in shards for departure in shard.recv()]
+            travellers = {}
+            for source, destination, individuals in sorted(departures, key=lambda departure: departure[:2]):
+                travellers.setdefault(destination, []).append(individuals)
+            arrivals = [{} for shard in shards]
+            for destination, groups in travellers.items():
+                arrivals[shardOf[destination]][destination] = _merge(groups)
+
+        reports = {}
+        for shard in shards:
+            shard.send(('reports', ))
+            reports.update(shard.recv())
+    finally:
+        for shard in shards:
+            if isinstance(shard, _ProcessShard):
+                shard.close()
+
+    return [reports[region] for region in range(numRegions)]
@@ -0,0 +1,121 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module provides the tools used to run simulations in a pool of processes. All the tasks sent to
+the pool share the same job (population factory, virus, interaction...), which is stored once in
+each worker process when it starts.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Parameters shared by all the tasks run in a process (see _initWorker)
+_job = None
+
+
+def _initWorker(job: dict):
+    """
+    Function that stores the job parameters in the worker process.
+
+    Parameters
+    ------------
+    :param job: dict
+        Parameters shared by all the tasks.
+    """
+    global _job
+    _job = job
+
+
+def _getJob():
+    """
+    Return the job parameters stored in the current process.
+
+    Return
+    ---------
+    :return: dict
+        Copy of the parameters shared by all the tasks.
+    """
+    return dict(_job)
+
+
+def _context():
+    """
+    Return the multiprocessing context used to create the workers. When it is available 'fork' is
+    used so that the job parameters (e.g. an Interaction defined with a lambda) do not need to be
+    pickled.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def _executor(job: dict, workers: int):
+    """
+    Return a pool of processes that share the same job.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_context(),
+                               initializer=_initWorker, initargs=(job, ))
+
+
+def _map(function, job: dict, tasks: list, workers: int):
+    """
+    Function that applies a function to a list of tasks in a pool of processes that share the same
+    job. The results are returned in the same order as the tasks.
+
+    Parameters
+    ------------
+    :param function: function
+        Function to apply (must be defined at module level).
+    :param job: dict
+        Parameters shared by all the tasks.
+    :param tasks: list
+        Function arguments.
+    :param workers: int
+        Number of processes. If it is 1 the tasks are run in the current process.
+
+    Return
+    ---------
+    :return: list
+        Function results.
+    """
+    if workers == 1:
+        _initWorker(job)
+        return [function(task) for task in tasks]
+    with _executor(job, workers) as executor:
+        return list(executor.map(function, tasks))
+
+
+def _mapUnordered(function, job: dict, tasks: list, workers: int):
+    """
+    Function that applies a function to a list of tasks in a pool of processes that share the same
+    job. The tasks are submitted in the given order and the results are yielded as soon as they are
+    available.
+
+    Parameters
+    ------------
+    :param function: function
+        Function to apply (must be defined at module level).
+    :param job: dict
+        Parameters shared by all the tasks.
+    :param tasks: list
+        Function arguments.
+    :param workers: int
+        Number of processes. If it is 1 the tasks are run in the current process.
+
+    Return
+    ---------
+    :return: generator
+        Pairs (task index, function result).
+    """
+    if workers == 1:
+        _initWorker(job)
+        for n, task in enumerate(tasks):
+            yield n, function(task)
+        return
+    with _executor(job, workers) as executor:
+        futures = {executor.submit(function, task): n for n, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,126 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module runs simulations that deliver the statistics of each day as soon as it is completed,
+e.g. to show the progress of a simulation in a dashboard or to stop a simulation that is no longer
+of interest. simulateIter is a generator and simulateAsync an asynchronous generator that simulates
+each day in an executor, so an asyncio server can run many simulations without blocking.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import asyncio
+from .dynamic import Simulation
+
+
+def simulateIter(population, virus, iterations: int, populationActivity, diagnosisPercentage, interaction, rng=None,
+                 writer=None, observer=None, stop=None, **kwargs):
+    """
+    Generator version of simamics.dynamic.simulate that yields the statistics of each day (see
+    simamics.visualization.Report.row) as soon as it is completed. The iteration can be stopped at
+    any time (e.g. with break or close()), after which the simulation and its population are
+    released unless they are referenced elsewhere.
+
+    Parameters
+    ------------
+    :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+        Population.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param iterations: int
+        Maximum number of days.
+    :param populationActivity: float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Population activity.
+    :param diagnosisPercentage: float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Percentage of test.
+    :param interaction: Interaction
+        Interaction function.
+    :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+        Seed or random number generator used by the simulation (see simamics.rng.makeRng).
+    :param writer: <optional> simamics.visualization.ReportWriter
+        Writer where each day of the report is written.
+    :param observer: <optional> simamics.dynamic.ObserverBase
+        Observer of the simulation.
+    :param stop: <optional> function
+        Stopping criterion (see simamics.dynamic.simulate).
+    :param kwargs:
+        Other parameters of simamics.dynamic.simulate (engine, transmissionPercentage, testing,
+        sampling and jit).
+
+    Return
+    ---------
+    :return: generator
+        Dictionary with the value of each statistic (see simamics.visualization.Report.COLUMNS) per
+        day. With the same seed the values are those of the report returned by simulate.
+
+    Examples
+    ---------
+    for day in simulateIter(population, virus, 200, 0.5, 0.3, interaction, rng=0):
+        print(day['timeUnits'], day['totalCases'])
+        if day['totalCases'] == 0:
+            break
+    """
+    simulation = Simulation(population, virus, populationActivity, diagnosisPercentage, interaction, rng=rng,
+                            writer=writer, observer=observer, **kwargs)
+    yield from simulation.iterate(iterations, stop=stop)
+
+
+async def simulateAsync(population, virus, iterations: int, populationActivity, diagnosisPercentage, interaction,
+                        rng=None, executor=None, **kwargs):
+    """
+    Asynchronous version of simulateIter. Each day is simulated in an executor (by default the
+    thread pool of the event loop), so the event loop is not blocked while the day is simulated
+    and several simulations can run at the same time. The iteration can be stopped at any time:
+    if a day is being simulated, the simulation is closed when it finishes.
+
+    Parameters
+    ------------
+    :param population: simamics.population.Population, ArrayPopulation or CompartmentalPopulation
+        Population.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param iterations: int
+        Maximum number of days.
+    :param populationActivity: float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Population activity.
+    :param diagnosisPercentage: float, array-like, dict, function or simamics.dynamic.ScheduleBase
+        Percentage of test.
+    :param interaction: Interaction
+        Interaction function.
+    :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+        Seed or random number generator used by the simulation (see simamics.rng.makeRng).
+    :param executor: <optional> concurrent.futures.Executor
+        Executor where the days are simulated. Default the executor of the event loop.
+    :param kwargs:
+        Other parameters of simulateIter.
+
+    Return
+    ---------
+    :return: async generator
+        Dictionary with the value of each statistic (see simamics.visualization.Report.COLUMNS) per
+        day.
+
+    Examples
+    ---------
+    async for day in simulateAsync(population, virus, 200, 0.5, 0.3, interaction, rng=0):
+        await websocket.send_json(day)
+    """
+    loop = asyncio.get_running_loop()
+    days = simulateIter(population, virus, iterations, populationActivity, diagnosisPercentage, interaction, rng=rng,
+                        **kwargs)
+    future = None
+    try:
+        while True:
+            future = loop.run_in_executor(executor, next, days, None)
+            # If the task is cancelled the day is still simulated in the executor
+            day = await asyncio.shield(future)
+            if day is None:
+                break
+            yield day
+    finally:
+        if future is not None and not future.done():
+            # The generator cannot be closed while the day is being simulated
+            future.add_done_callback(lambda _: days.close())
+        else:
+            days.close()
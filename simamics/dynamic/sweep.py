@@ -0,0 +1,217 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module runs a simulation (see simamics.dynamic.simulate) for every combination of a grid of
+parameters, e.g. different population activities and percentages of test. The cells of the grid are
+run in a pool of processes and can be saved to disk as they are completed, so an interrupted sweep
+can be resumed.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import json
+import itertools
+import numpy as np
+from ..visualization import EnsembleReport
+from .dynamic import simulate
+from .ensemble import _seed
+from .parallel import _getJob, _mapUnordered
+
+# Parameters of the grid that are passed to simulate(), the rest are Virus parameters
+SIMULATION_PARAMETERS = ('populationActivity', 'diagnosisPercentage')
+
+
+def _runCell(task: tuple):
+    """
+    Function that runs a replicate of a cell of the grid stored in the worker process.
+
+    Parameters
+    ------------
+    :param task: tuple
+        Cell index, replicate index and seed of the replicate.
+
+    Return
+    ---------
+    :return: simamics.visualization.Report
+        Report of the replicate.
+    """
+    cellIdx, replicate, seedSequence = task
+    job = _getJob()
+    cell = job['cells'][cellIdx]
+    with _seed(seedSequence) as rng:
+        virus = job['virus'].copy(**{name: value for name, value in cell.items()
+                                     if name not in SIMULATION_PARAMETERS})
+        return simulate(population=job['populationFactory'](), virus=virus, iterations=job['iterations'],
+                        populationActivity=cell['populationActivity'],
+                        diagnosisPercentage=cell['diagnosisPercentage'], interaction=job['interaction'],
+                        verbose=False, rng=rng)
+
+
+def _cost(cell: dict, virus):
+    """
+    Function that estimates how long a cell takes to run. Cells with higher activity and transmission
+    generate more interactions and infections.
+    """
+    return cell['populationActivity'], cell.get('transmissionPercentage', virus.transmissionPercentage)
+
+
+def _loadCheckpoint(checkpoint: str, metadata: dict):
+    """
+    Function that loads the cells saved in a checkpoint directory. If the directory does not exist it
+    is created.
+
+    Parameters
+    ------------
+    :param checkpoint: str
+        Checkpoint directory.
+    :param metadata: dict
+        Sweep parameters: grid (list of pairs name and values, in the order used to build the cells),
+        iterations, replicates and seed (None to use the seed of the checkpoint or, if it does not
+        exist, a random seed).
+
+    Return
+    ---------
+    :return: tuple
+        Seed of the sweep and dictionary with the statistics of each completed cell.
+    """
+    metadataFile = os.path.join(checkpoint, 'sweep.json')
+    if not os.path.exists(metadataFile):
+        if metadata['seed'] is None:
+            metadata = dict(metadata, seed=np.random.SeedSequence().entropy)
+        os.makedirs(checkpoint, exist_ok=True)
+        with open(metadataFile, 'w') as file:
+            json.dump(metadata, file)
+        return metadata['seed'], {}
+
+    with open(metadataFile) as file:
+        savedMetadata = json.load(file)
+    for parameter in ('grid', 'iterations', 'replicates', 'seed'):
+        if parameter == 'seed' and metadata['seed'] is None:
+            continue
+        if savedMetadata[parameter] != metadata[parameter]:
+            raise TypeError("The checkpoint %s was created with a different %s" % (checkpoint, parameter))
+    completed = {}
+    for fileName in os.listdir(checkpoint):
+        # Files being written (see _saveCell) start with '.tmp-'
+        if fileName.startswith('cell-') and fileName.endswith('.npz'):
+            with np.load(os.path.join(checkpoint, fileName)) as cellFile:
+                completed[int(fileName[5:-4])] = dict(cellFile)
+    return savedMetadata['seed'], completed
+
+
+def _saveCell(checkpoint: str, cellIdx: int, series: dict):
+    """
+    Function that saves the statistics of a completed cell in the checkpoint directory.
+    """
+    path = os.path.join(checkpoint, 'cell-%d.npz' % cellIdx)
+    temporaryPath = os.path.join(checkpoint, '.tmp-cell-%d.npz' % cellIdx)
+    np.savez(temporaryPath, **series)
+    # The file only appears once it has been completely written
+    os.replace(temporaryPath, path)
+
+
+def _table(cells: list, completed: dict, iterations: int):
+    """
+    Function that builds a columnar table with the statistics of all the cells.
+    """
+    columns = {}
+    for cellIdx, cell in enumerate(cells):
+        series = completed[cellIdx]
+        replicates = len(series['totalCases'])
+        rows = replicates * iterations
+        cellColumns = {name: np.full(rows, value) for name, value in cell.items()}
+        cellColumns['replicate'] = np.repeat(np.arange(replicates), iterations)
+        cellColumns['day'] = np.tile(np.arange(iterations), replicates)
+        cellColumns.update({statistic: values.ravel() for statistic, values in series.items()})
+        for name, values in cellColumns.items():
+            columns.setdefault(name, []).append(values)
+    return {name: np.concatenate(values) for name, values in columns.items()}
+
+
+def sweep(populationFactory, virus, iterations: int, interaction, grid: dict, replicates: int = 1,
+          workers: int = None, seed: int = None, checkpoint: str = None):
+    """
+    Function that runs several replicates of a simulation (see simamics.dynamic.simulate) for every
+    combination of the parameters of a grid.
+
+    The grid must define the populationActivity and the diagnosisPercentage of simulate() and can
+    define any parameter of the virus (see simamics.pathogen.Virus). All the replicates of all the
+    cells are run in a pool of processes, starting with the cells with higher activity (the ones
+    that take longer) so that the workers are balanced at the end of the sweep.
+
+    If a checkpoint directory is given every cell is saved to disk once all its replicates have
+    finished. Calling sweep() again with the same checkpoint only runs the cells that are missing,
+    with the same seeds they would have had in the first run (the seed of the checkpoint is used if
+    no seed is given).
+
+    Parameters
+    ------------
+    :param populationFactory: function
+        Function without arguments that returns a new population (see simulateEnsemble).
+    :param virus: simamics.pathogen.Virus
+        Virus. The parameters of the grid replace those of the virus.
+    :param iterations: int
+        Number of simulation interactions.
+    :param interaction: Interaction
+        Interaction function.
+    :param grid: dict
+        Values of each parameter. A single value can be given for fixed parameters.
+    :param replicates: <optional> int
+        Number of replicates per cell. Default 1.
+    :param workers: <optional> int
+        Number of processes. Default os.cpu_count().
+    :param seed: <optional> int
+        Seed of the sweep. By default a random seed is used.
+    :param checkpoint: <optional> str
+        Directory where the completed cells are saved.
+
+    Return
+    ---------
+    :return: dict
+        Columnar table (e.g. pandas.DataFrame(table)) with a row per cell, replicate and day. The
+        columns are the grid parameters, 'replicate', 'day' and the statistics of
+        simamics.visualization.EnsembleReport.series.
+    """
+    grid = {name: [value.item() if hasattr(value, 'item') else value for value in np.atleast_1d(values)]
+            for name, values in grid.items()}
+    for parameter in SIMULATION_PARAMETERS:
+        if parameter not in grid:
+            raise TypeError("The grid must define %s" % parameter)
+    for parameter in grid:
+        if parameter not in SIMULATION_PARAMETERS and parameter not in virus.parameters:
+            raise TypeError("%s is not a simulation or Virus parameter" % parameter)
+
+    # The parameters are sorted so that the index of each cell does not depend on the order of the grid
+    names = sorted(grid)
+    cells = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    cells = [{name: cell[name] for name in grid} for cell in cells]
+    completed = {}
+    if checkpoint is not None:
+        seed, completed = _loadCheckpoint(checkpoint, dict(grid=[[name, grid[name]] for name in names],
+                                                           iterations=iterations, replicates=replicates, seed=seed))
+    elif seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    # Each cell has its own seed so that resuming the sweep does not change the results
+    cellSeeds = np.random.SeedSequence(seed).spawn(len(cells))
+    pending = sorted(set(range(len(cells))) - set(completed), key=lambda n: _cost(cells[n], virus), reverse=True)
+    tasks = [(cellIdx, replicate, replicateSeed) for cellIdx in pending
+             for replicate, replicateSeed in enumerate(cellSeeds[cellIdx].spawn(replicates))]
+
+    job = dict(populationFactory=populationFactory, virus=virus, iterations=iterations,
+               interaction=interaction, cells=cells)
+    reports = {cellIdx: [None] * replicates for cellIdx in pending}
+    remaining = {cellIdx: replicates for cellIdx in pending}
+    workers = max(1, min(workers or os.cpu_count(), len(tasks)))
+    for taskIdx, report in _mapUnordered(_runCell, job, tasks, workers):
+        cellIdx, replicate, _ = tasks[taskIdx]
+        reports[cellIdx][replicate] = report
+        remaining[cellIdx] -= 1
+        if remaining[cellIdx] == 0:
+            completed[cellIdx] = EnsembleReport(reports.pop(cellIdx)).series
+            if checkpoint is not None:
+                _saveCell(checkpoint, cellIdx, completed[cellIdx])
+
+    return _table(cells, completed, iterations)
@@ -0,0 +1,246 @@
+"""
+*************************************************************************************************
+************************************// DYNAMIC MODULE //*****************************************
+*************************************************************************************************
+This module implements the simulation steps (see simamics.dynamic.dynamic) for populations described
+by compartments (see simamics.population.CompartmentalPopulation). Instead of simulating each
+individual, the number of individuals that change of compartment is drawn from its distribution
+(tau-leaping with a step of one interaction round), so the cost does not depend on the population
+size.
+
+The model follows the individual simulation: in each interaction round every individual contacts a
+random individual and, if the individual is infected and the contact is healthy, the virus is
+transmitted with probability Virus.transmissionPercentage. A contact takes place with probability
+equal to the product of both interaction capacities, therefore a healthy individual is infected in a
+round with probability
+
+    1 - exp(-transmissionPercentage * (sum of the capacities of the infected) / population size)
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from ..population.CompartmentalPopulation import *
+from ..pathogen import Virus
+
+# Number of tau-leaping steps in which each interaction round is divided (see _generateInteractions)
+_STEPS_PER_ROUND = 16
+
+
+def _stateProbabilities(virus: Virus):
+    """
+    Function that returns the probability of each infected state (see INFECTED_TAGS) given that the
+    virus has been transmitted.
+    """
+    return np.diff([0, virus.lightPercentage, virus.mildPercentage, virus.severePercentage, 1])
+
+
+def _kill(population: CompartmentalPopulation, virus: Virus, rng):
+    """
+    Function that kill severe individuals based on virus death rate.
+
+    Parameters
+    -------------
+    :param population: simamics.population.CompartmentalPopulation
+        Population.
+    :param virus:  simamics.pathogen.Virus
+        Virus
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: int
+        Number of death individuals.
+    """
+    severe = population.infected[SYMPTOMATIC_SEVERE - SYMPTOMATIC_LIGHT]
+    deathIndividuals = rng.binomial(severe, virus.deathRate)
+    severe -= deathIndividuals
+    numDeaths = int(deathIndividuals.sum())
+    population.deaths += numDeaths
+    return numDeaths
+
+
+def _generateInteractions(population: CompartmentalPopulation, virus: Virus, populationActivity: float,
+                          interaction, rng):
+    """
+    Function that simulates the interactions between individuals in the population. Each round the
+    number of new infections is drawn from a binomial distribution and their states from a
+    multinomial distribution (see simamics.pathogen.Virus). The number of contacts and attempts are
+    drawn from Poisson distributions with the expected value of the individual simulation.
+
+    Parameters
+    ------------
+    :param interaction: Interaction
+        Interaction.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param population: simamics.population.CompartmentalPopulation
+        Population.
+    :param populationActivity: float
+        Population activity.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: tuple
+        Number of contacts, number of contacts between an infected and a healthy individual and
+        number of infections.
+    """
+    size = len(population)
+    numOfInteractions = interaction.interactions(size, populationActivity, population.space)
+    stateProbabilities = _stateProbabilities(virus)
+    contacts, attempts, infections = 0, 0, 0
+    # Each step of the round corresponds to the contacts initiated by 1/_STEPS_PER_ROUND of the
+    # population, so that individuals infected early in a round transmit the virus in the same round
+    stepSize = size * _STEPS_PER_ROUND
+    for n in range(numOfInteractions * _STEPS_PER_ROUND):
+        pressure = population.infectionPressure
+        healthy = population.healthy
+        newInfections = int(rng.binomial(healthy, -np.expm1(-virus.transmissionPercentage * pressure / stepSize)))
+        population.infected[:, 0, 0] += rng.multinomial(newInfections, stateProbabilities)
+        population.healthy -= newInfections
+        contacts += int(rng.poisson(population.totalCapacity ** 2 / stepSize))
+        # Every infection needs an attempt
+        attempts += max(int(rng.poisson(pressure * healthy / stepSize)), newInfections)
+        infections += newInfections
+
+    return contacts, attempts, infections
+
+
+def _increment(population: CompartmentalPopulation, virus: Virus, rng):
+    """
+    Function that advances the number of days that patients have been infected. If the life time of
+    the virus follows a distribution (see Virus.lifeTimeProbabilities) the number of recoveries of
+    each compartment is drawn from a binomial distribution with the probability that an infection
+    that has lasted that number of days ends.
+
+    Parameters
+    -------------
+    :param population: simamics.population.CompartmentalPopulation
+        Population.
+    :param virus: simamics.pathogen.Virus
+        Virus.
+    :param rng: numpy.random.Generator
+        Random number generator.
+
+    Return
+    ---------
+    :return: int
+        Number of recovered individuals.
+    """
+    infected = population.infected
+    probabilities = virus.lifeTimeProbabilities
+    maxLifeTime = virus.lifeTime if probabilities is None else len(probabilities) - 1
+    if infected.shape[2] < maxLifeTime + 1:
+        infected = np.pad(infected, ((0, 0), (0, 0), (0, maxLifeTime + 1 - infected.shape[2])))
+    if probabilities is None:
+        # Individuals infected for more than lifeTime days after the increment are immunized
+        recovered = int(infected[:, :, maxLifeTime:].sum())
+        population.infected = np.zeros_like(infected)
+        population.infected[:, :, 1:maxLifeTime + 1] = infected[:, :, :maxLifeTime]
+        population.immunized += recovered
+        return recovered
+
+    # Probability that an infection that has lasted each number of days ends with the increment
+    survival = np.cumsum(probabilities[::-1])[::-1]
+    hazards = np.ones(infected.shape[2])
+    hazards[:maxLifeTime] = np.divide(probabilities[:maxLifeTime], survival[:maxLifeTime],
+                                      out=np.ones(maxLifeTime), where=survival[:maxLifeTime] > 0)
+    hazards = np.broadcast_to(hazards, infected.shape)
+    recoveries = np.where(hazards >= 1, infected, 0)
+    random = (hazards > 0) & (hazards < 1) & (infected > 0)
+    recoveries[random] = rng.binomial(infected[random], hazards[random])
+    remaining = infected - recoveries
+    population.infected = np.zeros_like(infected)
+    population.infected[:, :, 1:] = remaining[:, :, :-1]
+    recovered = int(recoveries.sum())
+    population.immunized += recovered
+    return recovered
+
+
+def _allocateTests(candidates: np.ndarray, numberOfTest: int):
+    """
+    Function that gives a number of tests to the candidates of shape (states, days), testing first
+    the individuals infected more recently. Within the same day the tests are distributed among the
+    states in proportion to the number of candidates (largest remainder method).
+
+    Return
+    ---------
+    :return: np.ndarray
+        Number of diagnosed individuals of each state and day.
+    """
+    # Days whose candidates are all diagnosed and day whose candidates are partially diagnosed
+    candidatesPerDay = np.cumsum(candidates.sum(axis=0))
+    lastDay = int(np.searchsorted(candidatesPerDay, numberOfTest))
+    diagnosed = np.zeros_like(candidates)
+    diagnosed[:, :lastDay] = candidates[:, :lastDay]
+    remaining = numberOfTest - int(diagnosed.sum())
+    if remaining > 0:
+        lastDayCandidates = candidates[:, lastDay]
+        quotas = lastDayCandidates * (remaining / lastDayCandidates.sum())
+        lastDayDiagnosed = np.floor(quotas).astype(np.int64)
+        remainder = remaining - int(lastDayDiagnosed.sum())
+        lastDayDiagnosed[np.argsort(lastDayDiagnosed - quotas, kind='stable')[:remainder]] += 1
+        diagnosed[:, lastDay] = lastDayDiagnosed
+    return diagnosed
+
+
+def _diagnosingPopulation(population: CompartmentalPopulation, diagnosisPercentage: float, testing=None, rng=None):
+    """
+    Function that performs the diagnosis. Diagnosed individuals have an interaction capacity of
+    0.01.
+
+    The individual simulation always tests the undiagnosed symptomatic individuals in the order of
+    the population, so the individuals at the beginning of the population are diagnosed as soon as
+    they are infected and the rest are rarely diagnosed. To reproduce it, the tests are given to the
+    individuals infected more recently (see _allocateTests). With the 'fifo' and 'priority' orders of
+    a testing policy the individuals infected first are tested first.
+
+    Parameters
+    ------------
+    :param population: simamics.population.CompartmentalPopulation
+        Population
+    :param diagnosisPercentage: float
+        Percentage of test.
+    :param testing: <optional> simamics.dynamic.Testing
+        Testing policy.
+    :param rng: <optional> numpy.random.Generator
+        Random number generator (only used by the random tests of the testing policy).
+
+    Return
+    ---------
+    :return: int
+        Number of diagnosed individuals.
+    """
+    candidates = population.infected[:NUM_SYMPTOMATIC, 0]
+    numberOfTest = int(diagnosisPercentage * population.infectedWithoutDiagnosis) if testing is None else \
+        testing.numberOfTests(population, diagnosisPercentage)
+    numberOfTest = min(numberOfTest, int(candidates.sum()))
+    numRandom = 0
+    if testing is not None:
+        asymptomatic = population.infected[NUM_SYMPTOMATIC, 0]
+        numRandom = testing.randomlyDiagnosed(population, int(asymptomatic.sum()), rng)
+    if numberOfTest == 0 and numRandom == 0:
+        return 0
+
+    if testing is None or testing.order == 'index':
+        diagnosed = _allocateTests(candidates, numberOfTest)
+    elif testing.order == 'fifo':
+        diagnosed = _allocateTests(candidates[:, ::-1], numberOfTest)[:, ::-1]
+    else:
+        # Severe, mild and light cases, each of them in order of infection
+        diagnosed = np.zeros_like(candidates)
+        remaining = numberOfTest
+        for state in reversed(range(NUM_SYMPTOMATIC)):
+            stateTests = min(remaining, int(candidates[state].sum()))
+            diagnosed[state] = _allocateTests(candidates[state:state + 1, ::-1], stateTests)[0, ::-1]
+            remaining -= int(diagnosed[state].sum())
+    candidates -= diagnosed
+    population.infected[:NUM_SYMPTOMATIC, 1] += diagnosed
+    if numRandom > 0:
+        randomDiagnosed = rng.multivariate_hypergeometric(asymptomatic, numRandom)
+        asymptomatic -= randomDiagnosed
+        population.infected[NUM_SYMPTOMATIC, 1] += randomDiagnosed
+    return numberOfTest + numRandom
@@ -8,8 +8,10 @@ percentage of cases and the percentage of transmission.
 Author: Fernando García Gutiérrez
 Email: fernando.garciagu@upm.es
 """
+import math
+import numpy as np
 from ..states.states import *
-import random
+from ..rng import makeRng, getState, fromState
 
 
 class Virus:
@@ -38,10 +40,21 @@ class Virus:
 
     transmissionPercentage : float
         Ability to infect new hosts.
+
+    lifeTimeProbabilities : np.ndarray
+        Probability that the infection of an individual lasts each number of days (index), or None
+        if it always lasts lifeTime days.
+
+    parameters : dict
+        Parameters used to define the virus.
+
+    rng : numpy.random.Generator
+        Random number generator used by Virus.infect.
     """
 
     def __init__(self, lifeTime: int, deathRate: float, lightPercentage: float, mildPercentage: float,
-                 severePercentage: float, asymptomaticPercentage: float, transmissionPercentage: float):
+                 severePercentage: float, asymptomaticPercentage: float, transmissionPercentage: float,
+                 lifeTimeDistribution=None, rng=None):
         """
         Definition of some basic aspects of the virus such as its half-life, percentage of death,
         transmission capacity and percentage of each of the states that the virus can produce (must sum 1).
@@ -68,7 +81,22 @@ class Virus:
 
         :param transmissionPercentage: float
             Ability to infect new hosts.
+
+        :param lifeTimeDistribution: <optional> str or array-like
+            Distribution of the number of days the infection of each individual lasts: 'poisson' or
+            'geometric' with mean lifeTime, or the probability that it lasts 1, 2, 3... days. By
+            default the infection always lasts lifeTime days.
+
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator used by Virus.infect (see simamics.rng.makeRng).
         """
+        self.rng = makeRng(rng)
+        self.parameters = dict(lifeTime=lifeTime, deathRate=deathRate, lightPercentage=lightPercentage,
+                               mildPercentage=mildPercentage, severePercentage=severePercentage,
+                               asymptomaticPercentage=asymptomaticPercentage,
+                               transmissionPercentage=transmissionPercentage,
+                               lifeTimeDistribution=lifeTimeDistribution if lifeTimeDistribution is None or
+                               isinstance(lifeTimeDistribution, str) else np.asarray(lifeTimeDistribution).tolist())
         self.lifeTime = lifeTime
         self.deathRate = deathRate
         self.lightPercentage = lightPercentage
@@ -76,6 +104,9 @@ class Virus:
         self.severePercentage = self.mildPercentage + severePercentage
         self.asymptomaticPercentage = self.severePercentage + asymptomaticPercentage
         self.transmissionPercentage = transmissionPercentage
+        self.lifeTimeProbabilities = self._lifeTimeProbabilities(lifeTimeDistribution)
+        if self.lifeTimeProbabilities is not None:
+            self._lifeTimeCdf = np.cumsum(self.lifeTimeProbabilities)
         if (lightPercentage + severePercentage + mildPercentage + asymptomaticPercentage) != 1:
             raise TypeError("Percentages have to sum 1, instead mildPercentage + severePercentage"
                             " + asymptomaticPercentage sum %.2f" %
@@ -91,21 +122,112 @@ class Virus:
     def __str__(self):
         return self.__repr__()
 
+    def _lifeTimeProbabilities(self, distribution):
+        """
+        Return the probability that the infection lasts each number of days (see
+        Virus.lifeTimeProbabilities). The infection lasts at least one day.
+        """
+        if distribution is None:
+            return None
+        if isinstance(distribution, str):
+            if distribution == 'poisson' and self.lifeTime <= 0:
+                # All the infections last the minimum of one day
+                probabilities = np.array([0.0, 1.0])
+            elif distribution == 'poisson':
+                days = np.arange(int(self.lifeTime + 10 * math.sqrt(self.lifeTime) + 10))
+                probabilities = np.exp(days * math.log(self.lifeTime) - self.lifeTime -
+                                       np.array([math.lgamma(day + 1) for day in days]))
+            elif distribution == 'geometric':
+                p = 1 / max(self.lifeTime, 1)
+                days = np.arange(int(math.log(1e-12) / math.log(1 - p)) + 2 if p < 1 else 2)
+                probabilities = p * (1 - p) ** np.maximum(days - 1, 0)
+            else:
+                raise TypeError("Unknown life time distribution %s, available distributions: poisson, geometric"
+                                % distribution)
+        else:
+            probabilities = np.concatenate([[0], np.asarray(distribution, dtype=np.float64)])
+            if (probabilities < 0).any() or probabilities.sum() <= 0:
+                raise TypeError("The life time probabilities must be positive")
+        probabilities[0] = 0
+        return probabilities / probabilities.sum()
+
+    def lifeTimes(self, size: int, rng=None):
+        """
+        Function that draws the number of days the infection of several individuals lasts (see
+        lifeTimeDistribution). When the infection always lasts lifeTime days no random numbers are
+        drawn.
+
+        Parameters
+        ------------
+        :param size: int
+            Number of individuals.
+        :param rng: <optional> numpy.random.Generator
+            Random number generator. By default the generator of the virus is used.
+
+        Return
+        ---------
+        :return: np.ndarray (uint16)
+            Number of days of each infection.
+        """
+        if self.lifeTimeProbabilities is None:
+            return np.full(size, self.lifeTime, dtype=np.uint16)
+        rng = self.rng if rng is None else rng
+        days = np.searchsorted(self._lifeTimeCdf, rng.random(size), side='right')
+        return np.minimum(days, len(self.lifeTimeProbabilities) - 1).astype(np.uint16)
+
+    def copy(self, **changes):
+        """
+        Return a new virus with the same parameters except those given as keyword arguments. The new
+        virus has a copy of the random number generator of this virus (see Virus.infect).
+
+        Parameters
+        ------------
+        :param changes:
+            Parameters to change (see Virus.__init__).
+
+        Return
+        ---------
+        :return: simamics.pathogen.Virus
+            New virus.
+        """
+        for parameter in changes:
+            if parameter not in self.parameters:
+                raise TypeError("Virus has no parameter %s" % parameter)
+        return Virus(**{**self.parameters, **changes}, rng=fromState(getState(self.rng)))
+
     @property
     def infect(self):
+        """
+        Function that determines if the infection occurs and the state in which the infected individual
+        will be based on the parameters provided in their builder. It uses the random number generator
+        of the virus (see Virus.infection).
+
+        Return
+        ---------
+        :return: coronvarius.states.State
+            New individual state.
+        """
+        return self.infection(self.rng)
+
+    def infection(self, rng):
         """
         Function that determines if the infection occurs and the state in which the infected individual
         will be based on the parameters provided in their builder.
 
+        Parameters
+        ------------
+        :param rng: numpy.random.Generator
+            Random number generator.
+
         Return
         ---------
         :return: coronvarius.states.State
             New individual state.
         """
-        if random.uniform(1, 0) > self.transmissionPercentage:
+        if rng.random() > self.transmissionPercentage:
             # The virus does not infect the individual
             return Healthy()
-        randomNum = random.uniform(1, 0)
+        randomNum = rng.random()
         if randomNum <= self.lightPercentage:
             # The virus infect the individual creating a light disease
             return SymptomaticLight()
@@ -118,3 +240,27 @@ class Virus:
         else:
             # The virus infect the individual creating a asymptomatic disease
             return Asymptomatic()
+
+    def infections(self, size: int, rng=None):
+        """
+        Vectorized version of Virus.infection that determines the result of several independent
+        infection attempts at once.
+
+        Parameters
+        ------------
+        :param size: int
+            Number of infection attempts.
+        :param rng: <optional> numpy.random.Generator
+            Random number generator. By default the generator of the virus is used.
+
+        Return
+        ---------
+        :return: np.ndarray (int8)
+            Tag of the new state of each individual (HEALTHY if the virus does not infect them).
+        """
+        rng = self.rng if rng is None else rng
+        tags = SYMPTOMATIC_LIGHT + np.searchsorted(
+            [self.lightPercentage, self.mildPercentage, self.severePercentage], rng.random(size))
+        # The virus does not infect the individual
+        tags[rng.random(size) > self.transmissionPercentage] = HEALTHY
+        return tags.astype(np.int8)
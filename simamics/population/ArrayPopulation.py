@@ -0,0 +1,805 @@
+"""
+*************************************************************************************************
+***********************************// POPULATION MODULE //***************************************
+*************************************************************************************************
+In this module an array-backed population is defined. Instead of storing a list of individuals, the
+population state is kept in a set of NumPy arrays (one entry per individual) so that large populations
+can be simulated without allocating an object per individual.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import json
+import shutil
+import numpy as np
+from collections.abc import Sequence
+from . import Individual
+from .Population import STATE_KEYS, _stateCounts
+from ..states import *
+from ..rng import makeRng
+
+# The state of each individual is stored as a state code, the integer tag of the state (see
+# simamics.states)
+
+# Interaction capacity associated with each code
+CAPACITIES = np.array([state.interactionCapacity for state in STATES], dtype=np.float32)
+
+# Interaction capacity of a diagnosed individual
+DIAGNOSED_CAPACITY = 0.01
+
+# File with the scalar attributes of a saved population (see ArrayPopulation.save)
+POPULATION_FILE = 'population.json'
+
+
+def _saveArrays(path: str, arrays: dict):
+    """
+    Function that saves each array in a .npy file of a new directory.
+    """
+    os.makedirs(path)
+    for name, values in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(values))
+
+
+def _loadArrays(path: str, mmap: bool):
+    """
+    Function that loads the .npy files of a directory. Memory-mapped arrays are copy-on-write: they
+    can be modified without modifying the files.
+    """
+    return {fileName[:-4]: np.load(os.path.join(path, fileName), mmap_mode='c' if mmap else None)
+            for fileName in sorted(os.listdir(path)) if fileName.endswith('.npy')}
+
+
+def stateCode(state: State):
+    """
+    Return the integer code associated with a state instance.
+
+    Parameters
+    ------------
+    :param state: simamics.states.State
+        State instance.
+
+    Return
+    --------
+    :return: int
+        State code.
+    """
+    if state.tag is None:
+        raise TypeError("State %s cannot be stored in an ArrayPopulation" % state)
+    return state.tag
+
+
+def isInfected(codes):
+    """
+    Return True (or a boolean mask) for the codes that correspond to infected states.
+    """
+    return (codes >= SYMPTOMATIC_LIGHT) & (codes <= ASYMPTOMATIC)
+
+
+def isSymptomatic(codes):
+    """
+    Return True (or a boolean mask) for the codes that correspond to symptomatic states.
+    """
+    return (codes >= SYMPTOMATIC_LIGHT) & (codes <= SYMPTOMATIC_SEVERE)
+
+
+class IndividualView(Individual):
+    """
+    Individual whose data lives in an ArrayPopulation. The view does not store any data, reading
+    and writing its attributes reads and writes the population arrays.
+
+    """
+    def __init__(self, population, idx):
+        """
+        Parameters
+        ------------
+        :param population: simamics.population.ArrayPopulation
+            Population where the individual data is stored.
+        :param idx: int
+            Individual index in population.
+        """
+        self.population = population
+        self._idx = idx
+
+    @property
+    def state(self):
+        return STATES[self.population.states[self._idx]]
+
+    @state.setter
+    def state(self, newState):
+        """
+        Change individual state. Setter method.
+
+        Parameter
+        -----------
+        :param newState: simamics.states.State
+            New individual state.
+        """
+        self.population.setState(self._idx, stateCode(newState))
+
+    @property
+    def daysWithInfection(self):
+        return int(self.population.daysInfected[self._idx])
+
+    @daysWithInfection.setter
+    def daysWithInfection(self, value):
+        self.population.daysInfected[self._idx] = value
+        if self.population.lifeTimes[self._idx] > 0:
+            # The recovery is scheduled again
+            self.population.scheduleRecovery(self._idx, self.population.lifeTimes[self._idx])
+
+    @property
+    def lifeTime(self):
+        lifeTime = int(self.population.lifeTimes[self._idx])
+        return lifeTime if lifeTime > 0 else None
+
+    @lifeTime.setter
+    def lifeTime(self, value):
+        if value is not None:
+            self.population.scheduleRecovery(self._idx, value)
+
+    @property
+    def interactionCapacity(self):
+        return float(self.population.interactionCapacity[self._idx])
+
+    @interactionCapacity.setter
+    def interactionCapacity(self, value):
+        self.population.interactionCapacity[self._idx] = value
+
+    @property
+    def diagnosed(self):
+        return bool(self.population.diagnosed[self._idx])
+
+    @diagnosed.setter
+    def diagnosed(self, value):
+        self.population.setDiagnosed(self._idx, value)
+
+
+class _CalendarQueue:
+    """
+    Calendar queue of the recoveries of an ArrayPopulation: the indices of the individuals are
+    stored in a bucket per day, so each day only the individuals whose recovery is due are processed.
+    """
+    def __init__(self):
+        # Current day of the queue and indices of the individuals of each day
+        self.now = 0
+        self.buckets = {}
+
+    def push(self, idx: np.ndarray, delays: np.ndarray):
+        """
+        Add individuals to the bucket of the day after the given number of pops (0 for the next one).
+        """
+        if len(idx) == 0:
+            return
+        order = np.argsort(delays, kind='stable')
+        idx, delays = idx[order], delays[order]
+        days, starts = np.unique(delays, return_index=True)
+        for day, group in zip(days.tolist(), np.split(idx, starts[1:])):
+            self.buckets.setdefault(self.now + day, []).append(group)
+
+    def pop(self):
+        """
+        Return the individuals of the current day and advance to the next day.
+        """
+        groups = self.buckets.pop(self.now, [])
+        self.now += 1
+        return np.concatenate(groups) if groups else np.zeros(0, dtype=np.int64)
+
+    def compact(self, newIndex: np.ndarray, keep: np.ndarray):
+        """
+        Update the indices after the population has been compacted (see ArrayPopulation._compact).
+        """
+        for day, groups in self.buckets.items():
+            idx = np.concatenate(groups)
+            self.buckets[day] = [newIndex[idx[keep[idx]]]]
+
+
+class _IndividualViews(Sequence):
+    """
+    Lazy sequence of IndividualView instances over an ArrayPopulation.
+    """
+    def __init__(self, population):
+        self.population = population
+
+    def __len__(self):
+        return len(self.population)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[n] for n in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("Individual index out of range")
+        return IndividualView(self.population, idx)
+
+
+class ArrayPopulation:
+    """
+    Class that represents a population whose individuals are stored as a structure of arrays. It has
+    the same interface as simamics.population.Population, but the individuals are only created (as
+    IndividualView instances) when they are accessed.
+
+    Attributes
+    ------------
+    space : int
+        Space where population lives.
+
+    deaths : int
+        Number of deaths individuals.
+
+    previousPopulation : int
+        Population size from n-1 interaction.
+
+    states : np.ndarray (int8)
+        State code of each individual (see simamics.states.STATES).
+
+    daysInfected : np.ndarray (uint16)
+        Number of days each individual has been infected.
+
+    diagnosed : np.ndarray (bool)
+        If each individual has been diagnosed or not.
+
+    interactionCapacity : np.ndarray (float32)
+        Interaction capacity of each individual.
+
+    lifeTimes : np.ndarray (uint16)
+        Number of days the infection of each infected individual lasts (see scheduleRecovery), 0 if
+        it has not been drawn yet.
+
+    contacts : simamics.population.ContactStructureBase
+        Structure that selects the contacts of each individual (e.g. ContactGraph or SpatialGrid).
+        If None the contacts are selected uniformly at random from the whole population.
+
+    The population keeps the number of individuals in each state, the number of diagnosed
+    infected individuals and the indices of the infected individuals (see infectedIndices) up to
+    date, so the states and diagnosis must be changed using setState() and setDiagnosed() instead of
+    writing the arrays directly. The recoveries are kept in a calendar queue (see scheduleRecovery and
+    dueRecoveries).
+    """
+    def __init__(self, initialCases, populationSize, space, rng=None, contacts=None):
+        """
+        A population has a series of initial cases, a size and a space where individuals live.
+
+        Parameters
+        --------------
+        :param initialCases: int
+            Number of initial cases.
+        :param populationSize:
+            Initial population size.
+        :param space:
+            Space where the population lives.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator used to place the initial cases (see simamics.rng.makeRng).
+        :param contacts: <optional> simamics.population.ContactStructureBase
+            Contact structure with an entry per individual. Default None (random contacts). The
+            population uses a copy, so the same structure can be given to several populations.
+        """
+        if contacts is not None and len(contacts) != populationSize:
+            raise TypeError("The contact structure has %d individuals instead of %d" % (len(contacts), populationSize))
+        self.space = space
+        # The structure is compacted when individuals die (see removeMany)
+        self.contacts = contacts.copy() if contacts is not None else None
+        self.deaths = 0
+        self.previousPopulation = populationSize
+        # Initialize a fully healthy population
+        self.states = np.full(populationSize, HEALTHY, dtype=np.int8)
+        self.daysInfected = np.zeros(populationSize, dtype=np.uint16)
+        self.diagnosed = np.zeros(populationSize, dtype=bool)
+        self.interactionCapacity = np.full(populationSize, CAPACITIES[HEALTHY], dtype=np.float32)
+        self.lifeTimes = np.zeros(populationSize, dtype=np.uint16)
+        # Number of individuals per state and number of diagnosed infected individuals
+        self._counts = np.zeros(len(STATES), dtype=np.int64)
+        self._counts[HEALTHY] = populationSize
+        self._diagnosedInfected = 0
+        # Indices of the infected individuals in order of infection and indices infected since the
+        # last call to infectedIndices()
+        self._infected = np.zeros(0, dtype=np.int64)
+        self._newInfected = []
+        # Recoveries and indices of the individuals infected without a scheduled recovery
+        self._calendar = _CalendarQueue()
+        self._unscheduled = []
+        # Introduce initial cases (only SymptomaticLight) at random positions
+        self.setState(makeRng(rng).choice(populationSize, initialCases, replace=False), SYMPTOMATIC_LIGHT)
+
+    @classmethod
+    def fromCounts(cls, cases: dict, space, populationSize: int = None, rng=None, contacts=None):
+        """
+        Build a population with a number of individuals in each state at random positions (see
+        simamics.population.Population.fromCounts). The arrays are filled at once, without
+        creating the individuals one by one. The infected individuals are infected for 0 days and
+        not diagnosed.
+
+        Parameters
+        --------------
+        :param cases: dict
+            Number of individuals of each state (see STATE_KEYS) or, if the population size is given,
+            fraction of the population in each state. If the healthy individuals are not given they
+            are the rest of the population.
+        :param space:
+            Space where the population lives.
+        :param populationSize: <optional> int
+            Population size, required to give fractions.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator used to place the individuals (see simamics.rng.makeRng).
+        :param contacts: <optional> simamics.population.ContactStructureBase
+            Contact structure with an entry per individual. Default None (random contacts). The
+            population uses a copy, so the same structure can be given to several populations.
+
+        Return
+        --------
+        :return: simamics.population.ArrayPopulation
+        """
+        states = np.repeat(np.arange(len(STATES), dtype=np.int8), _stateCounts(cases, populationSize))
+        if contacts is not None and len(contacts) != len(states):
+            raise TypeError("The contact structure has %d individuals instead of %d" % (len(contacts), len(states)))
+        makeRng(rng).shuffle(states)
+        arrays = dict(states=states, daysInfected=np.zeros(len(states), dtype=np.uint16),
+                      diagnosed=np.zeros(len(states), dtype=bool), interactionCapacity=CAPACITIES[states])
+        return cls._fromArrays(dict(space=space, deaths=0, previousPopulation=len(states)), arrays,
+                               contacts=contacts.copy() if contacts is not None else None)
+
+    def save(self, path: str):
+        """
+        Save the population (and its contact structure) in a directory with an .npy file per array
+        (states, daysInfected, diagnosed, interactionCapacity...) and the scalar attributes in
+        population.json. ArrayPopulation.load memory-maps the arrays, so the same population can be
+        used as the starting point of many simulations without building it again. A directory with a
+        previously saved population is replaced.
+
+        Parameters
+        ------------
+        :param path: str
+            Directory.
+        """
+        if os.path.isdir(path) and os.listdir(path):
+            if not os.path.exists(os.path.join(path, POPULATION_FILE)):
+                raise TypeError("%s is not empty and does not contain a saved population" % path)
+            shutil.rmtree(path)
+        attributes, arrays = self._toArrays()
+        meta = dict(attributes={name: value.item() if isinstance(value, np.generic) else value
+                                for name, value in attributes.items()}, contacts=None)
+        _saveArrays(os.path.join(path, 'population'), arrays)
+        if self.contacts is not None:
+            contactAttributes, contactArrays = self.contacts._toArrays()
+            meta['contacts'] = dict(type=type(self.contacts).__name__, attributes=contactAttributes)
+            _saveArrays(os.path.join(path, 'contacts'), contactArrays)
+        with open(os.path.join(path, POPULATION_FILE), 'w') as file:
+            json.dump(meta, file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """
+        Load a population saved with ArrayPopulation.save. By default the arrays are memory-mapped
+        copy-on-write: they are read from disk when they are used and the simulation does not
+        modify the saved population.
+
+        Parameters
+        ------------
+        :param path: str
+            Directory.
+        :param mmap: <optional> bool
+            Memory-map the arrays instead of reading them. Default True.
+
+        Return
+        --------
+        :return: simamics.population.ArrayPopulation
+        """
+        from .ContactGraph import ContactGraph
+        from .SpatialGrid import SpatialGrid
+        metaFile = os.path.join(path, POPULATION_FILE)
+        if not os.path.exists(metaFile):
+            raise TypeError("%s does not contain a saved population" % path)
+        with open(metaFile) as file:
+            meta = json.load(file)
+        contacts = None
+        if meta['contacts'] is not None:
+            contactTypes = {contactType.__name__: contactType for contactType in (ContactGraph, SpatialGrid)}
+            contacts = contactTypes[meta['contacts']['type']]._fromArrays(
+                meta['contacts']['attributes'], _loadArrays(os.path.join(path, 'contacts'), mmap))
+        return cls._fromArrays(meta['attributes'], _loadArrays(os.path.join(path, 'population'), mmap),
+                               contacts=contacts)
+
+    @classmethod
+    def fromPopulation(cls, population):
+        """
+        Build an ArrayPopulation with the same individuals as a simamics.population.Population.
+
+        Parameters
+        ------------
+        :param population: simamics.population.Population
+            Population.
+
+        Return
+        --------
+        :return: simamics.population.ArrayPopulation
+        """
+        arrayPopulation = cls(0, len(population.population), population.space)
+        arrayPopulation.deaths = population.deaths
+        arrayPopulation.previousPopulation = population.previousPopulation
+        for idx, individual in enumerate(population.population):
+            view = IndividualView(arrayPopulation, idx)
+            view.state = individual.state
+            view.diagnosed = individual.diagnosed
+            view.daysWithInfection = individual.daysWithInfection
+            view.interactionCapacity = individual.interactionCapacity
+            if individual.state.infected:
+                view.lifeTime = individual.lifeTime
+        return arrayPopulation
+
+    def _toArrays(self):
+        """
+        Return the population as arrays (see simamics.dynamic.checkpoint).
+
+        Return
+        ---------
+        :return: tuple
+            Dictionary with the scalar attributes and dictionary with the population arrays.
+        """
+        attributes = dict(space=self.space, deaths=self.deaths, previousPopulation=self.previousPopulation)
+        arrays = dict(states=self.states, daysInfected=self.daysInfected, diagnosed=self.diagnosed,
+                      interactionCapacity=self.interactionCapacity, lifeTimes=self.lifeTimes,
+                      infectedOrder=self.infectedIndices())
+        return attributes, arrays
+
+    @classmethod
+    def _fromArrays(cls, attributes: dict, arrays: dict, contacts=None):
+        """
+        Build a population from the arrays returned by ArrayPopulation._toArrays. The arrays are
+        used without copying them.
+        """
+        population = cls.__new__(cls)
+        population.space = attributes['space']
+        population.deaths = attributes['deaths']
+        population.previousPopulation = attributes['previousPopulation']
+        population.contacts = contacts
+        population.states = arrays['states']
+        population.daysInfected = arrays['daysInfected']
+        population.diagnosed = arrays['diagnosed']
+        population.interactionCapacity = arrays['interactionCapacity']
+        population._counts = np.zeros(len(STATES), dtype=np.int64)
+        population._diagnosedInfected = 0
+        population._updateCounts(np.arange(len(population.states)), 1)
+        if 'infectedOrder' in arrays:
+            population._infected = np.array(arrays['infectedOrder'], dtype=np.int64)
+        else:
+            # Individuals infected for more days were infected before
+            infected = np.flatnonzero(isInfected(population.states))
+            population._infected = infected[np.argsort(-population.daysInfected[infected].astype(np.int64),
+                                                        kind='stable')]
+        population._newInfected = []
+        population.lifeTimes = arrays['lifeTimes'] if 'lifeTimes' in arrays else \
+            np.zeros(len(population.states), dtype=np.uint16)
+        population._calendar = _CalendarQueue()
+        population._unscheduled = []
+        population._scheduleLoaded(population._infected)
+        return population
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, idx):
+        return self.population[idx]
+
+    def __iter__(self):
+        return iter(self.population)
+
+    @property
+    def population(self):
+        """
+        Return a lazy sequence of individuals (see IndividualView).
+
+        Return
+        ---------
+        :return: Sequence
+            Individuals in population.
+        """
+        return _IndividualViews(self)
+
+    @property
+    def numInfected(self):
+        """
+        Return the number of infected individuals in population.
+
+        Return
+        ----------
+        :return: int
+            Number of infected individuals in population.
+        """
+        return int(self._counts[SYMPTOMATIC_LIGHT:ASYMPTOMATIC + 1].sum())
+
+    @property
+    def numImmunized(self):
+        """
+        Return the number of immunized individuals (recovered) in population
+
+        Return
+        ---------
+        :return: int
+            Number of individuals immunized (recovered).
+        """
+        return int(self._counts[IMMUNIZED])
+
+    @property
+    def infectedWithoutDiagnosis(self):
+        """
+        Return the number of infected individuals in population without diagnosis.
+
+        Return
+        ----------
+        :return: int
+            Number of individuals without diagnosed in population.
+        """
+        return self.numInfected - self._diagnosedInfected
+
+    @property
+    def totalCapacity(self):
+        """
+        Return the sum of the interaction capacities of all the individuals, computed from the
+        number of healthy and immunized individuals (which have the capacity of their state) and the
+        capacities of the infected individuals.
+
+        Return
+        ---------
+        :return: float
+            Sum of the interaction capacities.
+        """
+        return float(CAPACITIES[HEALTHY]) * int(self._counts[HEALTHY]) + \
+            float(CAPACITIES[IMMUNIZED]) * int(self._counts[IMMUNIZED]) + \
+            float(self.interactionCapacity[self.infectedIndices()].sum(dtype=np.float64))
+
+    @property
+    def detailedCases(self):
+        """
+        Return the number of individuals in each state.
+
+        Return
+        ---------
+        :return: dict
+            Dictionary with the same keys as simamics.visualization.Report.totalDetailedCases.
+        """
+        return dict(zip(STATE_KEYS, self._counts.tolist()))
+
+    def infectedIndices(self):
+        """
+        Return the indices of the infected individuals in the order in which they were infected
+        (individuals infected in the same call to setState are in the order of the call). The cost
+        is proportional to the number of infected individuals, not to the population size.
+
+        Return
+        ---------
+        :return: np.ndarray (int64)
+            Indices of the infected individuals.
+        """
+        if self._newInfected:
+            self._infected = np.concatenate([self._infected] + self._newInfected)
+            self._newInfected = []
+        # Individuals that are no longer infected (recovered) are removed lazily
+        self._infected = self._infected[isInfected(self.states[self._infected])]
+        return self._infected
+
+    def _scheduleLoaded(self, idx: np.ndarray):
+        """
+        Schedule the recovery of infected individuals added to the population with their life times
+        (individuals without life time are scheduled by the next call to scheduleRecovery).
+        """
+        idx = np.sort(idx[isInfected(self.states[idx])])
+        scheduled = self.lifeTimes[idx] > 0
+        self._pushRecoveries(idx[scheduled])
+        if not scheduled.all():
+            self._unscheduled.append(idx[~scheduled])
+
+    def _pushRecoveries(self, idx: np.ndarray):
+        """
+        Add individuals to the calendar queue: an individual recovers when the number of days with
+        infection exceeds their life time (see dueRecoveries).
+        """
+        delays = self.lifeTimes[idx].astype(np.int64) - self.daysInfected[idx].astype(np.int64)
+        self._calendar.push(idx, np.maximum(delays, 0))
+
+    def unscheduledInfected(self):
+        """
+        Return the indices (sorted) of the infected individuals whose recovery has not been
+        scheduled yet, e.g. those infected since the last call to scheduleRecovery.
+
+        Return
+        ---------
+        :return: np.ndarray (int64)
+            Indices of the individuals.
+        """
+        if not self._unscheduled:
+            return np.zeros(0, dtype=np.int64)
+        idx = np.unique(np.concatenate(self._unscheduled))
+        self._unscheduled = []
+        return idx[isInfected(self.states[idx]) & (self.lifeTimes[idx] == 0)]
+
+    def scheduleRecovery(self, idx, lifeTimes):
+        """
+        Set the number of days the infection of one or several infected individuals lasts and
+        schedule their recovery, which takes place in the call to dueRecoveries in which their days
+        with infection exceed their life time.
+
+        Parameters
+        ------------
+        :param idx: int or array-like
+            Individual indices.
+        :param lifeTimes: int or array-like
+            Number of days of each infection (at least 1).
+        """
+        idx = np.atleast_1d(np.asarray(idx, dtype=np.int64))
+        self.lifeTimes[idx] = np.maximum(lifeTimes, 1)
+        self._pushRecoveries(idx)
+
+    def dueRecoveries(self):
+        """
+        Return the indices of the infected individuals whose days with infection exceed their life
+        time and advance the calendar queue to the next day. It must be called once per day, after
+        increasing the days with infection. The cost is proportional to the number of recoveries.
+
+        Return
+        ---------
+        :return: np.ndarray (int64)
+            Indices of the individuals.
+        """
+        # An individual whose recovery has been scheduled again may appear several times
+        idx = np.unique(self._calendar.pop())
+        # Individuals that are no longer infected or whose life time has not been drawn again
+        idx = idx[isInfected(self.states[idx]) & (self.lifeTimes[idx] > 0)]
+        due = self.daysInfected[idx] > self.lifeTimes[idx]
+        if not due.all():
+            # Individuals whose days with infection have been modified
+            self._pushRecoveries(idx[~due])
+        return idx[due]
+
+    def _updateCounts(self, idx, sign):
+        """
+        Add (sign 1) or subtract (sign -1) the individuals at the given indices to the counters.
+        """
+        states = np.atleast_1d(self.states[idx])
+        self._counts += sign * np.bincount(states, minlength=len(STATES))
+        self._diagnosedInfected += sign * int(np.count_nonzero(
+            isInfected(states) & np.atleast_1d(self.diagnosed[idx])))
+
+    def setState(self, idx, code):
+        """
+        Change the state of one or several individuals. The days with infection and the interaction
+        capacity are reset to the values of the new state.
+
+        Parameters
+        ------------
+        :param idx: int or array-like
+            Individual indices.
+        :param code: int or array-like
+            New state codes.
+        """
+        idx = np.asarray(idx)
+        idx = np.flatnonzero(idx) if idx.dtype == bool else np.atleast_1d(idx).astype(np.int64, copy=False)
+        wasInfected = isInfected(self.states[idx])
+        self._updateCounts(idx, -1)
+        self.states[idx] = code
+        self.daysInfected[idx] = 0
+        self.interactionCapacity[idx] = CAPACITIES[code]
+        self._updateCounts(idx, 1)
+        infected = isInfected(self.states[idx])
+        newInfected = idx[infected & ~wasInfected]
+        if len(newInfected) > 0:
+            self._newInfected.append(newInfected)
+        # The duration of the new infected state is drawn again
+        infected = idx[infected]
+        if len(infected) > 0:
+            self.lifeTimes[infected] = 0
+            self._unscheduled.append(infected)
+
+    def setDiagnosed(self, idx, value=True):
+        """
+        Change the diagnosis of one or several individuals.
+
+        Parameters
+        ------------
+        :param idx: int or array-like
+            Individual indices.
+        :param value: <optional> bool
+            If the individuals have been diagnosed or not. Default True.
+        """
+        self._updateCounts(idx, -1)
+        self.diagnosed[idx] = value
+        self._updateCounts(idx, 1)
+
+    def remove(self, idx):
+        """
+        Function that eliminate an individual from population because they are death.
+
+        Parameter
+        ------------
+        :param idx: int
+            Death individual index in population.
+        """
+        self.removeMany([idx])
+
+    def removeMany(self, indices):
+        """
+        Function that eliminate several individuals from population because they are death. The
+        arrays are compacted only once.
+
+        Parameter
+        ------------
+        :param indices: array-like
+            Death individual indices in population.
+        """
+        if len(indices) == 0:
+            return
+        self._updateCounts(indices, -1)
+        keep = np.ones(len(self), dtype=bool)
+        keep[indices] = False
+        self._compact(keep)
+        self.deaths += len(keep) - int(np.count_nonzero(keep))
+
+    def _compact(self, keep):
+        """
+        Keep only the individuals of a mask in the arrays (and the contact structure).
+        """
+        infected = self.infectedIndices()
+        newIndex = np.cumsum(keep) - 1
+        self._infected = newIndex[infected[keep[infected]]]
+        self._calendar.compact(newIndex, keep)
+        self._unscheduled = [newIndex[idx[keep[idx]]] for idx in self._unscheduled]
+        self.states = self.states[keep]
+        self.daysInfected = self.daysInfected[keep]
+        self.diagnosed = self.diagnosed[keep]
+        self.interactionCapacity = self.interactionCapacity[keep]
+        self.lifeTimes = self.lifeTimes[keep]
+        if self.contacts is not None:
+            self.contacts.compact(keep)
+
+    def extract(self, indices):
+        """
+        Function that takes several individuals out of the population (e.g. travellers that leave
+        to another population, see append). They are not counted as deaths.
+
+        Parameter
+        ------------
+        :param indices: array-like
+            Individual indices in population.
+
+        Return
+        ---------
+        :return: dict
+            Arrays (states, daysInfected, diagnosed, interactionCapacity and lifeTimes) of the
+            individuals.
+        """
+        if self.contacts is not None:
+            raise TypeError("Individuals cannot be moved out of a population with a contact structure")
+        indices = np.asarray(indices, dtype=np.int64)
+        individuals = dict(states=self.states[indices], daysInfected=self.daysInfected[indices],
+                           diagnosed=self.diagnosed[indices], interactionCapacity=self.interactionCapacity[indices],
+                           lifeTimes=self.lifeTimes[indices])
+        if len(indices) > 0:
+            self._updateCounts(indices, -1)
+            keep = np.ones(len(self), dtype=bool)
+            keep[indices] = False
+            self._compact(keep)
+        return individuals
+
+    def append(self, individuals: dict):
+        """
+        Function that adds individuals to the end of the population (see extract).
+
+        Parameter
+        ------------
+        :param individuals: dict
+            Arrays (states, daysInfected, diagnosed and interactionCapacity) of the individuals and,
+            optionally, their life times (lifeTimes).
+        """
+        if self.contacts is not None:
+            raise TypeError("Individuals cannot be added to a population with a contact structure")
+        size = len(self)
+        self.states = np.concatenate([self.states, individuals['states']])
+        self.daysInfected = np.concatenate([self.daysInfected, individuals['daysInfected']])
+        self.diagnosed = np.concatenate([self.diagnosed, individuals['diagnosed']])
+        self.interactionCapacity = np.concatenate([self.interactionCapacity, individuals['interactionCapacity']])
+        self.lifeTimes = np.concatenate([self.lifeTimes, individuals['lifeTimes'] if 'lifeTimes' in individuals
+                                         else np.zeros(len(individuals['states']), dtype=np.uint16)])
+        self._updateCounts(np.arange(size, len(self)), 1)
+        newInfected = size + np.flatnonzero(isInfected(individuals['states']))
+        self._newInfected.append(newInfected)
+        self._scheduleLoaded(newInfected)
@@ -0,0 +1,237 @@
+"""
+*************************************************************************************************
+***********************************// POPULATION MODULE //***************************************
+*************************************************************************************************
+In this module a population described only by the number of individuals in each compartment is
+defined. Individuals are not stored, so its memory and the cost of simulating it (see
+simamics.dynamic.tauLeaping) do not depend on the population size.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from .Population import STATE_KEYS, _stateCounts
+from .ArrayPopulation import ArrayPopulation, CAPACITIES, DIAGNOSED_CAPACITY
+from ..states import *
+
+# Tags of the infected states, in the order of the first axis of CompartmentalPopulation.infected
+INFECTED_TAGS = np.arange(SYMPTOMATIC_LIGHT, ASYMPTOMATIC + 1)
+
+# Number of symptomatic states (the first rows of CompartmentalPopulation.infected)
+NUM_SYMPTOMATIC = SYMPTOMATIC_SEVERE - SYMPTOMATIC_LIGHT + 1
+
+
+class CompartmentalPopulation:
+    """
+    Class that represents a population as the number of individuals in each compartment. It has
+    the same counters as simamics.population.Population, so it can be recorded by
+    simamics.visualization.Report, but individuals cannot be accessed.
+
+    Attributes
+    ------------
+    space : int
+        Space where population lives.
+
+    deaths : int
+        Number of deaths individuals.
+
+    previousPopulation : int
+        Population size from n-1 interaction.
+
+    healthy : int
+        Number of healthy individuals.
+
+    immunized : int
+        Number of immunized individuals.
+
+    infected : np.ndarray (int64)
+        Number of infected individuals of shape (infected states, 2, days). The first axis is the
+        state (see INFECTED_TAGS), the second one if the individuals have been diagnosed and the
+        third one the number of days they have been infected.
+    """
+    def __init__(self, initialCases, populationSize, space, maxDays: int = 1):
+        """
+        A population has a series of initial cases, a size and a space where individuals live.
+
+        Parameters
+        --------------
+        :param initialCases: int
+            Number of initial cases (SymptomaticLight).
+        :param populationSize:
+            Initial population size.
+        :param space:
+            Space where the population lives.
+        :param maxDays: <optional> int
+            Initial size of the days axis of CompartmentalPopulation.infected. It grows when needed.
+            Default 1.
+        """
+        self.space = space
+        self.deaths = 0
+        self.previousPopulation = populationSize
+        self.healthy = populationSize - initialCases
+        self.immunized = 0
+        self.infected = np.zeros((len(INFECTED_TAGS), 2, max(1, maxDays)), dtype=np.int64)
+        # Initial cases are SymptomaticLight, not diagnosed and infected for 0 days
+        self.infected[0, 0, 0] = initialCases
+
+    @classmethod
+    def fromCounts(cls, cases: dict, space, populationSize: int = None):
+        """
+        Build a population with a number of individuals in each state (see
+        simamics.population.Population.fromCounts). The infected individuals are infected for 0 days
+        and not diagnosed.
+
+        Parameters
+        --------------
+        :param cases: dict
+            Number of individuals of each state (see STATE_KEYS) or, if the population size is given,
+            fraction of the population in each state. If the healthy individuals are not given they
+            are the rest of the population.
+        :param space:
+            Space where the population lives.
+        :param populationSize: <optional> int
+            Population size, required to give fractions.
+
+        Return
+        --------
+        :return: simamics.population.CompartmentalPopulation
+        """
+        counts = _stateCounts(cases, populationSize)
+        population = cls(0, int(counts.sum()), space)
+        population.healthy = int(counts[HEALTHY])
+        population.immunized = int(counts[IMMUNIZED])
+        population.infected[:, 0, 0] = counts[INFECTED_TAGS]
+        return population
+
+    @classmethod
+    def fromPopulation(cls, population):
+        """
+        Build a CompartmentalPopulation with the counts of a simamics.population.Population or
+        simamics.population.ArrayPopulation.
+
+        Parameters
+        ------------
+        :param population: simamics.population.Population or simamics.population.ArrayPopulation
+            Population.
+
+        Return
+        --------
+        :return: simamics.population.CompartmentalPopulation
+        """
+        if isinstance(population, ArrayPopulation):
+            states, diagnosed, days = population.states, population.diagnosed, population.daysInfected
+        else:
+            states = np.array([individual.state.tag for individual in population.population], dtype=np.int8)
+            diagnosed = np.array([individual.diagnosed for individual in population.population], dtype=bool)
+            days = np.array([individual.daysWithInfection for individual in population.population], dtype=np.int64)
+        infected = (states >= SYMPTOMATIC_LIGHT) & (states <= ASYMPTOMATIC)
+        compartmental = cls(0, len(states), population.space,
+                            maxDays=int(days[infected].max()) + 1 if infected.any() else 1)
+        compartmental.deaths = population.deaths
+        compartmental.previousPopulation = population.previousPopulation
+        compartmental.healthy = int(np.count_nonzero(states == HEALTHY))
+        compartmental.immunized = int(np.count_nonzero(states == IMMUNIZED))
+        np.add.at(compartmental.infected,
+                  (states[infected] - SYMPTOMATIC_LIGHT, diagnosed[infected].astype(int), days[infected]), 1)
+        return compartmental
+
+    def _toArrays(self):
+        """
+        Return the population as arrays (see simamics.dynamic.checkpoint).
+
+        Return
+        ---------
+        :return: tuple
+            Dictionary with the scalar attributes and dictionary with the infected compartments.
+        """
+        attributes = dict(space=self.space, deaths=self.deaths, previousPopulation=self.previousPopulation,
+                          healthy=self.healthy, immunized=self.immunized)
+        return attributes, dict(infected=self.infected)
+
+    @classmethod
+    def _fromArrays(cls, attributes: dict, arrays: dict):
+        """
+        Build a population from the arrays returned by CompartmentalPopulation._toArrays.
+        """
+        population = cls.__new__(cls)
+        for name, value in attributes.items():
+            setattr(population, name, value)
+        population.infected = np.array(arrays['infected'])
+        return population
+
+    def __len__(self):
+        return self.healthy + self.immunized + int(self.infected.sum())
+
+    @property
+    def numInfected(self):
+        """
+        Return the number of infected individuals in population.
+
+        Return
+        ----------
+        :return: int
+            Number of infected individuals in population.
+        """
+        return int(self.infected.sum())
+
+    @property
+    def numImmunized(self):
+        """
+        Return the number of immunized individuals (recovered) in population
+
+        Return
+        ---------
+        :return: int
+            Number of individuals immunized (recovered).
+        """
+        return self.immunized
+
+    @property
+    def infectedWithoutDiagnosis(self):
+        """
+        Return the number of infected individuals in population without diagnosis.
+
+        Return
+        ----------
+        :return: int
+            Number of individuals without diagnosed in population.
+        """
+        return int(self.infected[:, 0].sum())
+
+    @property
+    def detailedCases(self):
+        """
+        Return the number of individuals in each state.
+
+        Return
+        ---------
+        :return: dict
+            Dictionary with the same keys as simamics.visualization.Report.totalDetailedCases.
+        """
+        return dict(zip(STATE_KEYS, [self.healthy] + self.infected.sum(axis=(1, 2)).tolist() + [self.immunized]))
+
+    @property
+    def infectionPressure(self):
+        """
+        Return the sum of the interaction capacities of the infected individuals. Diagnosed
+        individuals have a capacity of DIAGNOSED_CAPACITY.
+
+        Return
+        ---------
+        :return: float
+            Sum of the interaction capacities.
+        """
+        undiagnosed, diagnosed = self.infected.sum(axis=2).T
+        return float(CAPACITIES[INFECTED_TAGS] @ undiagnosed + DIAGNOSED_CAPACITY * diagnosed.sum())
+
+    @property
+    def totalCapacity(self):
+        """
+        Return the sum of the interaction capacities of all the individuals.
+
+        Return
+        ---------
+        :return: float
+            Sum of the interaction capacities.
+        """
+        return self.infectionPressure + CAPACITIES[HEALTHY] * self.healthy + CAPACITIES[IMMUNIZED] * self.immunized
@@ -0,0 +1,204 @@
+"""
+*************************************************************************************************
+***********************************// POPULATION MODULE //***************************************
+*************************************************************************************************
+In this module a contact graph stored in compressed sparse row (CSR) format is defined. The memory
+depends on the number of contacts, not on the square of the population size, and a random
+neighbour of an individual is selected in constant time.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from .ContactStructureBase import ContactStructureBase
+from ..rng import makeRng
+
+
+class ContactGraph(ContactStructureBase):
+    """
+    Class that represents the contacts of a population as a graph in CSR format. The graph is
+    indexed by slots: the neighbours of the slot n are indices[indptr[n]:indptr[n + 1]]. Each
+    individual has a slot; when individuals are removed their slots are only marked as empty, so
+    removing individuals costs O(individuals) instead of O(contacts), and the graph is rebuilt once
+    the empty slots exceed REBUILD_FRACTION of the slots. Contacts with an empty slot do not take
+    place.
+
+    Attributes
+    ------------
+    indptr : np.ndarray (int64)
+        Position in indices of the neighbours of each slot (size number of slots + 1).
+
+    indices : np.ndarray (int32 or int64)
+        Slots of the neighbours of each slot.
+
+    slots : np.ndarray (int64)
+        Slot of each individual.
+
+    positions : np.ndarray (int64)
+        Individual in each slot, -1 if the slot is empty.
+    """
+    # Fraction of empty slots that triggers a rebuild of the graph (see compact)
+    REBUILD_FRACTION = 0.1
+
+    def __init__(self, indptr, indices):
+        """
+        Parameters
+        ------------
+        :param indptr: array-like
+            Position in indices of the neighbours of each individual.
+        :param indices: array-like
+            Neighbours of each individual.
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        numIndividuals = len(self.indptr) - 1
+        self.indices = np.asarray(indices, dtype=np.int32 if numIndividuals < 2 ** 31 else np.int64)
+        if numIndividuals < 0 or self.indptr[0] != 0 or self.indptr[-1] != len(self.indices):
+            raise TypeError("indptr must start with 0 and end with the number of neighbours")
+        self.slots = np.arange(numIndividuals)
+        self.positions = np.arange(numIndividuals)
+
+    @classmethod
+    def fromEdges(cls, numIndividuals: int, sources, targets, symmetric: bool = True):
+        """
+        Build a contact graph from a list of edges.
+
+        Parameters
+        ------------
+        :param numIndividuals: int
+            Number of individuals.
+        :param sources: array-like
+            First individual of each edge.
+        :param targets: array-like
+            Second individual of each edge.
+        :param symmetric: <optional> bool
+            Add each edge in both directions. Default True.
+
+        Return
+        --------
+        :return: simamics.population.ContactGraph
+        """
+        sources, targets = np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+        if symmetric:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(numIndividuals + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=numIndividuals), out=indptr[1:])
+        return cls(indptr, targets[order])
+
+    @classmethod
+    def random(cls, numIndividuals: int, meanDegree: float, rng=None):
+        """
+        Build a random graph (Erdős–Rényi) with a given mean number of contacts per individual.
+
+        Parameters
+        ------------
+        :param numIndividuals: int
+            Number of individuals.
+        :param meanDegree: float
+            Mean number of contacts of each individual.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator (see simamics.rng.makeRng).
+
+        Return
+        --------
+        :return: simamics.population.ContactGraph
+        """
+        rng = makeRng(rng)
+        numEdges = int(rng.poisson(numIndividuals * meanDegree / 2))
+        sources, targets = rng.integers(0, numIndividuals, (2, numEdges))
+        noLoops = sources != targets
+        return cls.fromEdges(numIndividuals, sources[noLoops], targets[noLoops])
+
+    @classmethod
+    def fromGroups(cls, groups):
+        """
+        Build a graph where every individual is connected with all the individuals of their group,
+        e.g. households.
+
+        Parameters
+        ------------
+        :param groups: array-like
+            Group of each individual.
+
+        Return
+        --------
+        :return: simamics.population.ContactGraph
+        """
+        groups = np.asarray(groups)
+        order = np.argsort(groups, kind='stable')
+        _, groupStarts, groupSizes = np.unique(groups[order], return_index=True, return_counts=True)
+        # Every pair (in both directions) of the individuals of each group: the pair number n of a
+        # group of size k joins its members n // k and n % k
+        numPairs = groupSizes ** 2
+        pairGroup = np.repeat(np.arange(len(groupSizes)), numPairs)
+        pair = np.arange(int(numPairs.sum())) - np.repeat(np.cumsum(numPairs) - numPairs, numPairs)
+        sources = order[groupStarts[pairGroup] + pair // groupSizes[pairGroup]]
+        targets = order[groupStarts[pairGroup] + pair % groupSizes[pairGroup]]
+        noLoops = sources != targets
+        return cls.fromEdges(len(groups), sources[noLoops], targets[noLoops], symmetric=False)
+
+    def _toArrays(self):
+        """
+        Return the graph as arrays (see simamics.dynamic.checkpoint).
+        """
+        return {}, dict(indptr=self.indptr, indices=self.indices, slots=self.slots, positions=self.positions)
+
+    @classmethod
+    def _fromArrays(cls, attributes: dict, arrays: dict):
+        """
+        Build a graph from the arrays returned by ContactGraph._toArrays.
+        """
+        graph = cls(arrays['indptr'], arrays['indices'])
+        graph.slots = arrays['slots']
+        graph.positions = arrays['positions']
+        return graph
+
+    def __len__(self):
+        return len(self.slots)
+
+    @property
+    def degrees(self):
+        """
+        Return the number of contacts of each individual (contacts with removed individuals
+        included until the graph is rebuilt).
+
+        Return
+        ---------
+        :return: np.ndarray (int64)
+            Number of neighbours of each individual.
+        """
+        return np.diff(self.indptr)[self.slots]
+
+    def sample(self, initiators, rng):
+        initiators = np.asarray(initiators)
+        if len(self.indices) == 0:
+            return np.full(len(initiators), -1, dtype=np.int64)
+        slots = self.slots[initiators]
+        start = self.indptr[slots]
+        degrees = self.indptr[slots + 1] - start
+        offsets = (rng.random(len(initiators)) * degrees).astype(np.int64)
+        # Individuals without contacts select any position, the result is then discarded
+        contacts = self.positions[self.indices[np.minimum(start + offsets, len(self.indices) - 1)]]
+        return np.where(degrees > 0, contacts, -1)
+
+    def compact(self, keep):
+        self.positions[self.slots[~keep]] = -1
+        self.slots = self.slots[keep]
+        self.positions[self.slots] = np.arange(len(self.slots))
+        if len(self.positions) - len(self.slots) > self.REBUILD_FRACTION * len(self.positions):
+            self._rebuild()
+
+    def _rebuild(self):
+        """
+        Remove the empty slots. Slots keep the order of the individuals, so after the rebuild the
+        slot of each individual is their index.
+        """
+        keep = self.positions >= 0
+        # Contacts between individuals in occupied slots
+        kept = keep[self.indices]
+        kept &= np.repeat(keep, np.diff(self.indptr))
+        keptBefore = np.concatenate([[0], np.cumsum(kept)])
+        self.indptr = np.concatenate([[0], keptBefore[self.indptr[1:]][keep]])
+        self.indices = self.positions[self.indices[kept]].astype(self.indices.dtype)
+        self.slots = np.arange(len(self.slots))
+        self.positions = np.arange(len(self.slots))
@@ -0,0 +1,72 @@
+"""
+*************************************************************************************************
+***********************************// POPULATION MODULE //***************************************
+*************************************************************************************************
+This module defines the interface of the contact structures of a population (see
+simamics.population.ArrayPopulation). A contact structure decides which individuals can be contacted
+by each individual, e.g. the neighbours in a contact graph or the individuals in the same area.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from abc import ABCMeta, abstractmethod
+
+
+class ContactStructureBase:
+    """
+    Abstract class that defines the interface of a contact structure. See ContactGraph and
+    SpatialGrid for detailed descriptions.
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def __len__(self):
+        """
+        Number of individuals in the structure.
+        """
+        pass
+
+    @abstractmethod
+    def sample(self, initiators, rng):
+        """
+        Function that selects a random contact for each initiator.
+
+        Parameters
+        ------------
+        :param initiators: np.ndarray
+            Indices of the individuals that initiate the contacts.
+        :param rng: numpy.random.Generator
+            Random number generator.
+
+        Return
+        --------
+        :return: np.ndarray (int64)
+            Index of the contact of each initiator, -1 if the initiator has no possible contacts.
+        """
+        pass
+
+    @abstractmethod
+    def compact(self, keep):
+        """
+        Function that removes individuals from the structure. The remaining individuals are
+        renumbered keeping their order, as in ArrayPopulation.removeMany.
+
+        Parameters
+        ------------
+        :param keep: np.ndarray (bool)
+            Mask with the individuals that remain.
+        """
+        pass
+
+    def copy(self):
+        """
+        Return an independent copy of the structure, built from the arrays saved in a checkpoint
+        (see _toArrays and _fromArrays).
+
+        Return
+        --------
+        :return: simamics.population.ContactStructureBase
+        """
+        attributes, arrays = self._toArrays()
+        return type(self)._fromArrays(attributes, {name: np.array(values) for name, values in arrays.items()})
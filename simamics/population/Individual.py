@@ -22,6 +22,21 @@ class Individual:
 
     diagnosed : bool
         If the individual has been diagnosed or not.
+
+    daysWithInfection : int
+        Number of days the individual has been in their current infected state.
+
+    lifeTime : int
+        Number of days the current infected state lasts, the individual recovers when their days with
+        infection exceed it (None until it is drawn from the virus, see simamics.pathogen.Virus).
+
+    interactionCapacity : float
+        Interaction capacity of the individual. It is the capacity of their state, reduced when the
+        individual is diagnosed, and it is restored when the state changes.
+
+    population : simamics.population.Population
+        Population the individual belongs to (None if it does not belong to any population). The
+        population is notified of every change of state or diagnosis.
     """
     def __init__(self, initialState):
         """
@@ -33,7 +48,11 @@ class Individual:
             Individual initial state.
         """
         self._state = initialState
-        self.diagnosed = False
+        self._diagnosed = False
+        self.daysWithInfection = 0
+        self.lifeTime = None
+        self.interactionCapacity = initialState.interactionCapacity
+        self.population = None
 
     def __repr__(self):
         return "< Individual, State: %s >" % self.state
@@ -55,8 +74,31 @@ class Individual:
         :param newState: simamics.states.State
             New individual state.
         """
+        if self.population is not None:
+            self.population._updateCounts(self, -1)
         self._state = newState
+        self.daysWithInfection = 0
+        self.lifeTime = None
+        self.interactionCapacity = newState.interactionCapacity
+        if self.population is not None:
+            self.population._updateCounts(self, 1)
 
+    @property
+    def diagnosed(self):
+        return self._diagnosed
 
+    @diagnosed.setter
+    def diagnosed(self, value):
+        """
+        Change individual diagnosis. Setter method.
 
-
+        Parameter
+        -----------
+        :param value: bool
+            If the individual has been diagnosed or not.
+        """
+        if self.population is not None:
+            self.population._updateCounts(self, -1)
+        self._diagnosed = value
+        if self.population is not None:
+            self.population._updateCounts(self, 1)
@@ -8,10 +8,49 @@ may have a disease state and be or not diagnosed.
 Author: Fernando García Gutiérrez
 Email: fernando.garciagu@upm.es
 """
-import random
-from copy import deepcopy
+import numpy as np
 from . import Individual
 from ..states import *
+from ..rng import makeRng
+
+# Key in Population.detailedCases of the state with each tag
+STATE_KEYS = ('healthy', 'infLight', 'infMild', 'infSevere', 'asymptomatic', 'immunized')
+
+
+def _stateCounts(cases: dict, populationSize: int = None):
+    """
+    Function that returns the number of individuals with each state tag from a dictionary with the
+    number of individuals of each state (see STATE_KEYS) or, if the population size is given, with
+    the fraction of the population in each state. The healthy individuals are the rest of the
+    population if they are not given. Fractions are rounded so that the counts add up to the
+    population size (largest remainder).
+
+    Return
+    ---------
+    :return: np.ndarray (int64)
+        Number of individuals with each tag.
+    """
+    for key in cases:
+        if key not in STATE_KEYS:
+            raise TypeError("Unknown state %s, available states: %s" % (key, ', '.join(STATE_KEYS)))
+    values = np.array([cases.get(key, 0) for key in STATE_KEYS], dtype=np.float64)
+    if (values < 0).any():
+        raise TypeError("The number of individuals of each state cannot be negative")
+    if populationSize is None:
+        if 'healthy' not in cases:
+            raise TypeError("The number of healthy individuals must be given if the population size is not given")
+        if (values != np.round(values)).any():
+            raise TypeError("The number of individuals of each state must be an integer")
+        return values.astype(np.int64)
+    if 'healthy' not in cases:
+        values[HEALTHY] = max(1 - values.sum(), 0)
+    if abs(values.sum() - 1) > 1e-9:
+        raise TypeError("The fractions of the states must sum 1, instead they sum %.4f" % values.sum())
+    expected = values * populationSize
+    counts = np.floor(expected).astype(np.int64)
+    remainders = np.argsort(counts - expected, kind='stable')[:populationSize - counts.sum()]
+    counts[remainders] += 1
+    return counts
 
 
 class Population:
@@ -31,8 +70,12 @@ class Population:
 
     population: list
         List of individuals.
+
+    The population keeps the number of individuals in each state and the number of diagnosed
+    infected individuals up to date: every individual notifies their population when their state or
+    diagnosis changes (see simamics.population.Individual).
     """
-    def __init__(self, initialCases, populationSize, space):
+    def __init__(self, initialCases, populationSize, space, rng=None):
         """
         A population has a series of initial cases, a size and a space where individuals live.
 
@@ -44,18 +87,107 @@ class Population:
             Initial population size.
         :param space:
             Space where the population lives.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator used to place the initial cases (see simamics.rng.makeRng).
         """
         self.space = space
         self.deaths = 0
         self.previousPopulation = populationSize
         # Initialize a fully healthy population
         healthy = Healthy()
-        self.population = [Individual(deepcopy(healthy)) for n in range(populationSize)]
+        self.population = [Individual(healthy) for n in range(populationSize)]
+        # Number of individuals per state tag and number of diagnosed infected individuals
+        self._counts = [0] * len(STATES)
+        self._counts[HEALTHY] = populationSize
+        self._diagnosedInfected = 0
+        for individual in self.population:
+            individual.population = self
         # Introduce initial cases (only SymptomaticLight)
         for n in range(initialCases):
             infected = SymptomaticLight()
             self.population[n].state = infected
-        random.shuffle(self.population)
+        makeRng(rng).shuffle(self.population)
+
+    @classmethod
+    def fromCounts(cls, cases: dict, space, populationSize: int = None, rng=None):
+        """
+        Build a population with a number of individuals in each state at random positions. The
+        individuals are infected for 0 days and not diagnosed.
+
+        Parameters
+        --------------
+        :param cases: dict
+            Number of individuals of each state (see STATE_KEYS) or, if the population size is given,
+            fraction of the population in each state. If the healthy individuals are not given they
+            are the rest of the population.
+        :param space:
+            Space where the population lives.
+        :param populationSize: <optional> int
+            Population size, required to give fractions.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator used to place the individuals (see simamics.rng.makeRng).
+
+        Return
+        --------
+        :return: simamics.population.Population
+
+        Examples
+        ---------
+        Population.fromCounts({'healthy': 9990, 'infLight': 10}, 1000)
+        Population.fromCounts({'infLight': 0.001, 'immunized': 0.2}, 1000, populationSize=10000)
+        """
+        tags = np.repeat(np.arange(len(STATES), dtype=np.int8), _stateCounts(cases, populationSize))
+        makeRng(rng).shuffle(tags)
+        arrays = dict(states=tags, diagnosed=np.zeros(len(tags), dtype=bool),
+                      daysInfected=np.zeros(len(tags), dtype=np.int64),
+                      interactionCapacity=np.array([state.interactionCapacity for state in STATES])[tags])
+        return cls._fromArrays(dict(space=space, deaths=0, previousPopulation=len(tags)), arrays)
+
+    def _toArrays(self):
+        """
+        Return the population as arrays (see simamics.dynamic.checkpoint).
+
+        Return
+        ---------
+        :return: tuple
+            Dictionary with the scalar attributes and dictionary with an array per attribute of the
+            individuals.
+        """
+        individuals = self.population
+        arrays = dict(
+            states=np.array([individual.state.tag for individual in individuals], dtype=np.int8),
+            diagnosed=np.array([individual.diagnosed for individual in individuals], dtype=bool),
+            daysInfected=np.array([individual.daysWithInfection for individual in individuals], dtype=np.int64),
+            interactionCapacity=np.array([individual.interactionCapacity for individual in individuals],
+                                         dtype=np.float64),
+            lifeTimes=np.array([individual.lifeTime or 0 for individual in individuals], dtype=np.uint16))
+        return dict(space=self.space, deaths=self.deaths, previousPopulation=self.previousPopulation), arrays
+
+    @classmethod
+    def _fromArrays(cls, attributes: dict, arrays: dict):
+        """
+        Build a population from the arrays returned by Population._toArrays.
+        """
+        population = cls.__new__(cls)
+        population.space = attributes['space']
+        population.deaths = attributes['deaths']
+        population.previousPopulation = attributes['previousPopulation']
+        population._counts = [0] * len(STATES)
+        population._diagnosedInfected = 0
+        population.population = []
+        lifeTimes = arrays['lifeTimes'].tolist() if 'lifeTimes' in arrays else [0] * len(arrays['states'])
+        for tag, diagnosed, days, capacity, lifeTime in zip(arrays['states'].tolist(), arrays['diagnosed'].tolist(),
+                                                            arrays['daysInfected'].tolist(),
+                                                            arrays['interactionCapacity'].tolist(), lifeTimes):
+            individual = Individual(STATES[tag])
+            individual._diagnosed = diagnosed
+            individual.daysWithInfection = days
+            individual.lifeTime = lifeTime or None
+            individual.interactionCapacity = capacity
+            individual.population = population
+            population._updateCounts(individual, 1)
+            population.population.append(individual)
+        return population
 
     @property
     def numInfected(self):
@@ -67,12 +199,8 @@ class Population:
         :return: int
             Number of infected individuals in population.
         """
-        numInfected = 0
-        for individual in self.population:
-            if individual.state == Infected():
-                numInfected += 1
-
-        return numInfected
+        # Infected states have consecutive tags
+        return sum(self._counts[SYMPTOMATIC_LIGHT:ASYMPTOMATIC + 1])
 
     @property
     def numImmunized(self):
@@ -84,12 +212,7 @@ class Population:
         :return: int
             Number of individuals immunized (recovered).
         """
-        numImmunized = 0
-        for individual in self.population:
-            if isinstance(individual.state, Immunized):
-                numImmunized += 1
-
-        return numImmunized
+        return self._counts[IMMUNIZED]
 
     @property
     def infectedWithoutDiagnosis(self):
@@ -101,12 +224,29 @@ class Population:
         :return: int
             Number of individuals without diagnosed in population.
         """
-        numInfectedWithoutDiagnosis = 0
-        for individual in self.population:
-            if individual.state == Infected() and not individual.diagnosed:
-                numInfectedWithoutDiagnosis += 1
+        return self.numInfected - self._diagnosedInfected
+
+    @property
+    def detailedCases(self):
+        """
+        Return the number of individuals in each state.
 
-        return numInfectedWithoutDiagnosis
+        Return
+        ---------
+        :return: dict
+            Dictionary with the same keys as simamics.visualization.Report.totalDetailedCases.
+        """
+        return dict(zip(STATE_KEYS, self._counts))
+
+    def _updateCounts(self, individual: Individual, sign: int):
+        """
+        Add (sign 1) or subtract (sign -1) an individual to the counters. It is called by the
+        individual before and after changing their state or diagnosis.
+        """
+        state = individual.state
+        self._counts[state.tag] += sign
+        if individual.diagnosed and state.infected:
+            self._diagnosedInfected += sign
 
     def remove(self, idx):
         """
@@ -117,6 +257,25 @@ class Population:
         :param idx: int
             Death individual index in population.
         """
-        self.population.pop(idx)
-        self.deaths += 1
+        self.removeMany([idx])
+
+    def removeMany(self, indices):
+        """
+        Function that eliminate several individuals from population because they are death. The
+        list of individuals is compacted only once, so the cost does not depend on the number of deaths.
+
+        Parameter
+        ------------
+        :param indices: list
+            Death individual indices in population.
+        """
+        if len(indices) == 0:
+            return
+        deathIndividuals = set(indices)
+        for idx in deathIndividuals:
+            individual = self.population[idx]
+            self._updateCounts(individual, -1)
+            individual.population = None
+        self.population = [individual for n, individual in enumerate(self.population) if n not in deathIndividuals]
+        self.deaths += len(deathIndividuals)
 
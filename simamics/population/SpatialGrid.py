@@ -0,0 +1,144 @@
+"""
+*************************************************************************************************
+***********************************// POPULATION MODULE //***************************************
+*************************************************************************************************
+In this module a spatial contact structure is defined. Individuals are placed in a square area
+divided in cells (e.g. districts) and the individuals of each cell are indexed, so a random
+individual of the same cell is selected in constant time.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from .ContactStructureBase import ContactStructureBase
+from ..rng import makeRng
+
+
+class SpatialGrid(ContactStructureBase):
+    """
+    Class that represents the location of the individuals in a grid of cells. Each contact is made
+    with an individual of the same cell with probability locality and with a random individual of
+    the population otherwise.
+
+    Attributes
+    ------------
+    cells : np.ndarray (int64)
+        Cell of each individual.
+
+    members : np.ndarray (int64)
+        Individuals sorted by cell: the individuals of the cell c are members[cellStart[c]:cellStart[c + 1]].
+
+    cellStart : np.ndarray (int64)
+        Position in members of the individuals of each cell (size number of cells + 1).
+
+    locality : float
+        Probability that a contact is made within the cell.
+    """
+    def __init__(self, cells, numCells: int = None, locality: float = 1.0):
+        """
+        Parameters
+        ------------
+        :param cells: array-like
+            Cell of each individual.
+        :param numCells: <optional> int
+            Number of cells. By default the highest cell + 1.
+        :param locality: <optional> float
+            Probability that a contact is made within the cell. Default 1.
+        """
+        if not 0 <= locality <= 1:
+            raise TypeError("locality must be between 0 and 1")
+        self.cells = np.asarray(cells, dtype=np.int64)
+        self.locality = locality
+        numCells = numCells if numCells is not None else (int(self.cells.max()) + 1 if len(self.cells) else 0)
+        self.members = np.argsort(self.cells, kind='stable')
+        self.cellStart = np.zeros(numCells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.cells, minlength=numCells), out=self.cellStart[1:])
+
+    @classmethod
+    def fromPositions(cls, positions, side: float, cellSize: float, locality: float = 1.0):
+        """
+        Build a grid from the position of each individual in a square area.
+
+        Parameters
+        ------------
+        :param positions: array-like
+            Position (x, y) of each individual, of shape (individuals, 2), between 0 and side.
+        :param side: float
+            Side of the area.
+        :param cellSize: float
+            Side of each cell.
+        :param locality: <optional> float
+            Probability that a contact is made within the cell. Default 1.
+
+        Return
+        --------
+        :return: simamics.population.SpatialGrid
+        """
+        cellsPerSide = int(np.ceil(side / cellSize))
+        coordinates = np.clip((np.asarray(positions) // cellSize).astype(np.int64), 0, cellsPerSide - 1)
+        return cls(coordinates[:, 0] * cellsPerSide + coordinates[:, 1], cellsPerSide ** 2, locality)
+
+    @classmethod
+    def random(cls, numIndividuals: int, side: float, cellSize: float, locality: float = 1.0, rng=None):
+        """
+        Build a grid placing the individuals uniformly at random.
+
+        Parameters
+        ------------
+        :param numIndividuals: int
+            Number of individuals.
+        :param side: float
+            Side of the area.
+        :param cellSize: float
+            Side of each cell.
+        :param locality: <optional> float
+            Probability that a contact is made within the cell. Default 1.
+        :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+            Seed or random number generator (see simamics.rng.makeRng).
+
+        Return
+        --------
+        :return: simamics.population.SpatialGrid
+        """
+        positions = makeRng(rng).random((numIndividuals, 2)) * side
+        return cls.fromPositions(positions, side, cellSize, locality)
+
+    def _toArrays(self):
+        """
+        Return the grid as arrays (see simamics.dynamic.checkpoint).
+        """
+        return dict(locality=self.locality), dict(cells=self.cells, members=self.members, cellStart=self.cellStart)
+
+    @classmethod
+    def _fromArrays(cls, attributes: dict, arrays: dict):
+        """
+        Build a grid from the arrays returned by SpatialGrid._toArrays.
+        """
+        grid = cls.__new__(cls)
+        grid.locality = attributes['locality']
+        grid.cells = arrays['cells']
+        grid.members = arrays['members']
+        grid.cellStart = arrays['cellStart']
+        return grid
+
+    def __len__(self):
+        return len(self.cells)
+
+    def sample(self, initiators, rng):
+        initiators = np.asarray(initiators)
+        cells = self.cells[initiators]
+        start = self.cellStart[cells]
+        cellSizes = self.cellStart[cells + 1] - start
+        contacts = self.members[start + (rng.random(len(initiators)) * cellSizes).astype(np.int64)]
+        # Contacts outside the cell
+        outside = rng.random(len(initiators)) >= self.locality
+        contacts[outside] = rng.integers(0, len(self), int(np.count_nonzero(outside)))
+        return contacts
+
+    def compact(self, keep):
+        newIndex = np.cumsum(keep) - 1
+        self.cells = self.cells[keep]
+        # The members of each cell are still sorted after removing individuals
+        self.members = newIndex[self.members[keep[self.members]]]
+        self.cellStart = np.zeros_like(self.cellStart)
+        np.cumsum(np.bincount(self.cells, minlength=len(self.cellStart) - 1), out=self.cellStart[1:])
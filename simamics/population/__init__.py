@@ -1,4 +1,10 @@
 from simamics.population.Individual import Individual
 from simamics.population.Population import Population
+from simamics.population.ArrayPopulation import ArrayPopulation
+from simamics.population.CompartmentalPopulation import CompartmentalPopulation
+from simamics.population.ContactStructureBase import ContactStructureBase
+from simamics.population.ContactGraph import ContactGraph
+from simamics.population.SpatialGrid import SpatialGrid
 
-__all__ = ['Individual', 'Population']
+__all__ = ['Individual', 'Population', 'ArrayPopulation', 'CompartmentalPopulation', 'ContactStructureBase',
+           'ContactGraph', 'SpatialGrid']
@@ -0,0 +1,104 @@
+"""
+*************************************************************************************************
+***************************************// RNG MODULE //******************************************
+*************************************************************************************************
+This module provides the random number generators used by the simulation. Every function or class
+that draws random numbers receives an rng argument, which accepts anything that can be passed to
+numpy.random.default_rng (an integer seed, a numpy.random.SeedSequence or a numpy.random.Generator).
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import random
+import numpy as np
+
+
+def makeRng(rng=None):
+    """
+    Return a numpy.random.Generator. If no rng is provided the generator is seeded from the random
+    module, so random.seed() keeps making the simulations reproducible.
+
+    Parameters
+    ------------
+    :param rng: <optional> int, numpy.random.SeedSequence or numpy.random.Generator
+        Seed or generator. If it is a generator it is returned unchanged.
+
+    Return
+    ---------
+    :return: numpy.random.Generator
+        Random number generator.
+    """
+    if rng is None:
+        return np.random.default_rng(random.getrandbits(128))
+    return np.random.default_rng(rng)
+
+
+def spawn(rng, n: int):
+    """
+    Return independent child generators (see numpy.random.SeedSequence.spawn). They can be used in
+    parallel without overlapping the streams of each other or of the parent.
+
+    Parameters
+    ------------
+    :param rng: int, numpy.random.SeedSequence or numpy.random.Generator
+        Seed or parent generator.
+    :param n: int
+        Number of generators.
+
+    Return
+    ---------
+    :return: list
+        Child generators.
+    """
+    return makeRng(rng).spawn(n)
+
+
+def getState(rng):
+    """
+    Return the state of a generator as a dictionary that can be saved as JSON (see fromState).
+
+    Parameters
+    ------------
+    :param rng: numpy.random.Generator
+        Generator.
+
+    Return
+    ---------
+    :return: dict
+        State of the bit generator of the generator.
+    """
+    def toJson(value):
+        if isinstance(value, dict):
+            return {key: toJson(item) for key, item in value.items()}
+        if isinstance(value, np.ndarray):
+            return dict(array=value.tolist(), dtype=str(value.dtype))
+        return value
+
+    return toJson(rng.bit_generator.state)
+
+
+def fromState(state: dict):
+    """
+    Return a generator with the given state (see getState). The new generator produces the same
+    numbers as the generator the state was taken from.
+
+    Parameters
+    ------------
+    :param state: dict
+        State of a bit generator.
+
+    Return
+    ---------
+    :return: numpy.random.Generator
+        Random number generator.
+    """
+    def fromJson(value):
+        if isinstance(value, dict):
+            if set(value) == {'array', 'dtype'}:
+                return np.array(value['array'], dtype=value['dtype'])
+            return {key: fromJson(item) for key, item in value.items()}
+        return value
+
+    bitGenerator = getattr(np.random, state['bit_generator'])()
+    bitGenerator.state = fromJson(state)
+    return np.random.Generator(bitGenerator)
@@ -1,4 +1,5 @@
 from simamics.states.states import *
 
 __all__ = ['State', 'Healthy', 'Infected', 'Immunized', 'Asymptomatic',
-           'SymptomaticLight', 'SymptomaticMild', 'SymptomaticSevere']
+           'SymptomaticLight', 'SymptomaticMild', 'SymptomaticSevere', 'STATES',
+           'HEALTHY', 'SYMPTOMATIC_LIGHT', 'SYMPTOMATIC_MILD', 'SYMPTOMATIC_SEVERE', 'ASYMPTOMATIC', 'IMMUNIZED']
@@ -7,28 +7,83 @@ In this module the possible states of the population are defined. An individual
 healthy or ill. An healthy individual can be immune or not. Infected patients can have different
 stages of disease.
 
+States do not store any information about the individual (e.g. days with infection), so each state
+is a single immutable instance shared by all the individuals (calling Healthy() always returns the
+same object). Each concrete state has an integer tag that allows to compare states and to store them
+in arrays (see simamics.population.ArrayPopulation).
+
 Author: Fernando García Gutiérrez
 Email: fernando.garciagu@upm.es
 """
 from abc import ABCMeta
 
+# Integer tag of each concrete state
+HEALTHY, SYMPTOMATIC_LIGHT, SYMPTOMATIC_MILD, SYMPTOMATIC_SEVERE, ASYMPTOMATIC, IMMUNIZED = range(6)
+
 
 class State:
     """
     Class that defines conceptually what a state is.
+
+    Attributes
+    ------------
+    tag : int
+        Integer tag of the state (None for groups of states such as Infected).
+
+    infected : bool
+        If the state corresponds to an infected individual.
+
+    symptomatic : bool
+        If the state corresponds to an infected individual with symptoms.
+
+    interactionCapacity : float
+        Interaction capacity of the individuals in this state.
     """
     __metaclass__ = ABCMeta
+    tag = None
+    infected = False
+    symptomatic = False
+    interactionCapacity = None
+
+    def __new__(cls):
+        # Each state class has a single instance
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+    def __setattr__(self, name, value):
+        raise AttributeError("States are shared by all the individuals and cannot be modified")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+    def __eq__(self, other):
+        if not isinstance(other, State):
+            return False
+        if self.tag is None or other.tag is None:
+            # Infected() is equal to any infected state
+            return self.infected and other.infected
+        return self.tag == other.tag
+
+    def __hash__(self):
+        return hash(self.tag)
 
 
 class Healthy(State):
     """
-    A healthy individual is who is not infected.
+    A healthy individual is who is not infected. The interaction capacity of a healthy individual
+    is 100%.
     """
-    def __init__(self):
-        """
-        The interaction capacity of a healthy individual is 100%.
-        """
-        self.interactionCapacity = 1
+    tag = HEALTHY
+    interactionCapacity = 1
 
     def __repr__(self):
         return "Healthy"
@@ -36,21 +91,15 @@ class Healthy(State):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return False
-        return True
-
 
 class Infected(State):
     """
-    An infected individual is who has been affected by the pathogen.
+    An infected individual is who has been affected by the pathogen. The infected individuals count
+    the days they remain infected before being immunized (see simamics.population.Individual).
+
+    Infected() represents the group of all the infected states, it is equal to any of them.
     """
-    def __init__(self):
-        """
-        The infected individuals count the days they remain infected before being immunized
-        """
-        self.daysWithInfection = 0
+    infected = True
 
     def __repr__(self):
         return "Infected"
@@ -58,23 +107,15 @@ class Infected(State):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return False
-        return True
-
 
 class Asymptomatic(Infected):
     """
-    Infected individual without symptoms.
+    Infected individual without symptoms. The interaction capacity of asymptomatic individuals is the
+    same as healthy individuals. Also they count the days before being immunized. Until then, they can
+    transmit the pathogen.
     """
-    def __init__(self):
-        """
-        The interaction capacity of asymptomatic individuals is the same as healthy individuals.
-        Also they count the days before being immunized. Until then, they can transmit the pathogen.
-        """
-        super().__init__()
-        self.interactionCapacity = 1
+    tag = ASYMPTOMATIC
+    interactionCapacity = 1
 
     def __repr__(self):
         return "Asymptomatic"
@@ -82,23 +123,15 @@ class Asymptomatic(Infected):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return super().__eq__(other)
-        return True
-
 
 class SymptomaticLight(Infected):
     """
-    Infected individual with light symptoms.
+    Infected individual with light symptoms. The interaction capacity with other individuals is less
+    than healthy or asymptomatic people.
     """
-    def __init__(self):
-        """
-        The interaction capacity with other individuals is less than healthy or asymptomatic
-        people.
-        """
-        super().__init__()
-        self.interactionCapacity = 0.7
+    tag = SYMPTOMATIC_LIGHT
+    symptomatic = True
+    interactionCapacity = 0.7
 
     def __repr__(self):
         return "Symptomatic Light"
@@ -106,22 +139,14 @@ class SymptomaticLight(Infected):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return super().__eq__(other)
-        return True
-
 
 class SymptomaticMild(Infected):
     """
-    Infected individual with mild symptoms.
+    Infected individual with mild symptoms. The interaction capacity is low.
     """
-    def __init__(self):
-        """
-        The interaction capacity is low.
-        """
-        super().__init__()
-        self.interactionCapacity = 0.3
+    tag = SYMPTOMATIC_MILD
+    symptomatic = True
+    interactionCapacity = 0.3
 
     def __repr__(self):
         return "Symptomatic Mild"
@@ -129,22 +154,14 @@ class SymptomaticMild(Infected):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return super().__eq__(other)
-        return True
-
 
 class SymptomaticSevere(Infected):
     """
-    Infected individual with severe symptoms.
+    Infected individual with severe symptoms. The interaction capacity of this individuals is very low.
     """
-    def __init__(self):
-        """
-        The interaction capacity of this individuals is very low.
-        """
-        super().__init__()
-        self.interactionCapacity = 0.1
+    tag = SYMPTOMATIC_SEVERE
+    symptomatic = True
+    interactionCapacity = 0.1
 
     def __repr__(self):
         return "Symptomatic Severe"
@@ -152,21 +169,14 @@ class SymptomaticSevere(Infected):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return super().__eq__(other)
-        return True
-
 
 class Immunized(State):
     """
-    Individual that has passed the infection and cannot be infected again.
+    Individual that has passed the infection and cannot be infected again. Their interaction capacity
+    is the same as healthy individuals.
     """
-    def __init__(self):
-        """
-        Their interaction capacity is the same as healthy individuals.
-        """
-        self.interactionCapacity = 1
+    tag = IMMUNIZED
+    interactionCapacity = 1
 
     def __repr__(self):
         return "Immunized"
@@ -174,7 +184,6 @@ class Immunized(State):
     def __str__(self):
         return self.__repr__()
 
-    def __eq__(self, other):
-        if not isinstance(other, __class__):
-            return False
-        return True
+
+# Concrete state associated with each tag
+STATES = (Healthy(), SymptomaticLight(), SymptomaticMild(), SymptomaticSevere(), Asymptomatic(), Immunized())
@@ -0,0 +1,136 @@
+"""
+*************************************************************************************************
+**********************************// VISUALIZATION MODULE //*************************************
+*************************************************************************************************
+This module provides basic tools to summarize and visualize the result of several replicates of the
+same simulation.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import numpy as np
+from .Report import Report
+
+
+class EnsembleReport:
+    """
+    Class that aggregates the reports of several replicates of a simulation.
+
+    Attributes
+    ------------
+    reports : list
+        Report of each replicate (see simamics.visualization.Report).
+
+    timeUnits : np.ndarray
+        Number of interactions in days.
+
+    series : dict
+        Dictionary with the statistics of every replicate as arrays of shape (replicates, days). The
+        keys are the statistics of Report.COLUMNS (except timeUnits).
+
+    Methods
+    --------
+    mean(statistic): Mean of a statistic per day.
+
+    quantile(statistic, q): Quantiles of a statistic per day.
+
+    summary(quantiles): Mean and quantiles of every statistic per day.
+
+    plotStatistics(): Plot the mean and quantiles of the main statistics.
+    """
+    STATISTICS = ('totalCases', 'recovered', 'diagnosed', 'deaths')
+
+    def __init__(self, reports: list):
+        """
+        Parameters
+        ------------
+        :param reports: list
+            Reports of the replicates. All of them must have the same number of days.
+        """
+        if len(reports) == 0 or not all(isinstance(report, Report) for report in reports):
+            raise TypeError("You must provide at least one simamics.visualization.Report")
+        if len(set(len(report) for report in reports)) != 1:
+            raise TypeError("All reports must have the same number of days")
+        self.reports = reports
+        self.timeUnits = reports[0].timeUnits.copy()
+        self.series = {
+            statistic: np.array([report.columns[statistic] for report in reports])
+            for statistic in Report.COLUMNS if statistic != 'timeUnits'
+        }
+
+    def __len__(self):
+        return len(self.reports)
+
+    def mean(self, statistic: str):
+        """
+        Mean of a statistic across replicates.
+
+        Parameters
+        ------------
+        :param statistic: str
+            Statistic name (see EnsembleReport.series).
+
+        Return
+        --------
+        :return: np.ndarray
+            Mean per day.
+        """
+        return self.series[statistic].mean(axis=0)
+
+    def quantile(self, statistic: str, q):
+        """
+        Quantiles of a statistic across replicates.
+
+        Parameters
+        ------------
+        :param statistic: str
+            Statistic name (see EnsembleReport.series).
+        :param q: float or list
+            Quantile or quantiles to compute (between 0 and 1).
+
+        Return
+        --------
+        :return: np.ndarray
+            Quantiles per day, of shape (days, ) or (len(q), days).
+        """
+        return np.quantile(self.series[statistic], q, axis=0)
+
+    def summary(self, quantiles=(0.05, 0.5, 0.95)):
+        """
+        Mean and quantiles of every statistic per day.
+
+        Parameters
+        ------------
+        :param quantiles: <optional> tuple
+            Quantiles to compute. Default (0.05, 0.5, 0.95).
+
+        Return
+        --------
+        :return: dict
+            Dictionary with an entry per statistic with the keys 'mean' and each quantile.
+        """
+        summary = {}
+        for statistic in self.series:
+            summary[statistic] = {'mean': self.mean(statistic)}
+            for q, values in zip(quantiles, self.quantile(statistic, quantiles)):
+                summary[statistic][q] = values
+        return summary
+
+    def plotStatistics(self, title="Pathogen infection", quantiles=(0.05, 0.95)):
+        """
+        Plot the mean evolution of the simulation with a band between two quantiles.
+        """
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(12, 10))
+        for statistic, color, label in zip(self.STATISTICS, ['red', 'green', 'yellow', 'blue'],
+                                           ['Real infections', 'Recovered', 'Diagnosed', 'Deaths']):
+            lower, upper = self.quantile(statistic, quantiles)
+            ax.plot(self.timeUnits, self.mean(statistic), color=color, marker='.', markersize=3, label=label)
+            ax.fill_between(self.timeUnits, lower, upper, alpha=0.2, color=color)
+        ax.set_xlabel('Days')
+        ax.set_ylabel('Total cases')
+        ax.legend()
+        plt.gca().spines['top'].set_visible(False)
+        plt.gca().spines['right'].set_visible(False)
+        plt.title(title, fontsize='x-large')
+        plt.show()
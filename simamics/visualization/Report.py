@@ -7,34 +7,43 @@ This module provides basic tools to visualize the simulation result.
 Author: Fernando García Gutiérrez
 Email: fernando.garciagu@upm.es
 """
+import numpy as np
 from ..population import Population
-from ..states import *
+from ..population.Population import STATE_KEYS
 
 
 class Report:
     """
-    Class that records the parameters of evolution.
+    Class that records the parameters of evolution. The statistics are stored in NumPy arrays that
+    grow geometrically as days are recorded.
 
     Attributes
     ------------
-    timeUnits : list
+    timeUnits : np.ndarray
         Number of interactions in days.
 
-    totalCases :  list
+    totalCases :  np.ndarray
         Number of infected individuals in population.
 
-    recovered : list
+    recovered : np.ndarray
         Number of recovered individuals in population (accumulative).
 
     totalDetailedCases : list
         Dictionary with detailed information on the evolution of the simulation.
 
-    diagnosed : list
+    diagnosed : np.ndarray
         Number of diagnosed individuals in population.
 
-    deaths : list
+    deaths : np.ndarray
         Number of death individuals in population per iteration.
 
+    columns : dict
+        All the statistics (see Report.COLUMNS) as arrays.
+
+    profile : simamics.dynamic.ObserverBase
+        Observer of the simulation (e.g. simamics.dynamic.Profiler), None if the simulation was not
+        observed.
+
     Methods
     --------
     plotStatistics(): Plot all statistics.
@@ -45,15 +54,107 @@ class Report:
 
     plotDiagnosedStatus(): Plot the number of diagnosed/Undiagnosed individuals
         per population (accumulated).
+
+    row(day): Return the statistics of a day.
+
+    toDataFrame(): Return the statistics as a pandas.DataFrame.
+
+    toNpz(path): Save the statistics in a NumPy .npz file.
+
+    toParquet(path): Save the statistics in a Parquet file.
     """
+    # Recorded statistics, the last ones are the keys of totalDetailedCases
+    COLUMNS = ('timeUnits', 'totalCases', 'recovered', 'diagnosed', 'deaths') + STATE_KEYS
+
+    # Number of days the arrays can store when the report is created
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, writer=None):
+        """
+        Parameters
+        ------------
+        :param writer: <optional> simamics.visualization.ReportWriter
+            Writer where each day is written as soon as it is completed.
+        """
+        self._columns = {name: np.zeros(self.INITIAL_CAPACITY, dtype=np.int64) for name in self.COLUMNS}
+        self._days = 0
+        self._deathDays = 0
+        self.writer = writer
+        self.profile = None
+
+    @classmethod
+    def fromColumns(cls, columns: dict, writer=None):
+        """
+        Build a report from its statistics (see Report.columns), e.g. to continue a simulation.
+
+        Parameters
+        ------------
+        :param columns: dict
+            Array with the value of each statistic (see Report.COLUMNS) per day.
+        :param writer: <optional> simamics.visualization.ReportWriter
+            Writer where the following days are written.
 
-    def __init__(self):
-        self.timeUnits = []
-        self.totalCases = []
-        self.recovered = []
-        self.totalDetailedCases = []
-        self.diagnosed = []
-        self.deaths = []
+        Return
+        ---------
+        :return: simamics.visualization.Report
+        """
+        report = cls(writer=writer)
+        days = len(columns['timeUnits'])
+        while len(report._columns['timeUnits']) < days:
+            report._grow()
+        for name in cls.COLUMNS:
+            report._columns[name][:len(columns[name])] = columns[name]
+        report._days = days
+        report._deathDays = len(columns['deaths'])
+        return report
+
+    def __len__(self):
+        return self._days
+
+    def __getstate__(self):
+        # Only the recorded days are pickled
+        state = dict(self.__dict__)
+        state['_columns'] = {name: values[:self._days].copy() for name, values in self._columns.items()}
+        state['writer'] = None
+        return state
+
+    @property
+    def columns(self):
+        """
+        Return all the statistics.
+
+        Return
+        ---------
+        :return: dict
+            Array with the value of each statistic (see Report.COLUMNS) per day.
+        """
+        return {name: values[:self._days] for name, values in self._columns.items()}
+
+    @property
+    def timeUnits(self):
+        return self._columns['timeUnits'][:self._days]
+
+    @property
+    def totalCases(self):
+        return self._columns['totalCases'][:self._days]
+
+    @property
+    def recovered(self):
+        return self._columns['recovered'][:self._days]
+
+    @property
+    def diagnosed(self):
+        return self._columns['diagnosed'][:self._days]
+
+    @property
+    def deaths(self):
+        return self._columns['deaths'][:self._deathDays]
+
+    @property
+    def totalDetailedCases(self):
+        return [
+            {key: int(self._columns[key][day]) for key in STATE_KEYS} for day in range(self._days)
+        ]
 
     @property
     def totalDeaths(self):
@@ -65,7 +166,16 @@ class Report:
         :return: int
             Number of death individuals.
         """
-        return sum(self.deaths)
+        return int(self.deaths.sum())
+
+    def _grow(self):
+        """
+        Double the capacity of the arrays (at least Report.INITIAL_CAPACITY, pickled reports only keep
+        the recorded days).
+        """
+        for name, values in self._columns.items():
+            self._columns[name] = np.concatenate([values, np.zeros(max(len(values), self.INITIAL_CAPACITY),
+                                                                   dtype=values.dtype)])
 
     def count(self, timeUnit: int, population: Population):
         """
@@ -75,44 +185,119 @@ class Report:
         ------------
         :param timeUnit: int
             Iteration.
-        :param population: simamics.population.Population
+        :param population: simamics.population.Population or simamics.population.ArrayPopulation
             Population.
 
         """
-        detailedCases = {
-            'healthy': 0, 'infLight': 0, 'infMild': 0, 'infSevere': 0, 'asymptomatic': 0, 'immunized': 0
-        }
-
-        for individual in population.population:
-            if isinstance(individual.state, Healthy):
-                detailedCases['healthy'] += 1
-            elif isinstance(individual.state, SymptomaticLight):
-                detailedCases['infLight'] += 1
-            elif isinstance(individual.state, SymptomaticMild):
-                detailedCases['infMild'] += 1
-            elif isinstance(individual.state, SymptomaticSevere):
-                detailedCases['infSevere'] += 1
-            elif isinstance(individual.state, Asymptomatic):
-                detailedCases['asymptomatic'] += 1
-            else:
-                detailedCases['immunized'] += 1
+        if self._days == len(self._columns['timeUnits']):
+            self._grow()
+        day = self._days
+        numInfected = population.numInfected
         # Save report
-        self.timeUnits.append(timeUnit)
-        self.totalCases.append(population.numInfected)
-        self.totalDetailedCases.append(detailedCases)
-        self.diagnosed.append(population.numInfected - population.infectedWithoutDiagnosis)
-        self.recovered.append(population.numImmunized)
+        self._columns['timeUnits'][day] = timeUnit
+        self._columns['totalCases'][day] = numInfected
+        self._columns['diagnosed'][day] = numInfected - population.infectedWithoutDiagnosis
+        self._columns['recovered'][day] = population.numImmunized
+        for key, value in population.detailedCases.items():
+            self._columns[key][day] = value
+        self._days += 1
+
+    def repeatLastDay(self, days: int):
+        """
+        Record the following days with the same state as the last day and no deaths, e.g. when the
+        population cannot change any more. The days are written to the writer of the report (if
+        any).
+
+        Parameters
+        ------------
+        :param days: int
+            Number of days.
+        """
+        if self._days == 0 or self._deathDays != self._days:
+            raise TypeError("The last day must be completed before repeating it")
+        start, end = self._days, self._days + days
+        while len(self._columns['timeUnits']) < end:
+            self._grow()
+        for name, values in self._columns.items():
+            values[start:end] = values[start - 1]
+        self._columns['timeUnits'][start:end] = self._columns['timeUnits'][start - 1] + np.arange(1, days + 1)
+        self._columns['deaths'][start:end] = 0
+        self._days = self._deathDays = end
+        if self.writer is not None:
+            for day in range(start, end):
+                self.writer.writeRow({name: values[day] for name, values in self._columns.items()})
 
     def recordDeaths(self, numDeaths):
         """
-        Record the number of deaths for a given iteration.
+        Record the number of deaths for a given iteration. The day is completed and written to the
+        writer of the report (if any).
 
         Parameters
         ------------
         :param numDeaths: int
             Number of deaths in a given iteration
         """
-        self.deaths.append(numDeaths)
+        day = self._deathDays
+        self._columns['deaths'][day] = numDeaths
+        self._deathDays += 1
+        if self.writer is not None:
+            self.writer.writeRow({name: values[day] for name, values in self._columns.items()})
+
+    def row(self, day: int = -1):
+        """
+        Return the statistics of a day.
+
+        Parameters
+        ------------
+        :param day: <optional> int
+            Index of the day (negative indices count from the end). Default the last day.
+
+        Return
+        ---------
+        :return: dict
+            Value of each statistic (see Report.COLUMNS) in the day. The deaths are 0 if they have not
+            been recorded yet.
+        """
+        if not -self._days <= day < self._days:
+            raise TypeError("The report has %d days" % self._days)
+        day = day % self._days
+        return {name: int(values[day]) for name, values in self._columns.items()}
+
+    def toDataFrame(self):
+        """
+        Return the statistics as a pandas.DataFrame (requires pandas).
+
+        Return
+        ---------
+        :return: pandas.DataFrame
+            DataFrame with a column per statistic (see Report.COLUMNS) and a row per day.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+    def toNpz(self, path: str):
+        """
+        Save the statistics in a NumPy .npz file (see numpy.load), with an array per statistic.
+
+        Parameters
+        ------------
+        :param path: str
+            File path.
+        """
+        np.savez_compressed(path, **self.columns)
+
+    def toParquet(self, path: str):
+        """
+        Save the statistics in a Parquet file (requires pyarrow).
+
+        Parameters
+        ------------
+        :param path: str
+            File path.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.table(self.columns), path)
 
     def plotStatistics(self, title="Pathogen infection"):
         """
@@ -161,8 +346,8 @@ class Report:
         daysBefore = 10
         xDaysBefore = [-1 * x for x in range(1, daysBefore)][::-1]
         yDaysBefore = [0 for x in range(1, daysBefore)]
-        xAxis = xDaysBefore + xAxis
-        yAxis = [yDaysBefore + yAxisParams for yAxisParams in yAxis]
+        xAxis = xDaysBefore + list(xAxis)
+        yAxis = [yDaysBefore + list(yAxisParams) for yAxisParams in yAxis]
         # Make representation
         fig, ax = plt.subplots(figsize=(12, 10))
         for n in range(len(yAxis)):
@@ -0,0 +1,111 @@
+"""
+*************************************************************************************************
+**********************************// VISUALIZATION MODULE //*************************************
+*************************************************************************************************
+This module provides a tool to store simulation results on disk as they are generated, so that the
+results of many simulations can be kept without holding them in memory.
+
+Author: Fernando García Gutiérrez
+Email: fernando.garciagu@upm.es
+"""
+import os
+import csv
+
+
+class ReportWriter:
+    """
+    Class that appends the days recorded by one or several reports (see simamics.visualization.Report)
+    to a CSV file, one row per day. Each row can be labelled with additional key columns (e.g. the
+    replicate or the parameters of the simulation), whose default values are given when the writer is
+    created.
+
+    A report created with a writer (Report(writer=...) or simulate(..., writer=...)) writes each day
+    as soon as it is completed. Complete reports can also be written with ReportWriter.write().
+
+    Attributes
+    ------------
+    path : str
+        CSV file.
+
+    keys : dict
+        Default value of each key column.
+
+    Methods
+    --------
+    write(report, **keys): Write all the days of a report.
+
+    writeRow(row): Write a day.
+
+    close(): Close the file.
+    """
+    def __init__(self, path: str, keys: dict = None):
+        """
+        If the file already exists the rows are appended to it, in which case its header must have the
+        same key columns (in the same order) and statistics.
+
+        Parameters
+        ------------
+        :param path: str
+            CSV file.
+        :param keys: <optional> dict
+            Default value of each key column.
+        """
+        from .Report import Report
+        self.path = path
+        self.keys = dict(keys or {})
+        fieldnames = tuple(self.keys) + Report.COLUMNS
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, newline='') as file:
+                header = tuple(next(csv.reader(file), ()))
+            if header != fieldnames:
+                raise TypeError("The columns of %s (%s) do not match the columns of the writer (%s)" %
+                                (path, ', '.join(header), ', '.join(fieldnames)))
+        self._file = open(path, 'a', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        if not exists:
+            self._writer.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def writeRow(self, row: dict):
+        """
+        Write a day.
+
+        Parameters
+        ------------
+        :param row: dict
+            Value of each column (see Report.COLUMNS) and of the keys that differ from their default.
+        """
+        self._writer.writerow({**self.keys, **row})
+
+    def write(self, report, **keys):
+        """
+        Write all the days of a report.
+
+        Parameters
+        ------------
+        :param report: simamics.visualization.Report
+            Report.
+        :param keys:
+            Value of the key columns that differ from their default.
+        """
+        columns = report.columns
+        for day in range(len(report)):
+            self.writeRow({**keys, **{name: values[day] for name, values in columns.items()}})
+
+    def flush(self):
+        """
+        Flush the rows written so far to disk.
+        """
+        self._file.flush()
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._file.close()
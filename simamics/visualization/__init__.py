@@ -1,3 +1,5 @@
 from simamics.visualization.Report import Report
+from simamics.visualization.ReportWriter import ReportWriter
+from simamics.visualization.EnsembleReport import EnsembleReport
 
-__all__ = ['Report']
+__all__ = ['Report', 'ReportWriter', 'EnsembleReport']